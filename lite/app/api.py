@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local REST API.
+Serves configurations and batch processing over HTTP, streaming batch progress as server-sent events.
+
+Usage:
+    python api.py [--host 127.0.0.1] [--port 8765] [--workers N]
+
+Endpoints:
+    GET    /configs                 Stored configurations
+    GET    /configs/{name}          One configuration
+    POST   /batches                 Submit {"config": name, "inputs": [paths]}
+    GET    /batches                 Status of the known batches
+    GET    /batches/{id}            Status of a batch
+    GET    /batches/{id}/documents  Results of a finished batch
+    GET    /batches/{id}/events     Progress as server-sent events
+    DELETE /batches/{id}            Cancel a batch
+    GET    /metrics                 Metrics in the Prometheus text format
+    GET    /metrics.json            Metrics as a JSON snapshot
+
+Requires the optional fastapi and uvicorn packages. Every endpoint is a
+coroutine and progress is pushed to waiting clients from the event loop,
+so thousands of open polls and event streams do not hold a thread each.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+import time
+import uuid
+from collections import OrderedDict
+
+try:
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+except ImportError:
+    FastAPI = None
+
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
+
+from cli import collect_paths
+from utils import metrics
+from utils.config_manager import ConfigManager
+from utils.logging_config import setup_logging
+
+# Finished batches remembered for status queries
+MAX_FINISHED_BATCHES = 1000
+
+# Seconds between keep-alive comments on an idle event stream
+KEEPALIVE_INTERVAL = 15.0
+
+
+class BatchStatus:
+    """Progress of a batch, updated on the event loop."""
+
+    def __init__(self, batch_id, config_name, total):
+        self.batch_id = batch_id
+        self.config_name = config_name
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.state = "running"
+        self.started_at = time.time()
+        self.finished_at = None
+        self.documents = None
+        # Replaced on every update; waiters hold the one that was current
+        self.changed = asyncio.Event()
+
+    def to_dict(self):
+        return {
+            "batch_id": self.batch_id,
+            "config": self.config_name,
+            "state": self.state,
+            "done": self.done,
+            "total": self.total,
+            "failed": self.failed,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    def notify(self):
+        """Wake everyone waiting for the next update."""
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class BatchService:
+    """
+    Runs batches on the processing engine and tracks their progress.
+
+    Engine callbacks arrive on a background thread and are handed to the
+    event loop, so statuses are only ever touched from the loop.
+    """
+
+    def __init__(self, config_manager, max_workers=None, use_cache=True):
+        """
+        Initialize the batch service.
+
+        Args:
+            config_manager: ConfigManager holding the configurations
+            max_workers: Number of worker processes. If None, uses all cores.
+            use_cache: Reuse the results of documents processed before
+        """
+        self.config_manager = config_manager
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.batches = OrderedDict()
+        self.finished = 0
+        self.loop = None
+        self.engine = None
+
+    def start(self):
+        """Start the engine. Must be called from the event loop."""
+        from processing.batch_engine import BatchEngine
+
+        self.loop = asyncio.get_running_loop()
+        self.engine = BatchEngine(
+            max_workers=self.max_workers,
+            on_progress=self._on_progress,
+            on_finished=self._on_finished,
+            use_cache=self.use_cache
+        )
+        self.engine.preload(self.config_manager.configs.values())
+
+    def stop(self):
+        """Stop the engine."""
+        if self.engine is not None:
+            self.engine.shutdown()
+
+    def submit(self, config, paths):
+        """
+        Start a batch.
+
+        Args:
+            config: ConfigModel whose pipeline is applied
+            paths: Paths of the documents
+
+        Returns:
+            BatchStatus: Status of the new batch
+        """
+        status = BatchStatus(uuid.uuid4().hex, config.name, len(paths))
+        self.batches[status.batch_id] = status
+        self.engine.submit(config, paths, status.batch_id)
+        return status
+
+    def cancel(self, batch_id):
+        """Cancel the documents of a batch that have not started."""
+        self.engine.cancel(batch_id)
+
+    def _on_progress(self, batch_id, done, total):
+        self.loop.call_soon_threadsafe(self._update, batch_id, done)
+
+    def _on_finished(self, batch):
+        self.loop.call_soon_threadsafe(self._finish, batch)
+
+    def _update(self, batch_id, done):
+        status = self.batches.get(batch_id)
+        if status is not None and done > status.done:
+            status.done = done
+            status.notify()
+
+    def _finish(self, batch):
+        status = self.batches.get(batch.batch_id)
+        if status is None:
+            return
+        status.state = "finished"
+        status.done = len(batch.documents)
+        status.failed = batch.failed
+        status.finished_at = batch.finished_at
+        status.documents = [document.to_dict() for document in batch.documents]
+        status.notify()
+
+        # Forget the oldest finished batches once there are too many
+        self.finished += 1
+        if self.finished > MAX_FINISHED_BATCHES:
+            for batch_id, old in list(self.batches.items()):
+                if old.state == "finished":
+                    del self.batches[batch_id]
+                    self.finished -= 1
+                    break
+
+
+async def stream_events(status):
+    """
+    Yield the progress of a batch as server-sent events until it finishes.
+
+    Updates that arrive while a client is slow are coalesced: each event
+    carries the latest status, never a backlog.
+    """
+    while True:
+        # Take the event before reading the status so no update is missed in between
+        changed = status.changed
+        name = "progress" if status.state == "running" else "finished"
+        yield f"event: {name}\ndata: {json.dumps(status.to_dict())}\n\n"
+        if status.state != "running":
+            return
+
+        while not changed.is_set():
+            try:
+                await asyncio.wait_for(changed.wait(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+
+
+def create_app(config_dir=None, max_workers=None, use_cache=True):
+    """
+    Create the API application.
+
+    Args:
+        config_dir: Directory of the configurations. If None, uses the default.
+        max_workers: Number of worker processes. If None, uses all cores.
+        use_cache: Reuse the results of documents processed before
+
+    Returns:
+        FastAPI: The application
+    """
+    if FastAPI is None:
+        raise RuntimeError("The API requires the fastapi package")
+
+    config_manager = ConfigManager(config_dir)
+    service = BatchService(config_manager, max_workers, use_cache)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        await asyncio.to_thread(config_manager.load_all_configs)
+        service.start()
+        try:
+            yield
+        finally:
+            await asyncio.to_thread(service.stop)
+
+    app = FastAPI(title="FlexiPy Lite", lifespan=lifespan)
+    app.state.service = service
+
+    def get_status(batch_id):
+        status = service.batches.get(batch_id)
+        if status is None:
+            raise HTTPException(status_code=404, detail=f"Batch not found: {batch_id}")
+        return status
+
+    @app.get("/configs")
+    async def list_configs():
+        # Reading the files blocks, so it runs off the event loop
+        configs = await asyncio.to_thread(config_manager.load_all_configs)
+        return [
+            {"name": name, "description": config.description, "steps": len(config.steps)}
+            for name, config in sorted(configs.items())
+        ]
+
+    @app.get("/configs/{name}")
+    async def read_config(name):
+        config = config_manager.get_config(name)
+        if config is None:
+            await asyncio.to_thread(config_manager.load_all_configs)
+            config = config_manager.get_config(name)
+        if config is None:
+            raise HTTPException(status_code=404, detail=f"Configuration not found: {name}")
+        return config.to_dict()
+
+    @app.post("/batches", status_code=202)
+    async def submit_batch(request: Request):
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be JSON")
+        if not isinstance(payload, dict):
+            raise HTTPException(status_code=400, detail="Body must be a JSON object")
+
+        name = payload.get("config")
+        inputs = payload.get("inputs")
+        if not isinstance(name, str):
+            raise HTTPException(status_code=400, detail="'config' must be a name")
+        if not isinstance(inputs, list) or not all(isinstance(p, str) for p in inputs):
+            raise HTTPException(status_code=400, detail="'inputs' must be a list of paths")
+
+        config = config_manager.get_config(name)
+        if config is None:
+            raise HTTPException(status_code=404, detail=f"Configuration not found: {name}")
+        try:
+            paths = await asyncio.to_thread(collect_paths, inputs, bool(payload.get("recursive")))
+        except OSError as e:
+            raise HTTPException(status_code=400, detail=f"Cannot read inputs: {e}")
+
+        return service.submit(config, paths).to_dict()
+
+    @app.get("/batches")
+    async def list_batches():
+        return [status.to_dict() for status in service.batches.values()]
+
+    @app.get("/batches/{batch_id}")
+    async def read_batch(batch_id):
+        return get_status(batch_id).to_dict()
+
+    @app.get("/batches/{batch_id}/documents")
+    async def read_documents(batch_id):
+        status = get_status(batch_id)
+        if status.documents is None:
+            raise HTTPException(status_code=409, detail="Batch is still running")
+        return status.documents
+
+    @app.get("/batches/{batch_id}/events")
+    async def batch_events(batch_id):
+        return StreamingResponse(
+            stream_events(get_status(batch_id)),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"}
+        )
+
+    @app.delete("/batches/{batch_id}", status_code=202)
+    async def cancel_batch(batch_id):
+        status = get_status(batch_id)
+        service.cancel(batch_id)
+        return status.to_dict()
+
+    @app.get("/metrics")
+    async def read_metrics():
+        return PlainTextResponse(metrics.REGISTRY.to_prometheus(),
+                                 media_type="text/plain; version=0.0.4")
+
+    @app.get("/metrics.json")
+    async def read_metrics_json():
+        return Response(metrics.REGISTRY.to_json(), media_type="application/json")
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the FlexiPy Lite REST API.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--config-dir", default=None,
+                        help="directory of the configurations (default: ~/.flexipy/configs)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="reprocess documents even if their results are cached")
+    args = parser.parse_args(argv)
+
+    if FastAPI is None or uvicorn is None:
+        print("The API requires the fastapi and uvicorn packages", file=sys.stderr)
+        return 1
+
+    setup_logging()
+    app = create_app(args.config_dir, args.workers, not args.no_cache)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless command-line runner.
+Runs stored configurations over documents without Qt, reporting progress as JSON lines.
+
+Usage:
+    python cli.py list
+    python cli.py run NAME [INPUT ...] [--workers N] [--no-cache]
+
+Only the modules a command needs are imported, and the processing engine
+is imported by ``run`` alone, so the CLI starts quickly from cron jobs
+and scripts. PySide6 is never imported.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+
+def emit(event, **fields):
+    """Write one progress event as a JSON line on stdout."""
+    record = {"event": event, "time": round(time.time(), 3)}
+    record.update(fields)
+    sys.stdout.write(json.dumps(record) + "\n")
+    sys.stdout.flush()
+
+
+def collect_paths(inputs, recursive=False):
+    """
+    Expand input files and folders into document paths.
+
+    Args:
+        inputs: Paths of files or folders
+        recursive: Also descend into subfolders
+
+    Returns:
+        list: Sorted paths of the documents
+    """
+    paths = []
+    folders = []
+    for path in inputs:
+        if os.path.isdir(path):
+            folders.append(path)
+        else:
+            paths.append(path)
+
+    while folders:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_file():
+                    paths.append(entry.path)
+                elif recursive and entry.is_dir():
+                    folders.append(entry.path)
+
+    return sorted(paths)
+
+
+def command_list(config_manager, args):
+    """Print the stored configurations, one JSON line each."""
+    for name, config in sorted(config_manager.load_all_configs().items()):
+        emit("config", name=name, description=config.description,
+             steps=len(config.steps), input_dir=config.input_dir)
+    return 0
+
+
+def command_run(config_manager, args):
+    """Run a configuration over documents and report progress."""
+    config_manager.load_all_configs()
+    config = config_manager.get_config(args.name)
+    if config is None:
+        emit("error", message=f"Configuration not found: {args.name}")
+        return 2
+
+    inputs = args.inputs or ([config.input_dir] if config.input_dir else [])
+    if not inputs:
+        emit("error", message=f"No inputs given and {args.name} has no input folder")
+        return 2
+    try:
+        paths = collect_paths(inputs, args.recursive)
+    except OSError as e:
+        emit("error", message=f"Cannot read inputs: {e}")
+        return 2
+
+    # The engine pulls in multiprocessing and the page decoders; only this command needs it
+    from processing.batch_engine import BatchEngine
+
+    finished = threading.Event()
+    outcome = []
+    last_progress = [0.0]
+
+    def on_progress(batch_id, done, total):
+        now = time.monotonic()
+        if done == total or now - last_progress[0] >= args.progress_interval:
+            last_progress[0] = now
+            emit("progress", batch_id=batch_id, done=done, total=total)
+
+    def on_finished(batch):
+        outcome.append(batch)
+        finished.set()
+
+    engine = BatchEngine(
+        max_workers=args.workers,
+        on_progress=on_progress,
+        on_finished=on_finished,
+        use_cache=not args.no_cache
+    )
+    try:
+        batch_id = engine.submit(config, paths)
+        emit("started", batch_id=batch_id, config=config.name, total=len(paths),
+             workers=engine.max_workers)
+        try:
+            # Wake up regularly so Ctrl+C is handled on every platform
+            while not finished.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            emit("cancelled", batch_id=batch_id)
+            engine.cancel(batch_id)
+            finished.wait()
+    finally:
+        engine.shutdown()
+        if args.metrics:
+            from utils import metrics
+            try:
+                metrics.REGISTRY.write(args.metrics)
+            except OSError as e:
+                emit("error", message=f"Cannot write metrics: {e}")
+
+    batch = outcome[0]
+    for document in batch.documents:
+        emit("document", **document.to_dict())
+    emit("finished", batch_id=batch.batch_id, documents=len(batch.documents),
+         failed=batch.failed, seconds=round(batch.finished_at - batch.started_at, 3))
+    return 1 if batch.failed else 0
+
+
+def build_parser():
+    """Build the command-line parser."""
+    parser = argparse.ArgumentParser(
+        prog="flexipy-lite",
+        description="Run FlexiPy Lite configurations without a display."
+    )
+    parser.add_argument("--config-dir", default=None,
+                        help="directory of the configurations (default: ~/.flexipy/configs)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list the stored configurations")
+
+    run = commands.add_parser("run", help="run a configuration over documents")
+    run.add_argument("name", help="name of the configuration")
+    run.add_argument("inputs", nargs="*",
+                     help="files or folders to process (default: the configuration's input folder)")
+    run.add_argument("-w", "--workers", type=int, default=None,
+                     help="number of worker processes (default: all cores)")
+    run.add_argument("-r", "--recursive", action="store_true",
+                     help="also process documents in subfolders")
+    run.add_argument("--no-cache", action="store_true",
+                     help="reprocess documents even if their results are cached")
+    run.add_argument("--metrics", default=None, metavar="FILE",
+                     help="write the metrics of the run to FILE, as JSON if it ends in .json "
+                          "and in the Prometheus text format otherwise")
+    run.add_argument("--progress-interval", type=float, default=0.5,
+                     help="minimum seconds between progress events")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Log lines go to stderr and the log file, leaving stdout to the events
+    from utils.logging_config import setup_logging
+    setup_logging()
+
+    from utils.config_manager import ConfigManager
+    config_manager = ConfigManager(args.config_dir)
+
+    if args.command == "list":
+        return command_list(config_manager, args)
+    return command_run(config_manager, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
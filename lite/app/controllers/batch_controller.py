@@ -0,0 +1,191 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import Signal, QObject
+
+from models.config_model import ConfigModel
+from processing.batch_engine import BatchEngine
+from processing.job_queue import JobQueue
+from controllers.update_bus import UpdateBus
+from utils.database import Database
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two extensions of the claim of a running batch. Each
+# extension is a commit, so they are not made for every document.
+EXTEND_INTERVAL = 60.0
+
+
+class BatchController(QObject):
+    """Controller that runs document batches in the background."""
+
+    # Signals are emitted from engine threads and delivered queued to the GUI thread
+    batch_started = Signal(str, int)
+    # {batch_id: (done, total)} of the batches that progressed, at most 30 times a second
+    batch_progress = Signal(object)
+    batch_finished = Signal(object)
+    worker_metrics = Signal(object)
+
+    def __init__(self, max_workers=None, job_queue=None, max_active_batches=2,
+                 database=None):
+        """
+        Initialize the batch controller.
+
+        Args:
+            max_workers: Number of worker processes. If None, uses all cores.
+            job_queue: JobQueue that persists batches. If None, uses the default.
+            max_active_batches: Batches handed to the engine at the same time
+            database: Database recording batch and document metadata. If None,
+                uses the default.
+        """
+        super().__init__()
+        # Progress is reported once per document; the bus hands the GUI the latest only
+        self.update_bus = UpdateBus(parent=self)
+        self.update_bus.delivered.connect(self._on_updates)
+        self.engine = BatchEngine(
+            max_workers=max_workers,
+            on_progress=self._on_progress,
+            on_finished=self._on_finished,
+            on_metrics=self.worker_metrics.emit
+        )
+        # Batches live in the queue until they finish, so a crash loses nothing
+        self.job_queue = job_queue or JobQueue(visibility_timeout=3600.0)
+        self.database = database or Database()
+        self.worker_id = f"lite-{os.getpid()}"
+        self.max_active_batches = max_active_batches
+        self.active_jobs = {}
+        # Monotonic time the claim of each running batch was last extended
+        self.extended_at = {}
+        self.lock = threading.Lock()
+        # Queueing and recording new batches writes a row per document, so it
+        # all happens here instead of on the GUI or engine threads
+        self.background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flexipy-batches")
+
+    def resume(self):
+        """Restart the batches left unfinished by a previous run, on the background thread."""
+        self._in_background(self._resume)
+
+    def _resume(self):
+        """Release the claims of the previous run and dispatch its batches."""
+        released = self.job_queue.release_claims()
+        if released:
+            logger.info("Resuming %d unfinished batch(es)", released)
+        self._dispatch_pending()
+
+    def preload_configs(self, configs):
+        """
+        Warm the workers with the pipelines of configurations.
+
+        Args:
+            configs: Iterable of ConfigModel, e.g. the stored configurations
+                or one that was just saved
+        """
+        self.engine.preload(configs)
+
+    def run_batch(self, config, paths):
+        """
+        Queue a batch of documents for processing.
+
+        Returns at once; the batch is written to the job queue on the
+        controller's background thread.
+
+        Args:
+            config: ConfigModel whose pipeline is applied
+            paths: Paths of the documents in the batch
+
+        Returns:
+            str: Identifier of the batch
+        """
+        batch_id = uuid.uuid4().hex
+        self._in_background(self._enqueue, batch_id, config.to_dict(), list(paths))
+        return batch_id
+
+    def cancel_batch(self, batch_id):
+        """Cancel the pending work of a batch."""
+        self.engine.cancel(batch_id)
+
+    def shutdown(self):
+        """Stop the background workers."""
+        # Batches still being queued are written before the workers stop
+        self.background.shutdown(wait=True)
+        self.engine.shutdown(wait=False)
+        self.database.close()
+
+    def _in_background(self, func, *args):
+        """Run a callable on the background thread, logging its errors."""
+        try:
+            future = self.background.submit(func, *args)
+        except RuntimeError:
+            # Shutting down; queued batches are picked up on the next start
+            return
+        future.add_done_callback(_log_error)
+
+    def _enqueue(self, batch_id, config_data, paths):
+        """Persist a batch and hand it to the engine if there is room."""
+        self.job_queue.enqueue(batch_id, {"config": config_data, "paths": paths})
+        self._dispatch_pending()
+
+    def _dispatch_pending(self):
+        """Hand queued batches to the engine while there is room. Runs on the background thread."""
+        with self.lock:
+            room = self.max_active_batches - len(self.active_jobs)
+            if room <= 0:
+                return
+            jobs = self.job_queue.claim(self.worker_id, limit=room)
+            for job in jobs:
+                self.active_jobs[job.job_key] = job.job_id
+                self.extended_at[job.job_key] = time.monotonic()
+
+        for job in jobs:
+            paths = job.payload["paths"]
+            config = ConfigModel.from_dict(job.payload["config"])
+            self.database.record_batch(job.job_key, config.name, paths)
+            self.batch_started.emit(job.job_key, len(paths))
+            try:
+                self.engine.submit(config, paths, job.job_key)
+            except RuntimeError as e:
+                # The engine is shutting down; leave the batch for the next run
+                with self.lock:
+                    self.active_jobs.pop(job.job_key, None)
+                    self.extended_at.pop(job.job_key, None)
+                self.job_queue.fail(job.job_id, str(e))
+
+    def _on_progress(self, batch_id, done, total):
+        """Keep the claim of a running batch alive and report progress."""
+        job_id = self.active_jobs.get(batch_id)
+        now = time.monotonic()
+        if job_id is not None and now - self.extended_at.get(batch_id, 0.0) >= EXTEND_INTERVAL:
+            self.extended_at[batch_id] = now
+            self.job_queue.extend(job_id)
+        self.update_bus.post("batch_progress", batch_id, (done, total))
+
+    def _on_updates(self, topic, updates):
+        """Pass the coalesced progress of the bus on."""
+        if topic == "batch_progress":
+            self.batch_progress.emit(updates)
+
+    def _on_finished(self, batch):
+        """Acknowledge a finished batch and start the next one."""
+        with self.lock:
+            job_id = self.active_jobs.pop(batch.batch_id, None)
+            self.extended_at.pop(batch.batch_id, None)
+        # Record the outcome before acking, so a crash in between only repeats the batch
+        self.database.finish_batch(batch)
+        if job_id is not None:
+            self.job_queue.ack(job_id)
+        # Progress still pending would arrive after the batch has finished
+        self.update_bus.discard("batch_progress", batch.batch_id)
+        self.batch_finished.emit(batch)
+        self._in_background(self._dispatch_pending)
+
+
+def _log_error(future):
+    """Log the exception of a background task, which would otherwise be lost."""
+    error = future.exception()
+    if error is not None:
+        logger.error("Error in batch controller task: %s", error,
+                     exc_info=(type(error), error, error.__traceback__))
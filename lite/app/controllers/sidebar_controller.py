@@ -1,18 +1,36 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QToolButton, QLabel, 
                               QFrame, QSizePolicy, QSpacerItem)
-from PySide6.QtCore import Qt, QSize, Signal, Slot, QObject
+from PySide6.QtCore import Qt, QSize, Signal, Slot, QObject, QVariantAnimation, QEasingCurve
 from PySide6.QtGui import QIcon, QFont, QPainter, QPixmap, QColor
+import logging
 import os
 
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_icon_hits = metrics.counter("icon_cache_requests_total", "Sidebar icon lookups", result="hit")
+_icon_misses = metrics.counter("icon_cache_requests_total", "Sidebar icon lookups", result="miss")
+_icon_load_seconds = metrics.histogram("icon_load_seconds", "Time to load and recolour an icon")
+
+# Widths of the sidebar in pixels
+EXPANDED_WIDTH = 200
+COLLAPSED_WIDTH = 60
+# Duration of a full collapse or expand in milliseconds
+ANIMATION_MS = 180
+
 try:
     import resources_rc
 except ImportError:
-    print("Warning: resources_rc module not found. Using direct file paths for icons.")
+    logger.warning("resources_rc module not found. Using direct file paths for icons.")
 
 
 class SidebarButton:
     """A button in the sidebar."""
     
+    # Icons by name, shared by every button; loading and recolouring is the slow part
+    _icon_cache = {}
+    
     def __init__(self, icon_name, text, is_expanded=True):
         """
         Initialize a sidebar button.
@@ -65,7 +83,20 @@ class SidebarButton:
         self.button.style().polish(self.button)
     
     def _get_icon(self, icon_name):
-        """Get an icon by name, trying both resource system and direct file path."""
+        """Get an icon by name, loading it on first use."""
+        icon = self._icon_cache.get(icon_name)
+        if icon is not None:
+            _icon_hits.inc()
+            return icon
+        
+        _icon_misses.inc()
+        with _icon_load_seconds.time():
+            icon = self._load_icon(icon_name)
+        self._icon_cache[icon_name] = icon
+        return icon
+    
+    def _load_icon(self, icon_name):
+        """Load an icon by name, trying both resource system and direct file path."""
         # Try to use light version if available
         light_icon_name = f"{icon_name}_light"
         
@@ -87,14 +118,14 @@ class SidebarButton:
             
             if os.path.exists(light_icon_path):
                 icon = QIcon(light_icon_path)
-                print(f"Loaded light icon from file: {light_icon_path}")
+                logger.debug("Loaded light icon from file: %s", light_icon_path)
             elif os.path.exists(regular_icon_path):
                 icon = QIcon(regular_icon_path)
-                print(f"Loaded regular icon from file: {regular_icon_path}")
+                logger.debug("Loaded regular icon from file: %s", regular_icon_path)
                 # Convert to white icon if it's not a light version
                 icon = self._create_white_icon(icon)
             else:
-                print(f"Icon not found at: {regular_icon_path}")
+                logger.warning("Icon not found at: %s", regular_icon_path)
         
         return icon
     
@@ -186,6 +217,14 @@ class SidebarController(QObject):
         self.sections = []
         self.buttons = {}  # Store button references by icon name
         self.sidebar = self._create_sidebar()
+        
+        # Stands in for the sidebar in its parent's layout while it animates
+        self.placeholder = None
+        self.float_geometry = None
+        self.animation = QVariantAnimation(self)
+        self.animation.setEasingCurve(QEasingCurve.OutCubic)
+        self.animation.valueChanged.connect(self._on_animation_frame)
+        self.animation.finished.connect(self._dock_sidebar)
     
     def get_sidebar(self):
         """Return the sidebar widget."""
@@ -196,8 +235,9 @@ class SidebarController(QObject):
         # Create sidebar widget
         sidebar = QWidget()
         sidebar.setObjectName("sidebar")
-        sidebar.setMinimumWidth(200 if self.is_expanded else 60)
-        sidebar.setMaximumWidth(200 if self.is_expanded else 60)
+        width = EXPANDED_WIDTH if self.is_expanded else COLLAPSED_WIDTH
+        sidebar.setMinimumWidth(width)
+        sidebar.setMaximumWidth(width)
         
         # Set sidebar style
         sidebar.setStyleSheet("""
@@ -314,16 +354,103 @@ class SidebarController(QObject):
     @Slot()
     def _toggle_sidebar(self):
         """Toggle the sidebar between expanded and collapsed states."""
-        self.is_expanded = not self.is_expanded
-        sidebar = self.sidebar
+        self.set_expanded(not self.is_expanded)
+    
+    def set_expanded(self, expanded, animate=True):
+        """
+        Expand or collapse the sidebar.
+        
+        While animating, the sidebar floats above the content and a
+        placeholder of the collapsed width takes its place in the layout,
+        so a frame only resizes the sidebar's own buttons. The content is
+        laid out once: when a collapse starts or when an expand ends.
+        
+        Args:
+            expanded: Whether the sidebar should be expanded
+            animate: Animate the change if the sidebar is shown in a layout
+        """
+        if expanded == self.is_expanded:
+            return
+        self.is_expanded = expanded
+        if expanded:
+            self._set_buttons_expanded(True)
+        
+        if not animate:
+            self.animation.stop()
+            if self.placeholder is not None:
+                self._dock_sidebar()
+            else:
+                self._commit_width()
+            return
+        if self.placeholder is None and not self._float_sidebar():
+            self._commit_width()
+            return
         
-        # Update sidebar width
-        sidebar.setMinimumWidth(200 if self.is_expanded else 60)
-        sidebar.setMaximumWidth(200 if self.is_expanded else 60)
+        # Also reverses an animation that is still running
+        self.animation.stop()
+        start = self.sidebar.width()
+        end = EXPANDED_WIDTH if expanded else COLLAPSED_WIDTH
+        self.animation.setStartValue(start)
+        self.animation.setEndValue(end)
+        self.animation.setDuration(
+            max(int(ANIMATION_MS * abs(end - start) / (EXPANDED_WIDTH - COLLAPSED_WIDTH)), 1)
+        )
+        self.animation.start()
+    
+    def _float_sidebar(self):
+        """
+        Take the sidebar out of its parent's layout for an animation.
         
-        # Update button styles
-        for button_name, button in self.buttons.items():
-            button.set_expanded(self.is_expanded)
+        Returns:
+            bool: Whether the sidebar now floats, False if it is not shown in a layout
+        """
+        sidebar = self.sidebar
+        parent = sidebar.parentWidget()
+        layout = parent.layout() if parent is not None else None
+        if layout is None or not sidebar.isVisible() or layout.indexOf(sidebar) < 0:
+            return False
+        
+        self.float_geometry = sidebar.geometry()
+        self.placeholder = QWidget(parent)
+        self.placeholder.setFixedWidth(COLLAPSED_WIDTH)
+        layout.replaceWidget(sidebar, self.placeholder)
+        sidebar.setMinimumWidth(COLLAPSED_WIDTH)
+        sidebar.setMaximumWidth(EXPANDED_WIDTH)
+        sidebar.raise_()
+        return True
+    
+    def _on_animation_frame(self, width):
+        """Resize the floating sidebar for one frame of the animation."""
+        if self.placeholder is None:
+            return
+        # Follow the placeholder once it is laid out, in case the window is resized
+        geometry = self.placeholder.geometry() if self.placeholder.isVisible() else self.float_geometry
+        self.sidebar.setGeometry(geometry.x(), geometry.y(), width, geometry.height())
+    
+    def _dock_sidebar(self):
+        """Put the sidebar back in its parent's layout at its final width."""
+        if self.placeholder is None:
+            return
+        if not self.is_expanded:
+            self._set_buttons_expanded(False)
+        
+        layout = self.placeholder.parentWidget().layout()
+        layout.replaceWidget(self.placeholder, self.sidebar)
+        self.placeholder.deleteLater()
+        self.placeholder = None
+        self._commit_width()
+    
+    def _commit_width(self):
+        """Fix the sidebar at the width of its state, updating the buttons to match."""
+        width = EXPANDED_WIDTH if self.is_expanded else COLLAPSED_WIDTH
+        self.sidebar.setMinimumWidth(width)
+        self.sidebar.setMaximumWidth(width)
+        self._set_buttons_expanded(self.is_expanded)
+    
+    def _set_buttons_expanded(self, expanded):
+        """Show or hide the button texts."""
+        for button in self.buttons.values():
+            button.set_expanded(expanded)
     
     def _handle_button_click(self, button_id):
         """Handle button clicks and update selected state."""
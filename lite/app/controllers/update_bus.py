@@ -0,0 +1,111 @@
+import threading
+import time
+
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+
+from utils import metrics
+
+_updates_posted = metrics.counter("ui_updates_total", "Updates posted to the UI bus",
+                                  result="posted")
+_updates_superseded = metrics.counter("ui_updates_total", "Updates posted to the UI bus",
+                                      result="superseded")
+_flush_seconds = metrics.histogram("ui_update_flush_seconds",
+                                   "Time to deliver one batch of coalesced UI updates")
+
+
+class UpdateBus(QObject):
+    """
+    Coalesces high-frequency updates from background threads for the GUI.
+
+    Updates are posted per topic and key from any thread. Only the latest
+    value of each key is kept, so an update superseded before the next
+    flush is dropped, and the pending values are delivered on the GUI
+    thread at most rate times per second as one {key: value} dictionary
+    per topic. A burst of posts costs one queued event per flush however
+    many keys it touches, so thousands of updates a second never reach
+    the Qt event queue individually.
+    """
+
+    # Emitted on the GUI thread with a topic and its {key: latest value} dictionary
+    delivered = Signal(str, object)
+
+    # Queued to the GUI thread when the first update after a flush is posted
+    _wake = Signal()
+
+    def __init__(self, rate=30, parent=None):
+        """
+        Initialize the bus. Must be created on the GUI thread.
+
+        Args:
+            rate: Flushes per second at most
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.interval = 1.0 / rate
+        # topic -> {key: latest value}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.last_flush = 0.0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+        self._wake.connect(self._schedule, Qt.QueuedConnection)
+
+    def post(self, topic, key, value):
+        """
+        Post the latest value of a key. Safe to call from any thread.
+
+        Args:
+            topic: Name of the stream, e.g. "batch_progress"
+            key: Entity the value belongs to, e.g. a batch identifier
+            value: Latest value; replaces any value of the key not yet delivered
+        """
+        with self.lock:
+            wake = not self.pending
+            updates = self.pending.get(topic)
+            if updates is None:
+                updates = self.pending[topic] = {}
+            superseded = key in updates
+            updates[key] = value
+
+        _updates_posted.inc()
+        if superseded:
+            _updates_superseded.inc()
+        if wake:
+            self._wake.emit()
+
+    def discard(self, topic, key):
+        """
+        Drop the undelivered value of a key, e.g. when its entity is finished.
+
+        Args:
+            topic: Name of the stream
+            key: Entity whose value is dropped
+        """
+        with self.lock:
+            updates = self.pending.get(topic)
+            if updates is not None:
+                updates.pop(key, None)
+                if not updates:
+                    del self.pending[topic]
+
+    def flush(self):
+        """Deliver the pending updates now. Must be called on the GUI thread."""
+        self.timer.stop()
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        self.last_flush = time.monotonic()
+        if not pending:
+            return
+
+        with _flush_seconds.time():
+            for topic, updates in pending.items():
+                self.delivered.emit(topic, updates)
+
+    def _schedule(self):
+        """Start the flush timer, keeping flushes at least one interval apart."""
+        if self.timer.isActive():
+            return
+        wait = self.last_flush + self.interval - time.monotonic()
+        self.timer.start(max(int(wait * 1000), 0))
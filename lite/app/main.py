@@ -4,10 +4,25 @@
 import sys
 from PySide6.QtWidgets import QApplication
 from views.main_window import MainWindow
+from utils import event_loop_monitor
+from utils.logging_config import setup_logging
 
 def main():
-    app = QApplication(sys.argv)
+    setup_logging()
+    
+    # Opt-in event loop instrumentation, e.g. FLEXIPY_LOOP_MONITOR=100
+    stall_ms = event_loop_monitor.stall_threshold_from_env()
+    if stall_ms is None:
+        app = QApplication(sys.argv)
+    else:
+        app = event_loop_monitor.MonitoredApplication(sys.argv)
+        app.monitor = event_loop_monitor.EventLoopMonitor(stall_ms=stall_ms, parent=app)
+
     window = MainWindow()
+    if stall_ms is not None:
+        from views.debug_overlay import DebugOverlay
+        window.debug_overlay = DebugOverlay(app.monitor, window)
+        app.monitor.start()
     window.show()
     sys.exit(app.exec())
 
@@ -0,0 +1,38 @@
+from models.document_model import DocumentModel
+
+
+class BatchModel:
+    def __init__(self, batch_id="", config_name="", paths=None, documents=None,
+                 started_at=None, finished_at=None):
+        self.batch_id = batch_id
+        self.config_name = config_name
+        self.paths = paths if paths is not None else []
+        # Processed DocumentModel instances, in input order once finished
+        self.documents = documents if documents is not None else []
+        self.started_at = started_at
+        self.finished_at = finished_at
+    
+    @property
+    def failed(self):
+        return sum(1 for document in self.documents if document.error)
+    
+    def to_dict(self):
+        return {
+            "batch_id": self.batch_id,
+            "config_name": self.config_name,
+            "paths": self.paths,
+            "documents": [document.to_dict() for document in self.documents],
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            batch_id=data.get("batch_id", ""),
+            config_name=data.get("config_name", ""),
+            paths=data.get("paths", []),
+            documents=[DocumentModel.from_dict(d) for d in data.get("documents", [])],
+            started_at=data.get("started_at"),
+            finished_at=data.get("finished_at")
+        )
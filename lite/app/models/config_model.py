@@ -1,17 +1,39 @@
+import hashlib
+import json
+
+
 class ConfigModel:
-    def __init__(self, name="", description=""):
+    def __init__(self, name="", description="", steps=None, input_dir=""):
         self.name = name
         self.description = description
+        # Folder watched for new documents to run through this configuration
+        self.input_dir = input_dir
+        # Ordered pipeline of document steps, each {"type": ..., "params": {...}}
+        self.steps = steps if steps is not None else []
     
     def to_dict(self):
         return {
             "name": self.name,
-            "description": self.description
+            "description": self.description,
+            "steps": self.steps,
+            "input_dir": self.input_dir
         }
     
     @classmethod
     def from_dict(cls, data):
         return cls(
             name=data.get("name", ""),
-            description=data.get("description", "")
-        )
\ No newline at end of file
+            description=data.get("description", ""),
+            steps=data.get("steps", []),
+            input_dir=data.get("input_dir", "")
+        )
+
+    def content_hash(self):
+        """
+        Hash of the settings that affect processing results.
+        
+        Only the steps are hashed, so renaming or re-describing a
+        configuration does not invalidate results computed with it.
+        """
+        canonical = json.dumps(self.steps, sort_keys=True, separators=(",", ":"))
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,25 @@
+class DocumentModel:
+    def __init__(self, path="", results=None, error=None, cached=False):
+        self.path = path
+        # Outputs of the pipeline steps, keyed by step type
+        self.results = results if results is not None else {}
+        self.error = error
+        # True when the results were reused from an earlier run
+        self.cached = cached
+    
+    def to_dict(self):
+        return {
+            "path": self.path,
+            "results": self.results,
+            "error": self.error,
+            "cached": self.cached
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            path=data.get("path", ""),
+            results=data.get("results", {}),
+            error=data.get("error"),
+            cached=data.get("cached", False)
+        )
@@ -0,0 +1,173 @@
+"""
+Batch processing engine.
+Runs the pipeline of a configuration over batches of documents on worker processes.
+"""
+import os
+import threading
+import time
+import uuid
+
+from models.batch_model import BatchModel
+from processing.executor import WorkStealingExecutor
+from processing.result_cache import ResultCache
+from utils import metrics
+
+_documents_ok = metrics.counter(
+    "documents_processed_total", "Documents processed by the batch engine", status="ok")
+_documents_failed = metrics.counter(
+    "documents_processed_total", "Documents processed by the batch engine", status="failed")
+_batches_finished = metrics.counter(
+    "batches_finished_total", "Batches finished by the batch engine")
+_batches_active = metrics.gauge(
+    "batches_active", "Batches submitted and not yet finished")
+_batch_seconds = metrics.histogram(
+    "batch_duration_seconds", "Time from submitting a batch to its last document")
+
+
+class _BatchState:
+    """Tracks the outstanding documents of a running batch."""
+
+    def __init__(self, batch):
+        self.batch = batch
+        self.results = [None] * len(batch.paths)
+        self.done = 0
+        self.lock = threading.Lock()
+
+
+class BatchEngine:
+    """
+    Processes document batches on a pool of worker processes.
+
+    Documents are scheduled one by one on a work-stealing executor, and long
+    documents are split into page ranges, so a single batch can occupy every
+    core. Callbacks are invoked from a background thread; callers that
+    touch the UI must marshal back to the GUI thread themselves.
+    """
+
+    def __init__(self, max_workers=None, on_progress=None, on_finished=None,
+                 cache_dir=None, use_cache=True, on_metrics=None):
+        """
+        Initialize the batch engine.
+
+        Args:
+            max_workers: Number of worker processes. If None, uses all cores.
+            on_progress: Optional callable(batch_id, done, total)
+            on_finished: Optional callable(BatchModel)
+            cache_dir: Directory of the result cache. If None, uses the default.
+            use_cache: Reuse the results of documents processed before
+            on_metrics: Optional callable(list of dict) with per-worker utilisation
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if use_cache:
+            # Resolve the default once so every worker opens the same directory
+            cache_dir = ResultCache(cache_dir).cache_dir
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+        self.on_metrics = on_metrics
+        self.batches = {}
+        self.lock = threading.Lock()
+        self.executor = WorkStealingExecutor(
+            max_workers=self.max_workers,
+            cache_dir=cache_dir,
+            use_cache=use_cache,
+            on_document=self._document_done,
+            on_metrics=self._worker_metrics
+        )
+
+    def preload(self, configs):
+        """
+        Build the pipelines of configurations in every worker ahead of use.
+
+        Call again with a saved configuration to swap in its new version.
+
+        Args:
+            configs: Iterable of ConfigModel
+        """
+        self.executor.preload(configs)
+
+    def submit(self, config, paths, batch_id=None):
+        """
+        Submit a batch of documents.
+
+        Args:
+            config: ConfigModel whose pipeline is applied
+            paths: Paths of the documents in the batch
+            batch_id: Identifier of the batch. If None, one is generated.
+
+        Returns:
+            str: Identifier of the batch
+        """
+        batch_id = batch_id or uuid.uuid4().hex
+        paths = list(paths)
+        batch = BatchModel(batch_id, config.name, paths, started_at=time.time())
+
+        state = _BatchState(batch)
+        with self.lock:
+            self.batches[batch_id] = state
+        _batches_active.inc()
+
+        if not paths:
+            self._finish(state)
+            return batch_id
+
+        self.executor.submit(batch_id, config, paths)
+        return batch_id
+
+    def cancel(self, batch_id):
+        """
+        Cancel the documents of a batch that have not started yet.
+
+        Args:
+            batch_id: Identifier of the batch
+        """
+        self.executor.cancel(batch_id)
+
+    def shutdown(self, wait=True):
+        """Stop the worker processes."""
+        self.executor.shutdown(wait=wait)
+
+    def _worker_metrics(self, workers):
+        """Record the utilisation of each worker and pass it on."""
+        for worker in workers:
+            metrics.gauge("worker_utilisation", "Share of the last second a worker was busy",
+                          worker=worker["worker"]).set(worker["utilisation"])
+        if self.on_metrics is not None:
+            self.on_metrics(workers)
+
+    def _document_done(self, batch_id, index, document):
+        """Collect a finished document and finish the batch when all are in."""
+        with self.lock:
+            state = self.batches.get(batch_id)
+        if state is None:
+            return
+
+        if document.error:
+            _documents_failed.inc()
+        else:
+            _documents_ok.inc()
+
+        with state.lock:
+            state.results[index] = document
+            state.done += 1
+            done = state.done
+        total = len(state.batch.paths)
+
+        if self.on_progress is not None:
+            self.on_progress(batch_id, done, total)
+        if done == total:
+            self._finish(state)
+
+    def _finish(self, state):
+        """Assemble the batch result and report it."""
+        batch = state.batch
+        batch.documents = state.results
+        batch.finished_at = time.time()
+
+        with self.lock:
+            self.batches.pop(batch.batch_id, None)
+        _batches_active.dec()
+        _batches_finished.inc()
+        _batch_seconds.observe(batch.finished_at - batch.started_at)
+
+        if self.on_finished is not None:
+            self.on_finished(batch)
@@ -0,0 +1,193 @@
+"""
+Shared-memory buffer pool.
+Reuses page-sized shared memory segments instead of allocating a fresh buffer for every rasterized page.
+"""
+import threading
+import weakref
+from collections import deque
+from multiprocessing import shared_memory
+
+# Bytes per pixel of the page modes produced by the page sources
+BYTES_PER_PIXEL = {"L": 1, "RGB": 3, "RGBA": 4}
+
+
+class PooledBuffer:
+    """A shared memory buffer checked out of a SharedBufferPool."""
+
+    def __init__(self, pool, key, segment, size):
+        # Weak, so buffers do not keep their pool alive and it is freed once unused
+        self.pool = weakref.ref(pool)
+        self.key = key
+        self.segment = segment
+        self.size = size
+        self.view = segment.buf[:size]
+
+    @property
+    def name(self):
+        """Name other processes can attach to."""
+        return self.segment.name
+
+    def release(self):
+        """Return the buffer to its pool, or free it if the pool is gone."""
+        pool = self.pool()
+        if pool is not None:
+            pool.release(self)
+        else:
+            _destroy(self)
+
+
+class SharedBufferPool:
+    """
+    Pool of shared memory buffers keyed by page dimensions and mode.
+
+    Pages of a batch usually share a handful of sizes, so after the first
+    few pages every checkout is served from the pool. Because buffers are
+    shared memory, a page rendered into one can be handed to another
+    process by name without copying or pickling it.
+
+    The page sources do not use the pool: PyMuPDF and Pillow allocate the
+    pixels of each page themselves, so a pooled buffer would only add a
+    copy on top of that allocation.
+    """
+
+    def __init__(self, max_free_per_key=8, max_free_bytes=256 * 1024 * 1024):
+        """
+        Initialize the pool.
+
+        Args:
+            max_free_per_key: Idle buffers kept for each size
+            max_free_bytes: Idle bytes kept across all sizes
+        """
+        self.max_free_per_key = max_free_per_key
+        self.max_free_bytes = max_free_bytes
+        self.free = {}
+        self.lru = deque()
+        self.lock = threading.Lock()
+        # Frees idle buffers when the pool is collected or the process exits;
+        # call close to free them sooner
+        self._finalizer = weakref.finalize(self, _destroy_all, self.lru)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.checked_out = 0
+        self.free_bytes = 0
+        self.resident_bytes = 0
+        self.peak_resident_bytes = 0
+
+    def checkout(self, width, height, mode):
+        """
+        Get a buffer for a page.
+
+        Args:
+            width: Width of the page in pixels
+            height: Height of the page in pixels
+            mode: Pixel format, one of BYTES_PER_PIXEL
+
+        Returns:
+            PooledBuffer: Buffer of exactly the page size
+        """
+        key = (width, height, mode)
+        with self.lock:
+            free = self.free.get(key)
+            if free:
+                buffer = free.pop()
+                self.lru.remove(buffer)
+                self.free_bytes -= buffer.size
+                self.hits += 1
+                self.checked_out += 1
+                return buffer
+            self.misses += 1
+
+        size = width * height * BYTES_PER_PIXEL[mode]
+        segment = shared_memory.SharedMemory(create=True, size=max(1, size))
+        buffer = PooledBuffer(self, key, segment, size)
+
+        with self.lock:
+            self.checked_out += 1
+            self.resident_bytes += size
+            self.peak_resident_bytes = max(self.peak_resident_bytes, self.resident_bytes)
+        return buffer
+
+    def release(self, buffer):
+        """
+        Return a buffer to the pool.
+
+        Args:
+            buffer: PooledBuffer obtained from checkout
+        """
+        evicted = []
+        with self.lock:
+            self.checked_out -= 1
+            self.free.setdefault(buffer.key, []).append(buffer)
+            self.lru.append(buffer)
+            self.free_bytes += buffer.size
+
+            # Drop the oldest idle buffer of this size, then the least
+            # recently returned ones until the idle bytes fit
+            same_size = self.free[buffer.key]
+            if len(same_size) > self.max_free_per_key:
+                oldest = same_size.pop(0)
+                self.lru.remove(oldest)
+                self._evict(oldest, evicted)
+            while self.lru and self.free_bytes > self.max_free_bytes:
+                oldest = self.lru.popleft()
+                self.free[oldest.key].remove(oldest)
+                self._evict(oldest, evicted)
+
+        for old in evicted:
+            _destroy(old)
+
+    def _evict(self, buffer, evicted):
+        """Account for an idle buffer leaving the pool. Called with the lock held."""
+        self.free_bytes -= buffer.size
+        self.resident_bytes -= buffer.size
+        self.evictions += 1
+        evicted.append(buffer)
+
+    def stats(self):
+        """
+        Return usage statistics.
+
+        Returns:
+            dict: Hits, misses, evictions and memory use of the pool
+        """
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "checked_out": self.checked_out,
+                "free_bytes": self.free_bytes,
+                "resident_bytes": self.resident_bytes,
+                "peak_resident_bytes": self.peak_resident_bytes,
+            }
+
+    def close(self):
+        """Free every idle buffer."""
+        with self.lock:
+            buffers = deque(self.lru)
+            self.lru.clear()
+            self.free.clear()
+            self.resident_bytes -= self.free_bytes
+            self.free_bytes = 0
+        _destroy_all(buffers)
+
+
+def _destroy(buffer):
+    """Unmap and free the segment of a buffer."""
+    buffer.view.release()
+    try:
+        buffer.segment.close()
+    except BufferError:
+        # A page still references the buffer; it is unmapped when released
+        pass
+    buffer.segment.unlink()
+
+
+def _destroy_all(buffers):
+    """Free a collection of idle buffers."""
+    while buffers:
+        _destroy(buffers.popleft())
@@ -0,0 +1,614 @@
+"""
+Work-stealing batch executor.
+Schedules documents and page ranges over long-lived worker processes using per-worker deques.
+"""
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from models.config_model import ConfigModel
+from models.document_model import DocumentModel
+from processing import incremental
+from processing.page_source import count_pages
+from processing.pipeline import Pipeline
+from processing.result_cache import ResultCache
+from processing.steps import STEP_TYPES, fingerprint_steps
+from utils.logging_config import handle_worker_record, setup_worker_logging
+
+logger = logging.getLogger(__name__)
+
+# Pages per task when a long document is split into ranges
+PAGES_PER_TASK = 32
+
+# Seconds between two utilisation reports
+METRICS_INTERVAL = 1.0
+
+# A worker is replaced after this many tasks, or once it grows past this much memory
+MAX_TASKS_PER_WORKER = 1000
+MAX_WORKER_MEMORY = 1024 * 1024 * 1024
+
+
+def _get_context():
+    """
+    Return the multiprocessing context used for workers.
+
+    Where available, workers are forked from a server process that has
+    already imported the pipeline modules, so starting or recycling a
+    worker does not import them again. Otherwise workers are spawned.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["__main__", "processing.executor"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _resident_bytes():
+    """Resident memory of this process, or 0 where it cannot be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+class _WorkerState:
+    """State a worker process keeps warm between tasks."""
+
+    def __init__(self, cache_dir, use_cache):
+        self.cache = ResultCache(cache_dir) if use_cache else None
+        self.configs = {}
+        self.names = {}
+        self.pipelines = {}
+
+    def add_config(self, config_key, config_data, preload):
+        """
+        Register a configuration sent by the scheduler.
+
+        A newer version of a configuration replaces the pipeline built for
+        the previous one. The previous data is kept, so documents of a batch
+        still running with it can rebuild its pipeline.
+        """
+        self.configs[config_key] = config_data
+        name = config_data.get("name")
+        previous = self.names.get(name)
+        if previous is not None and previous != config_key:
+            self.pipelines.pop(previous, None)
+        self.names[name] = config_key
+        if preload:
+            self.pipeline(config_key)
+
+    def pipeline(self, config_key):
+        """Return the pipeline of a configuration, building it once."""
+        pipeline = self.pipelines.get(config_key)
+        if pipeline is None:
+            config = ConfigModel.from_dict(self.configs[config_key])
+            pipeline = Pipeline.from_config(config)
+            self.pipelines[config_key] = pipeline
+        return pipeline
+
+
+def _run_task(state, outbox, worker_id, task_id, config_key, path, page_range,
+              indexes, pages_per_task):
+    """
+    Process one task, splitting long documents of page-parallel pipelines.
+
+    The cache is looked up before a document is split, so a document whose
+    results are cached is never opened, and the page ranges only run the
+    steps the cache could not answer. The scheduler caches the merged
+    results of split documents.
+    """
+    pipeline = state.pipeline(config_key)
+    if page_range is not None:
+        return pipeline.run(path, page_range=page_range, indexes=indexes)
+
+    doc_hash, document = None, None
+    indexes = list(range(len(pipeline.steps)))
+    if state.cache is not None:
+        doc_hash, indexes, document = incremental.lookup(pipeline, path, state.cache)
+        if document.cached:
+            return document
+
+    if indexes and all(pipeline.steps[index].page_parallel for index in indexes):
+        pages = count_pages(path)
+        if pages > pages_per_task:
+            ranges = [(first, min(first + pages_per_task, pages))
+                      for first in range(0, pages, pages_per_task)]
+            # Hand the rest of the document back so idle workers can steal it
+            outbox.put(("split", worker_id, task_id, ranges[1:], indexes, doc_hash))
+            return pipeline.run(path, document=document, page_range=ranges[0],
+                                indexes=indexes)
+
+    document = pipeline.run(path, document=document, indexes=indexes)
+    if state.cache is not None:
+        incremental.store(state.cache, doc_hash,
+                          [pipeline.steps[index] for index in indexes],
+                          [pipeline.fingerprints[index] for index in indexes], document)
+    return document
+
+
+def _worker_main(worker_id, inbox, outbox, cache_dir, use_cache, pages_per_task,
+                 max_tasks, max_memory):
+    """Entry point of a worker process."""
+    setup_worker_logging(outbox)
+    state = _WorkerState(cache_dir, use_cache)
+    tasks = 0
+    while True:
+        message = inbox.get()
+        if message is None:
+            break
+
+        if message[0] == "config":
+            _, config_key, config_data, preload = message
+            try:
+                state.add_config(config_key, config_data, preload)
+            except Exception as e:
+                # The task that needs it reports the error
+                logger.warning("Worker %s could not build pipeline %s: %s",
+                               worker_id, config_data.get("name"), e)
+            continue
+
+        _, task_id, config_key, path, page_range, indexes = message
+        started = time.perf_counter()
+        try:
+            document = _run_task(state, outbox, worker_id, task_id, config_key,
+                                 path, page_range, indexes, pages_per_task)
+        except Exception as e:
+            document = DocumentModel(path, error=f"{type(e).__name__}: {e}")
+        tasks += 1
+
+        # Retire before leaks or fragmentation build up; the scheduler starts a fresh worker
+        retire = tasks >= max_tasks or (max_memory and _resident_bytes() > max_memory)
+        outbox.put(("done", worker_id, task_id, document.to_dict(),
+                    time.perf_counter() - started, bool(retire)))
+        if retire:
+            break
+
+
+class _Document:
+    """A document of a batch and the results of its page ranges."""
+
+    def __init__(self, batch_id, index, path, config_key):
+        self.batch_id = batch_id
+        self.index = index
+        self.path = path
+        self.config_key = config_key
+        self.remaining = 1
+        self.partials = []
+        # Set when the document is split: the steps its ranges run, and the
+        # hash of its contents the merged results are cached under
+        self.indexes = None
+        self.doc_hash = None
+
+
+class _Worker:
+    """Parent-side handle and statistics of a worker process."""
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.process = None
+        self.inbox = None
+        self.known = set()
+        self.retiring = False
+        self.deque = deque()
+        self.running = None
+        self.busy = 0.0
+        self.busy_reported = 0.0
+        self.tasks = 0
+        self.steals = 0
+        self.recycled = 0
+
+
+class WorkStealingExecutor:
+    """
+    Runs document tasks on long-lived worker processes.
+
+    Every worker has its own deque of tasks in the scheduler. A worker
+    takes its next task from the back of its own deque and, when that is
+    empty, steals from the front of the fullest deque. Long documents of
+    page-parallel pipelines are split into page ranges by the worker that
+    opens them, so one 800-page document ends up spread over every idle
+    worker instead of keeping one busy while the rest wait.
+
+    Workers stay warm between batches: each configuration is sent to a
+    worker once, after which tasks only carry a document reference.
+    Preloaded configurations are built as soon as a worker starts and
+    rebuilt when a new version is preloaded. A worker is recycled after
+    ``max_tasks`` tasks or once its resident memory passes ``max_memory``.
+
+    Workers look a document up in the result cache before splitting it;
+    the merged results of split documents are cached by the scheduler.
+    """
+
+    def __init__(self, max_workers=None, cache_dir=None, use_cache=True,
+                 pages_per_task=PAGES_PER_TASK, on_document=None, on_metrics=None,
+                 max_tasks=MAX_TASKS_PER_WORKER, max_memory=MAX_WORKER_MEMORY):
+        """
+        Initialize the executor and start its workers.
+
+        Args:
+            max_workers: Number of worker processes. If None, uses all cores.
+            cache_dir: Directory of the result cache. If None, uses the default.
+            use_cache: Reuse the results of documents processed before
+            pages_per_task: Pages per task when a document is split
+            on_document: Callable(batch_id, index, DocumentModel) called when
+                a document is complete
+            on_metrics: Optional callable(list of dict) with per-worker
+                utilisation, called about once per second
+            max_tasks: Tasks a worker runs before it is replaced
+            max_memory: Resident bytes above which a worker is replaced,
+                or None for no limit
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self.pages_per_task = pages_per_task
+        self.on_document = on_document
+        self.on_metrics = on_metrics
+        self.max_tasks = max_tasks
+        self.max_memory = max_memory
+
+        # Workers never fork from the GUI process, whose threads and locks they would inherit
+        self.context = _get_context()
+        self.outbox = self.context.Queue()
+        self.cache = ResultCache(cache_dir) if use_cache else None
+        self.configs = {}
+        self.preloaded = {}
+        self.tasks = {}
+        # Documents not yet reported per batch, and the batches cancelled among them
+        self.batches = {}
+        self.cancelled = set()
+        self.task_ids = itertools.count()
+        self.lock = threading.Lock()
+        self.closed = False
+
+        self.workers = [_Worker(worker_id) for worker_id in range(self.max_workers)]
+        with self.lock:
+            for worker in self.workers:
+                self._start_worker(worker)
+
+        self.scheduler = threading.Thread(
+            target=self._schedule, name="flexipy-scheduler", daemon=True
+        )
+        self.scheduler.start()
+
+    def preload(self, configs):
+        """
+        Build the pipelines of configurations on every worker ahead of use.
+
+        Preloading a new version of a configuration replaces the previous
+        one; batches already running keep the version they started with.
+
+        Args:
+            configs: Iterable of ConfigModel
+        """
+        with self.lock:
+            for config in configs:
+                config_key = config.content_hash()
+                self.configs[config_key] = config.to_dict()
+                self.preloaded[config.name] = config_key
+                for worker in self.workers:
+                    self._send_config(worker, config_key, preload=True)
+
+    def submit(self, batch_id, config, paths):
+        """
+        Queue the documents of a batch.
+
+        Args:
+            batch_id: Identifier of the batch
+            config: ConfigModel whose pipeline is applied
+            paths: Paths of the documents
+        """
+        config_key = config.content_hash()
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Executor is shut down")
+            self.configs[config_key] = config.to_dict()
+            self.cancelled.discard(batch_id)
+            self.batches[batch_id] = self.batches.get(batch_id, 0) + len(paths)
+            for index, path in enumerate(paths):
+                document = _Document(batch_id, index, path, config_key)
+                task_id = next(self.task_ids)
+                self.tasks[task_id] = (document, None)
+                # Deal documents out round-robin; stealing evens out the rest
+                self.workers[index % len(self.workers)].deque.append(task_id)
+        self.outbox.put(("wake",))
+
+    def cancel(self, batch_id):
+        """
+        Drop the queued tasks of a batch. Running tasks are left to finish.
+
+        Args:
+            batch_id: Identifier of the batch
+        """
+        finished = []
+        with self.lock:
+            if batch_id not in self.batches:
+                return
+            # Ranges split off a running document later are dropped too
+            self.cancelled.add(batch_id)
+            for worker in self.workers:
+                kept = deque()
+                for task_id in worker.deque:
+                    document, page_range = self.tasks[task_id]
+                    if document.batch_id != batch_id:
+                        kept.append(task_id)
+                        continue
+                    del self.tasks[task_id]
+                    done = self._add_partial(document, page_range, {
+                        "path": document.path, "error": "Cancelled"
+                    })
+                    if done:
+                        finished.append(done)
+                worker.deque = kept
+        for document in finished:
+            self._report(document)
+
+    def shutdown(self, wait=True):
+        """
+        Stop the workers.
+
+        Args:
+            wait: Wait for the worker processes to exit
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+        self.outbox.put(("stop",))
+        self.scheduler.join()
+        for worker in self.workers:
+            worker.inbox.put(None)
+        if wait:
+            for worker in self.workers:
+                worker.process.join()
+
+    def _start_worker(self, worker):
+        """Start, or restart, the process of a worker. Called with the lock held."""
+        if worker.inbox is not None:
+            # Messages left for a retired worker are never read; do not wait on them at exit
+            worker.inbox.cancel_join_thread()
+        worker.inbox = self.context.Queue()
+        worker.known = set()
+        worker.retiring = False
+        worker.running = None
+        worker.process = self.context.Process(
+            target=_worker_main,
+            args=(worker.worker_id, worker.inbox, self.outbox,
+                  self.cache_dir, self.use_cache, self.pages_per_task,
+                  self.max_tasks, self.max_memory),
+            name=f"flexipy-worker-{worker.worker_id}",
+            daemon=True
+        )
+        worker.process.start()
+        for config_key in self.preloaded.values():
+            self._send_config(worker, config_key, preload=True)
+
+    def _send_config(self, worker, config_key, preload=False):
+        """Send a configuration to a worker. Called with the lock held."""
+        worker.inbox.put(("config", config_key, self.configs[config_key], preload))
+        worker.known.add(config_key)
+
+    def _schedule(self):
+        """Scheduler loop: collects results and keeps every worker busy."""
+        last_metrics = time.monotonic()
+        while True:
+            try:
+                message = self.outbox.get(timeout=METRICS_INTERVAL / 2)
+            except queue.Empty:
+                message = None
+
+            if message is not None and not self._handle(message):
+                return
+
+            self._recycle_workers()
+            self._check_workers()
+            self._dispatch()
+
+            now = time.monotonic()
+            if now - last_metrics >= METRICS_INTERVAL:
+                self._report_metrics(now - last_metrics)
+                last_metrics = now
+
+    def _handle(self, message):
+        """Act on a message from a worker. Returns False for the stop message."""
+        kind = message[0]
+        if kind == "stop":
+            return False
+        if kind == "split":
+            self._on_split(*message[1:])
+        elif kind == "done":
+            self._on_done(*message[1:])
+        elif kind == "log":
+            handle_worker_record(message[1])
+        return True
+
+    def _drain(self):
+        """Handle the messages already in the outbox. Returns False if stop was among them."""
+        while True:
+            try:
+                message = self.outbox.get_nowait()
+            except queue.Empty:
+                return True
+            if not self._handle(message):
+                return False
+
+    def _dispatch(self):
+        """Give a task to every idle worker that can get one."""
+        with self.lock:
+            for worker in self.workers:
+                if worker.running is not None or worker.retiring:
+                    continue
+                task_id = self._next_task(worker)
+                if task_id is None:
+                    # Nothing left anywhere, so no other idle worker gets work either
+                    return
+                document, page_range = self.tasks[task_id]
+                if document.config_key not in worker.known:
+                    self._send_config(worker, document.config_key)
+                worker.running = task_id
+                worker.inbox.put(("task", task_id, document.config_key,
+                                  document.path, page_range, document.indexes))
+
+    def _next_task(self, worker):
+        """Pop a task from the worker's own deque or steal one. Called with the lock held."""
+        if worker.deque:
+            return worker.deque.pop()
+        victim = max(self.workers, key=lambda other: len(other.deque))
+        if not victim.deque:
+            return None
+        worker.steals += 1
+        return victim.deque.popleft()
+
+    def _on_split(self, worker_id, task_id, ranges, indexes=None, doc_hash=None):
+        """Queue the remaining page ranges of a document on the worker that split it."""
+        with self.lock:
+            document, _ = self.tasks[task_id]
+            # The task itself now covers the first range
+            self.tasks[task_id] = (document, (0, ranges[0][0]))
+            document.remaining += len(ranges)
+            document.indexes = indexes
+            document.doc_hash = doc_hash
+            if document.batch_id in self.cancelled:
+                for page_range in ranges:
+                    self._add_partial(document, page_range, {
+                        "path": document.path, "error": "Cancelled"
+                    })
+                return
+            worker = self.workers[worker_id]
+            for page_range in ranges:
+                range_task = next(self.task_ids)
+                self.tasks[range_task] = (document, page_range)
+                worker.deque.append(range_task)
+
+    def _on_done(self, worker_id, task_id, result, busy, retire=False):
+        """Record a finished task."""
+        with self.lock:
+            entry = self.tasks.pop(task_id, None)
+            if entry is None:
+                # Already failed when its worker was found dead; the worker
+                # handle belongs to the replacement process by now
+                return
+            document, page_range = entry
+            worker = self.workers[worker_id]
+            worker.running = None
+            worker.retiring = retire
+            worker.busy += busy
+            worker.tasks += 1
+            done = self._add_partial(document, page_range, result)
+        if done:
+            self._report(done)
+
+    def _add_partial(self, document, page_range, result):
+        """Store the result of a range; return the document once it is complete."""
+        first = page_range[0] if page_range else 0
+        document.partials.append((first, result))
+        document.remaining -= 1
+        if document.remaining:
+            return None
+
+        batch_id = document.batch_id
+        self.batches[batch_id] -= 1
+        if not self.batches[batch_id]:
+            del self.batches[batch_id]
+            self.cancelled.discard(batch_id)
+        return document
+
+    def _report(self, document):
+        """Merge the partial results of a document and report it."""
+        partials = [result for _, result in sorted(document.partials, key=lambda p: p[0])]
+        if len(partials) == 1:
+            merged = DocumentModel.from_dict(partials[0])
+        else:
+            merged = DocumentModel(document.path)
+            errors = [partial.get("error") for partial in partials if partial.get("error")]
+            if errors:
+                merged.error = errors[0]
+            else:
+                for key in partials[0].get("results", {}):
+                    # Results reused from the cache only come with the first range
+                    values = [partial["results"][key] for partial in partials
+                              if key in partial.get("results", {})]
+                    merged.results[key] = (values[0] if len(values) == 1
+                                           else STEP_TYPES[key].merge(values))
+                if self.cache is not None and document.doc_hash is not None:
+                    self._store(document, merged)
+        if self.on_document is not None:
+            self.on_document(document.batch_id, document.index, merged)
+
+    def _store(self, document, merged):
+        """Cache the merged results of a split document."""
+        with self.lock:
+            specs = self.configs[document.config_key].get("steps", [])
+        fingerprints = fingerprint_steps(specs)
+        indexes = document.indexes
+        try:
+            incremental.store(self.cache, document.doc_hash,
+                              [STEP_TYPES[specs[index].get("type")] for index in indexes],
+                              [fingerprints[index] for index in indexes], merged)
+        except Exception as e:
+            logger.warning("Error caching the results of %s: %s", document.path, e)
+
+    def _recycle_workers(self):
+        """Replace the workers that retired after their last task."""
+        for worker in self.workers:
+            if not worker.retiring or self.closed:
+                continue
+            worker.process.join()
+            with self.lock:
+                self._start_worker(worker)
+                worker.recycled += 1
+
+    def _check_workers(self):
+        """
+        Restart workers that died and fail the task they were running.
+
+        A worker that retires exits with code 0 once its last result is
+        written to the outbox, which the scheduler may not have read yet;
+        that result marks it as retiring and _recycle_workers replaces it.
+        """
+        for worker in self.workers:
+            if self.closed or worker.retiring or worker.process.is_alive():
+                continue
+            if worker.process.exitcode == 0:
+                continue
+            # Results the worker sent before it died still count
+            if not self._drain():
+                self.outbox.put(("stop",))
+                return
+            if worker.retiring:
+                continue
+            logger.warning("Worker %s exited with code %s; restarting it",
+                           worker.worker_id, worker.process.exitcode)
+            task_id = worker.running
+            with self.lock:
+                self._start_worker(worker)
+            if task_id is not None and task_id in self.tasks:
+                self._on_done(worker.worker_id, task_id, {
+                    "path": self.tasks[task_id][0].path,
+                    "error": "Worker process crashed"
+                }, 0.0)
+
+    def _report_metrics(self, interval):
+        """Report how busy each worker was since the last report."""
+        if self.on_metrics is None:
+            return
+        with self.lock:
+            metrics = []
+            for worker in self.workers:
+                busy = worker.busy - worker.busy_reported
+                worker.busy_reported = worker.busy
+                metrics.append({
+                    "worker": worker.worker_id,
+                    "utilisation": min(1.0, busy / interval),
+                    "tasks": worker.tasks,
+                    "steals": worker.steals,
+                    "recycled": worker.recycled,
+                    "queued": len(worker.deque),
+                })
+        self.on_metrics(metrics)
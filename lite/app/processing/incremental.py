@@ -0,0 +1,109 @@
+"""
+Incremental document processing.
+Reruns only the steps of a pipeline whose fingerprint changed since a document was last processed.
+"""
+from models.document_model import DocumentModel
+from processing.result_cache import hash_file
+
+
+def run_incremental(pipeline, path, cache):
+    """
+    Process a document, reusing the cached results of unchanged steps.
+
+    The results of every step are cached under the document hash and the
+    step's fingerprint, so a document seen before under any name, or
+    processed with an earlier version of the configuration, only reruns
+    the steps that changed, like a build system. Steps that cannot be
+    cached run every time without stopping the steps after them from
+    being reused.
+
+    Args:
+        pipeline: Pipeline built with step fingerprints
+        path: Path of the document
+        cache: ResultCache holding per-step results
+
+    Returns:
+        DocumentModel: The processed document; ``cached`` is True when no
+        step had to run
+    """
+    try:
+        doc_hash, indexes, document = lookup(pipeline, path, cache)
+    except IOError as e:
+        return DocumentModel(path, error=f"{type(e).__name__}: {e}")
+
+    if not indexes:
+        return document
+
+    document = pipeline.run(path, document=document, indexes=indexes)
+    store(cache, doc_hash, [pipeline.steps[index] for index in indexes],
+          [pipeline.fingerprints[index] for index in indexes], document)
+    return document
+
+
+def lookup(pipeline, path, cache):
+    """
+    Work out which steps of a document have to run.
+
+    A step runs if it cannot be cached, or if it or a cacheable step
+    before it missed the cache. A page-rewriting step also runs when a
+    later step does, since rewritten pages are not stored and the later
+    step needs them.
+
+    Args:
+        pipeline: Pipeline built with step fingerprints
+        path: Path of the document
+        cache: ResultCache holding per-step results
+
+    Returns:
+        tuple: (document hash, indexes of the steps to run in order,
+        DocumentModel holding the results of the other steps). ``cached``
+        is set on the document when no step has to run.
+
+    Raises:
+        IOError: If the document cannot be read
+    """
+    doc_hash = hash_file(path)
+    steps = pipeline.steps
+
+    cached = {}
+    missed = len(steps)
+    for index, (step, fingerprint) in enumerate(zip(steps, pipeline.fingerprints)):
+        if not step.cacheable:
+            continue
+        results = cache.get(doc_hash, fingerprint)
+        if results is None:
+            missed = index
+            break
+        cached[index] = results
+
+    indexes = [index for index, step in enumerate(steps)
+               if index >= missed or not step.cacheable]
+    if indexes:
+        indexes = sorted(set(indexes).union(
+            index for index in range(indexes[-1]) if steps[index].rewrites_pages
+        ))
+
+    document = DocumentModel(path)
+    for index, results in cached.items():
+        if index not in indexes:
+            document.results.update(results)
+    document.cached = not indexes
+    return doc_hash, indexes, document
+
+
+def store(cache, doc_hash, steps, fingerprints, document):
+    """
+    Cache the results of the cacheable steps of a processed document.
+
+    Args:
+        cache: ResultCache holding per-step results
+        doc_hash: Hash of the document, from lookup
+        steps: Steps that ran, as instances or classes
+        fingerprints: Fingerprint of each of those steps
+        document: DocumentModel holding their results
+    """
+    if document.error is not None:
+        return
+    for step, fingerprint in zip(steps, fingerprints):
+        if step.cacheable and step.step_type in document.results:
+            cache.put(doc_hash, fingerprint, {step.step_type: document.results[step.step_type]})
@@ -0,0 +1,325 @@
+"""
+Batch ingestion service.
+Watches input folders, claims files once they stop changing and dispatches them in batches.
+"""
+import logging
+import os
+import threading
+import time
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+# Subfolder of each input folder that claimed files are moved into
+CLAIMED_DIR_NAME = ".flexipy-claimed"
+
+# File in the claimed folder listing the claimed files that were dispatched
+DISPATCHED_LOG_NAME = "dispatched.log"
+
+# Suffixes of files that are still being written by their producer
+PARTIAL_SUFFIXES = (".part", ".tmp", ".crdownload", ".partial")
+
+
+def _is_candidate(name):
+    """Return True if a file name looks like a finished document."""
+    return not name.startswith(".") and not name.lower().endswith(PARTIAL_SUFFIXES)
+
+
+class _WatchState:
+    """Files seen in one input folder and not yet claimed."""
+
+    def __init__(self, config):
+        self.config = config
+        self.input_dir = os.path.abspath(os.path.expanduser(config.input_dir))
+        self.claimed_dir = os.path.join(self.input_dir, CLAIMED_DIR_NAME)
+        self.dispatched_log = os.path.join(self.claimed_dir, DISPATCHED_LOG_NAME)
+        # path -> (size, mtime, time the signature last changed)
+        self.pending = {}
+        # Claimed paths waiting to be dispatched, and when the oldest arrived
+        self.batch = []
+        self.batch_started = None
+
+
+class _EventHandler(FileSystemEventHandler):
+    """Forwards watchdog events to the service as dirty paths."""
+
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.service.mark_dirty(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.service.mark_dirty(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.service.mark_dirty(event.dest_path)
+
+
+class IngestionService:
+    """
+    Turns files dropped into input folders into document batches.
+
+    Filesystem events only mark paths as dirty; a single background thread
+    checks dirty paths on a fixed tick, so a burst of thousands of files
+    costs one stat per file per tick rather than a timer per file. A file
+    is claimed once its size and mtime have not changed for
+    ``settle_time`` seconds, by renaming it into a private subfolder. The
+    rename is atomic, so a file can only ever be claimed once, even with
+    several services watching the same folder.
+
+    Claimed files are listed in the folder's dispatch log once their batch
+    has been handed over. Files claimed by an earlier run that never made
+    it into a dispatched batch, because the service was stopped without
+    flushing or the process died, are dispatched again on start.
+
+    Without the optional watchdog package the folders are rescanned on
+    every ``rescan_interval`` instead of receiving events.
+    """
+
+    def __init__(self, configs, dispatch, settle_time=2.0, batch_size=100,
+                 max_batch_wait=5.0, tick=0.5, rescan_interval=5.0):
+        """
+        Initialize the ingestion service.
+
+        Args:
+            configs: ConfigModel instances whose input_dir is watched
+            dispatch: Callable(config, paths) that receives each batch
+            settle_time: Seconds a file must stay unchanged before it is claimed
+            batch_size: Maximum number of files per batch
+            max_batch_wait: Seconds before a partial batch is dispatched anyway
+            tick: Seconds between checks of the pending files
+            rescan_interval: Seconds between full folder scans when watchdog
+                is not available
+        """
+        self.dispatch = dispatch
+        self.settle_time = settle_time
+        self.batch_size = batch_size
+        self.max_batch_wait = max_batch_wait
+        self.tick = tick
+        self.rescan_interval = rescan_interval
+
+        self.watches = [_WatchState(config) for config in configs if config.input_dir]
+        self.dirty = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.observer = None
+
+    def start(self):
+        """Start watching the input folders."""
+        if self.thread is not None:
+            return
+
+        for watch in self.watches:
+            os.makedirs(watch.claimed_dir, exist_ok=True)
+            self._recover(watch)
+            # Files already waiting in the folder when the service starts
+            self._scan(watch)
+
+        if Observer is not None and self.watches:
+            self.observer = Observer()
+            handler = _EventHandler(self)
+            for watch in self.watches:
+                self.observer.schedule(handler, watch.input_dir, recursive=False)
+            self.observer.start()
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self._run, name="flexipy-ingestion", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self, flush=True):
+        """
+        Stop watching.
+
+        Args:
+            flush: Dispatch claimed files that are still waiting for a batch
+        """
+        self.stop_event.set()
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if flush:
+            for watch in self.watches:
+                self._flush(watch)
+
+    def mark_dirty(self, path):
+        """
+        Record that a path may have changed. Safe to call from any thread.
+
+        Args:
+            path: Path of the file
+        """
+        with self.lock:
+            self.dirty.add(os.path.abspath(path))
+
+    def _run(self):
+        """Background loop that settles, claims and batches files."""
+        last_scan = time.monotonic()
+        while not self.stop_event.wait(self.tick):
+            now = time.monotonic()
+            if self.observer is None and now - last_scan >= self.rescan_interval:
+                for watch in self.watches:
+                    self._scan(watch)
+                last_scan = now
+
+            with self.lock:
+                dirty, self.dirty = self.dirty, set()
+
+            for watch in self.watches:
+                self._update(watch, dirty, now)
+                self._claim_settled(watch, now)
+                if watch.batch and now - watch.batch_started >= self.max_batch_wait:
+                    self._flush(watch)
+
+    def _recover(self, watch):
+        """Dispatch the files claimed by an earlier run that were never dispatched."""
+        claimed = []
+        for claim in _scandir(watch.claimed_dir):
+            if claim.is_dir():
+                claimed.extend(os.path.relpath(entry.path, watch.claimed_dir)
+                               for entry in _scandir(claim.path) if entry.is_file())
+        claimed.sort()
+
+        try:
+            with open(watch.dispatched_log, "r", encoding="utf-8") as f:
+                dispatched = {line.rstrip("\n") for line in f}
+        except FileNotFoundError:
+            # Claims made before the log existed cannot be told apart; keep them as they are
+            self._write_dispatched(watch, claimed, "w")
+            return
+        except OSError as e:
+            # Without the log every claimed file would be dispatched again
+            logger.error("Error reading dispatch log %s: %s", watch.dispatched_log, e)
+            return
+
+        undispatched = [name for name in claimed if name not in dispatched]
+        # Drop the entries of files that are gone, so the log does not grow forever
+        if len(claimed) - len(undispatched) < len(dispatched):
+            self._write_dispatched(watch, [name for name in claimed if name in dispatched], "w")
+
+        if undispatched:
+            logger.info("Dispatching %d file(s) claimed but not dispatched in %s",
+                        len(undispatched), watch.input_dir)
+        for first in range(0, len(undispatched), self.batch_size):
+            watch.batch = [os.path.join(watch.claimed_dir, name)
+                           for name in undispatched[first:first + self.batch_size]]
+            self._flush(watch)
+
+    def _scan(self, watch):
+        """Mark every candidate file of a folder as dirty."""
+        try:
+            with os.scandir(watch.input_dir) as entries:
+                paths = [entry.path for entry in entries
+                         if _is_candidate(entry.name) and entry.is_file()]
+        except OSError as e:
+            logger.error("Error scanning input folder %s: %s", watch.input_dir, e)
+            return
+        with self.lock:
+            self.dirty.update(paths)
+
+    def _update(self, watch, dirty, now):
+        """Refresh the signature of the dirty files that belong to a folder."""
+        for path in dirty:
+            if os.path.dirname(path) != watch.input_dir:
+                continue
+            if not _is_candidate(os.path.basename(path)):
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                watch.pending.pop(path, None)
+                continue
+
+            previous = watch.pending.get(path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if previous is None or previous[:2] != signature:
+                watch.pending[path] = signature + (now,)
+
+    def _claim_settled(self, watch, now):
+        """Claim the files whose signature has been stable long enough."""
+        settled = [path for path, (_, _, changed) in watch.pending.items()
+                   if now - changed >= self.settle_time]
+        if not settled:
+            return
+
+        # Re-check the signatures; a file may have changed without an event
+        claim_dir = None
+        for path in settled:
+            size, mtime_ns, _ = watch.pending.pop(path)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                watch.pending[path] = (stat.st_size, stat.st_mtime_ns, now)
+                continue
+
+            if claim_dir is None:
+                claim_dir = os.path.join(watch.claimed_dir, str(time.time_ns()))
+                os.makedirs(claim_dir, exist_ok=True)
+
+            target = os.path.join(claim_dir, os.path.basename(path))
+            try:
+                os.rename(path, target)
+            except FileNotFoundError:
+                # Someone else claimed or removed it first
+                continue
+            except OSError as e:
+                logger.error("Error claiming %s: %s", path, e)
+                continue
+
+            if not watch.batch:
+                watch.batch_started = now
+            watch.batch.append(target)
+            if len(watch.batch) >= self.batch_size:
+                self._flush(watch)
+
+    def _flush(self, watch):
+        """Dispatch the claimed files of a folder as one batch."""
+        if not watch.batch:
+            return
+        batch, watch.batch = watch.batch, []
+        watch.batch_started = None
+        try:
+            self.dispatch(watch.config, batch)
+        except Exception as e:
+            # The files stay out of the log and are dispatched again on the next start
+            logger.exception("Error dispatching batch from %s: %s", watch.input_dir, e)
+            return
+        self._write_dispatched(
+            watch, [os.path.relpath(path, watch.claimed_dir) for path in batch], "a"
+        )
+
+    def _write_dispatched(self, watch, names, mode):
+        """Append names to the dispatch log of a folder, or rewrite it with mode "w"."""
+        try:
+            with open(watch.dispatched_log, mode, encoding="utf-8") as f:
+                f.writelines(f"{name}\n" for name in names)
+        except OSError as e:
+            logger.error("Error writing dispatch log %s: %s", watch.dispatched_log, e)
+
+
+def _scandir(path):
+    """List a directory, returning nothing if it cannot be read."""
+    try:
+        with os.scandir(path) as entries:
+            return list(entries)
+    except OSError:
+        return []
@@ -0,0 +1,286 @@
+"""
+Persistent job queue.
+Stores document batches in a local SQLite database so they survive a crash of the application.
+"""
+import json
+import os
+import threading
+import time
+
+from utils.database import connect_sqlite
+
+JOB_PENDING = "pending"
+JOB_CLAIMED = "claimed"
+JOB_DONE = "done"
+JOB_DEAD = "dead"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    visible_at REAL NOT NULL,
+    claimed_by TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_visible ON jobs (status, visible_at);
+"""
+
+
+class Job:
+    """A claimed job."""
+
+    def __init__(self, job_id, job_key, payload, attempts):
+        self.job_id = job_id
+        self.job_key = job_key
+        self.payload = payload
+        self.attempts = attempts
+
+
+class JobQueue:
+    """
+    Crash-safe job queue backed by SQLite in WAL mode.
+
+    Jobs are claimed for a visibility timeout. A job that is not acked
+    before the timeout expires becomes claimable again, so work held by a
+    process that was killed is picked up by the next one. Jobs are
+    identified by a caller-chosen key and enqueueing an existing key is a
+    no-op, which makes resuming after a crash idempotent.
+    """
+
+    def __init__(self, db_path=None, visibility_timeout=300.0, max_attempts=3):
+        """
+        Initialize the job queue.
+
+        Args:
+            db_path: Path of the database. If None, uses ~/.flexipy/jobs.db.
+            visibility_timeout: Seconds a claimed job stays invisible to others
+            max_attempts: Claims allowed before a job is marked dead
+        """
+        if db_path is None:
+            db_path = os.path.join(os.path.expanduser("~"), ".flexipy", "jobs.db")
+
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.local = threading.local()
+
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self):
+        """Return the connection of the calling thread."""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = connect_sqlite(self.db_path)
+            self.local.conn = conn
+        return conn
+
+    def enqueue(self, job_key, payload):
+        """
+        Add a job unless one with the same key already exists.
+
+        Args:
+            job_key: Unique key of the job
+            payload: JSON-serializable job data
+
+        Returns:
+            bool: True if the job was added
+        """
+        return self.enqueue_many([(job_key, payload)]) == 1
+
+    def enqueue_many(self, jobs):
+        """
+        Add several jobs in one transaction.
+
+        Args:
+            jobs: Iterable of (job_key, payload) tuples
+
+        Returns:
+            int: Number of jobs added
+        """
+        now = time.time()
+        rows = [(key, json.dumps(payload), JOB_PENDING, now, now, now)
+                for key, payload in jobs]
+        conn = self._connection()
+        with _transaction(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs "
+                "(job_key, payload, status, visible_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+
+    def claim(self, worker_id="", limit=1, visibility_timeout=None):
+        """
+        Claim jobs that are pending or whose previous claim has expired.
+
+        Args:
+            worker_id: Identifier stored with the claim
+            limit: Maximum number of jobs to claim
+            visibility_timeout: Seconds before the claim expires. If None,
+                uses the queue default.
+
+        Returns:
+            list: Claimed Job instances, oldest first
+        """
+        now = time.time()
+        timeout = self.visibility_timeout if visibility_timeout is None else visibility_timeout
+        conn = self._connection()
+
+        with _transaction(conn, immediate=True):
+            # Expired claims that used up their attempts will not be retried
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = COALESCE(error, 'Visibility timeout'), "
+                "updated_at = ? WHERE status = ? AND visible_at <= ? AND attempts >= ?",
+                (JOB_DEAD, now, JOB_CLAIMED, now, self.max_attempts)
+            )
+            rows = conn.execute(
+                "SELECT id, job_key, payload, attempts FROM jobs "
+                "WHERE status IN (?, ?) AND visible_at <= ? ORDER BY id LIMIT ?",
+                (JOB_PENDING, JOB_CLAIMED, now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, visible_at = ?, "
+                "claimed_by = ?, updated_at = ? WHERE id = ?",
+                [(JOB_CLAIMED, now + timeout, worker_id, now, row[0]) for row in rows]
+            )
+
+        return [Job(job_id, key, json.loads(payload), attempts + 1)
+                for job_id, key, payload, attempts in rows]
+
+    def extend(self, job_id, visibility_timeout=None):
+        """
+        Push back the expiry of a claim that is still being worked on.
+
+        Args:
+            job_id: Identifier of the job
+            visibility_timeout: Seconds from now. If None, uses the queue default.
+        """
+        now = time.time()
+        timeout = self.visibility_timeout if visibility_timeout is None else visibility_timeout
+        self._connection().execute(
+            "UPDATE jobs SET visible_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (now + timeout, now, job_id, JOB_CLAIMED)
+        )
+
+    def ack(self, job_id):
+        """
+        Mark a job as done.
+
+        Args:
+            job_id: Identifier of the job
+        """
+        self._connection().execute(
+            "UPDATE jobs SET status = ?, error = NULL, updated_at = ? WHERE id = ?",
+            (JOB_DONE, time.time(), job_id)
+        )
+
+    def fail(self, job_id, error, retry_delay=0.0):
+        """
+        Record a failed attempt, retrying the job while it has attempts left.
+
+        Args:
+            job_id: Identifier of the job
+            error: Description of the failure
+            retry_delay: Seconds before the job can be claimed again
+        """
+        now = time.time()
+        self._connection().execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "error = ?, visible_at = ?, updated_at = ? WHERE id = ?",
+            (self.max_attempts, JOB_DEAD, JOB_PENDING, error, now + retry_delay, now, job_id)
+        )
+
+    def release_claims(self, worker_id=None):
+        """
+        Make claimed jobs visible again straight away.
+
+        Used at startup by the single owner of the queue, whose previous
+        process can no longer be working on them. Claims that used up their
+        attempts are marked dead instead, so a job that takes the process
+        down with it is not retried forever.
+
+        Args:
+            worker_id: Only release the claims of this worker. If None,
+                releases all claims.
+
+        Returns:
+            int: Number of jobs released
+        """
+        now = time.time()
+        where = "WHERE status = ?"
+        params = [JOB_CLAIMED]
+        if worker_id is not None:
+            where += " AND claimed_by = ?"
+            params.append(worker_id)
+
+        conn = self._connection()
+        with _transaction(conn, immediate=True):
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = COALESCE(error, 'Claim released "
+                "after the last attempt'), updated_at = ? " + where + " AND attempts >= ?",
+                [JOB_DEAD, now] + params + [self.max_attempts]
+            )
+            return conn.execute(
+                "UPDATE jobs SET status = ?, visible_at = ?, updated_at = ? " + where,
+                [JOB_PENDING, 0.0, now] + params
+            ).rowcount
+
+    def counts(self):
+        """
+        Count jobs by status.
+
+        Returns:
+            dict: Number of jobs per status
+        """
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+        ).fetchall()
+        return dict(rows)
+
+    def purge_done(self, older_than=0.0):
+        """
+        Delete finished jobs.
+
+        Args:
+            older_than: Only delete jobs finished more than this many seconds ago
+
+        Returns:
+            int: Number of jobs deleted
+        """
+        return self._connection().execute(
+            "DELETE FROM jobs WHERE status = ? AND updated_at <= ?",
+            (JOB_DONE, time.time() - older_than)
+        ).rowcount
+
+    def close(self):
+        """Close the connection of the calling thread."""
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+
+class _transaction:
+    """Context manager for an explicit transaction on an autocommit connection."""
+
+    def __init__(self, conn, immediate=False):
+        self.conn = conn
+        self.immediate = immediate
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE" if self.immediate else "BEGIN")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
@@ -0,0 +1,152 @@
+"""
+Page sources for document processing.
+Yields the pages of a document one at a time so it never has to be loaded whole.
+"""
+import mmap
+import os
+
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+PDF_EXTENSIONS = (".pdf",)
+IMAGE_EXTENSIONS = (".tif", ".tiff", ".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp")
+
+# Size of the blocks other files are streamed in
+RAW_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+class Page:
+    """One page of a document."""
+
+    def __init__(self, index, data, width=0, height=0, mode="raw"):
+        """
+        Initialize a page.
+
+        Args:
+            index: Zero-based position of the page in the document
+            data: Pixel data, or the raw bytes of the block for other files.
+                Usually a memoryview into a mapped file or shared buffer.
+            width: Width in pixels, 0 for raw blocks
+            height: Height in pixels, 0 for raw blocks
+            mode: Pixel format such as "RGB" or "L", or "raw"
+        """
+        self.index = index
+        self.data = data
+        self.width = width
+        self.height = height
+        self.mode = mode
+        # Object the data is a view into, kept alive as long as the page
+        self.owner = None
+
+    def release(self):
+        """Drop the page's hold on its data once the page is no longer needed."""
+        self.owner = None
+
+
+def count_pages(path, block_size=RAW_BLOCK_SIZE):
+    """
+    Count the pages of a document without decoding them.
+
+    Args:
+        path: Path of the document
+        block_size: Size of the blocks raw files are split into
+
+    Returns:
+        int: Number of pages iter_pages would yield
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in PDF_EXTENSIONS and fitz is not None:
+        with fitz.open(path) as document:
+            return document.page_count
+    if extension in IMAGE_EXTENSIONS and Image is not None:
+        with Image.open(path) as image:
+            return getattr(image, "n_frames", 1)
+    return -(-os.path.getsize(path) // block_size)
+
+
+def iter_pages(path, dpi=150, block_size=RAW_BLOCK_SIZE, page_range=None):
+    """
+    Yield the pages of a document one at a time.
+
+    PDFs are rasterized with PyMuPDF and images are decoded frame by frame
+    with Pillow when those packages are installed. Any other file is
+    memory-mapped and yielded as fixed-size blocks that are memoryview
+    slices of the mapping, so no page data is copied.
+
+    Args:
+        path: Path of the document
+        dpi: Resolution PDF pages are rasterized at
+        block_size: Size of the blocks raw files are split into
+        page_range: Optional (first, stop) range of page indexes to yield
+
+    Yields:
+        Page: The next page of the document
+    """
+    first, stop = page_range or (0, None)
+    extension = os.path.splitext(path)[1].lower()
+    if extension in PDF_EXTENSIONS and fitz is not None:
+        yield from _iter_pdf_pages(path, dpi, first, stop)
+    elif extension in IMAGE_EXTENSIONS and Image is not None:
+        yield from _iter_image_pages(path, first, stop)
+    else:
+        yield from _iter_raw_blocks(path, block_size, first, stop)
+
+
+def _iter_pdf_pages(path, dpi, first, stop):
+    """Rasterize the pages of a PDF one at a time."""
+    with fitz.open(path) as document:
+        stop = document.page_count if stop is None else min(stop, document.page_count)
+        for index in range(first, stop):
+            pdf_page = document[index]
+            pixmap = pdf_page.get_pixmap(dpi=dpi, alpha=False)
+            mode = "L" if pixmap.n == 1 else "RGB"
+            # samples_mv exposes the pixmap buffer without copying it; the
+            # page keeps the pixmap alive for as long as it uses the view
+            samples = getattr(pixmap, "samples_mv", None) or pixmap.samples
+            page = Page(index, samples, pixmap.width, pixmap.height, mode)
+            page.owner = pixmap
+            yield page
+            del pixmap
+
+
+def _iter_image_pages(path, first, stop):
+    """Decode the frames of an image one at a time."""
+    with Image.open(path) as image:
+        frames = getattr(image, "n_frames", 1)
+        stop = frames if stop is None else min(stop, frames)
+        for index in range(first, stop):
+            image.seek(index)
+            frame = image
+            if frame.mode not in ("L", "RGB", "RGBA"):
+                frame = frame.convert("RGB")
+            # tobytes is the one copy out of the decoder, and the page owns it
+            yield Page(index, frame.tobytes(), frame.width, frame.height, frame.mode)
+
+
+def _iter_raw_blocks(path, block_size, first, stop):
+    """Map a file into memory and yield it as a sequence of fixed-size views."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapping)
+    try:
+        end = len(view) if stop is None else min(len(view), stop * block_size)
+        for index, offset in enumerate(range(first * block_size, end, block_size), first):
+            yield Page(index, view[offset:offset + block_size])
+    finally:
+        view.release()
+        try:
+            mapping.close()
+        except BufferError:
+            # A step still holds a page; the mapping closes once it is released
+            pass
+
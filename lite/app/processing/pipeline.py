@@ -0,0 +1,218 @@
+"""
+Document processing pipeline.
+Streams the pages of a document through the ordered steps described by a configuration.
+"""
+import queue
+import threading
+
+from models.document_model import DocumentModel
+from processing.page_source import iter_pages
+from processing.steps import create_step, fingerprint_steps
+
+# Pages buffered between two stages before the upstream stage blocks
+PAGE_QUEUE_SIZE = 4
+
+# Marks the end of the page stream
+_END = object()
+
+
+class Pipeline:
+    """
+    An ordered sequence of document steps.
+
+    Each step runs on its own thread and hands pages to the next one
+    through a bounded queue. A slow step makes the steps before it block
+    instead of buffering, so at most ``queue_size`` pages per stage are in
+    memory whatever the length of the document.
+    """
+
+    def __init__(self, steps, queue_size=PAGE_QUEUE_SIZE, fingerprints=None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            steps: Ordered list of Step instances
+            queue_size: Pages buffered between two stages
+            fingerprints: Fingerprint of each step, from fingerprint_steps
+        """
+        self.steps = steps
+        self.queue_size = queue_size
+        self.fingerprints = fingerprints or []
+
+    @classmethod
+    def from_config(cls, config, queue_size=PAGE_QUEUE_SIZE):
+        """
+        Build the pipeline defined by a configuration.
+
+        Args:
+            config: ConfigModel describing the steps
+            queue_size: Pages buffered between two stages
+
+        Returns:
+            Pipeline: The pipeline
+        """
+        return cls(
+            [create_step(spec) for spec in config.steps],
+            queue_size,
+            fingerprint_steps(config.steps)
+        )
+
+    @property
+    def page_parallel(self):
+        """Whether documents can be split into page ranges for this pipeline."""
+        return bool(self.steps) and all(step.page_parallel for step in self.steps)
+
+    def run(self, path, start=0, document=None, page_range=None, indexes=None):
+        """
+        Run the steps over one document.
+
+        Errors are recorded on the document instead of raised, so one bad
+        file does not abort the rest of its batch.
+
+        Args:
+            path: Path of the document to process
+            start: Index of the first step to run; earlier steps are skipped
+            document: DocumentModel holding the results of skipped steps.
+                If None, a new one is created.
+            page_range: Optional (first, stop) range of pages to process
+            indexes: Indexes of the steps to run, in order, instead of
+                every step from start; the document holds the results of
+                the others
+
+        Returns:
+            DocumentModel: The processed document
+        """
+        document = document or DocumentModel(path)
+        if indexes is None:
+            steps = self.steps[start:]
+        else:
+            steps = [self.steps[index] for index in indexes]
+        try:
+            for step in steps:
+                step.page_range = page_range
+                step.begin(document)
+
+            pages = iter_pages(path, page_range=page_range)
+            if len(steps) > 1:
+                self._run_stages(steps, pages, document)
+            else:
+                self._run_inline(steps, pages, document)
+
+            for step in steps:
+                step.finish(document)
+        except Exception as e:
+            document.error = f"{type(e).__name__}: {e}"
+        return document
+
+    def _run_inline(self, steps, pages, document):
+        """Pass each page through the steps on the calling thread."""
+        try:
+            for page in pages:
+                for step in steps:
+                    result = step.process_page(page, document)
+                    if result is not page:
+                        page.release()
+                    page = result
+                    if page is None:
+                        break
+                else:
+                    page.release()
+        finally:
+            pages.close()
+
+    def _run_stages(self, steps, pages, document):
+        """Run each step on its own thread, connected by bounded queues."""
+        stop = threading.Event()
+        errors = []
+        queues = [queue.Queue(self.queue_size) for _ in steps]
+
+        threads = [threading.Thread(
+            target=_feed, args=(pages, queues[0], stop, errors), daemon=True
+        )]
+        for i, step in enumerate(steps[:-1]):
+            threads.append(threading.Thread(
+                target=_stage,
+                args=(step, document, queues[i], queues[i + 1], stop, errors),
+                daemon=True
+            ))
+        for thread in threads:
+            thread.start()
+
+        # The last step runs on the calling thread and drains the pipeline
+        try:
+            _stage(steps[-1], document, queues[-1], None, stop, errors)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            # Pages still queued when a stage failed are released
+            for page_queue in queues:
+                while not page_queue.empty():
+                    page = page_queue.get_nowait()
+                    if page is not _END:
+                        page.release()
+
+        if errors:
+            raise errors[0]
+
+
+def _put(out_queue, item, stop):
+    """Put an item, giving up if the pipeline is stopped. Returns False if stopped."""
+    while not stop.is_set():
+        try:
+            out_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(in_queue, stop):
+    """Get an item, returning the end marker if the pipeline is stopped."""
+    while not stop.is_set():
+        try:
+            return in_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _END
+
+
+def _feed(pages, out_queue, stop, errors):
+    """Stage that reads pages from the source."""
+    try:
+        for page in pages:
+            if not _put(out_queue, page, stop):
+                page.release()
+                return
+    except Exception as e:
+        errors.append(e)
+        stop.set()
+    finally:
+        pages.close()
+        _put(out_queue, _END, stop)
+
+
+def _stage(step, document, in_queue, out_queue, stop, errors):
+    """Stage that applies one step to every page and passes it downstream."""
+    try:
+        while True:
+            page = _get(in_queue, stop)
+            if page is _END:
+                break
+            result = step.process_page(page, document)
+            if result is not page:
+                page.release()
+            if result is None:
+                continue
+            if out_queue is None:
+                # The page leaves the pipeline here
+                result.release()
+            elif not _put(out_queue, result, stop):
+                result.release()
+                return
+    except Exception as e:
+        errors.append(e)
+        stop.set()
+    finally:
+        if out_queue is not None:
+            _put(out_queue, _END, stop)
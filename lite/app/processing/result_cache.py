@@ -0,0 +1,227 @@
+"""
+Processing result cache.
+Reuses the results of documents that were already processed with the same configuration.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path, chunk_size=HASH_CHUNK_SIZE):
+    """
+    Hash the contents of a file without loading it whole.
+
+    Uses xxh3-128 when the xxhash package is installed and BLAKE2b
+    otherwise. The algorithm is part of the returned string, so hashes
+    from different algorithms never match.
+
+    Args:
+        path: Path of the file
+        chunk_size: Bytes read at a time
+
+    Returns:
+        str: "<algorithm>:<hex digest>"
+    """
+    if xxhash is not None:
+        algorithm, digest = "xxh3", xxhash.xxh3_128()
+    else:
+        algorithm, digest = "b2", hashlib.blake2b(digest_size=16)
+
+    with open(path, "rb") as f:
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+
+    return f"{algorithm}:{digest.hexdigest()}"
+
+
+def _checksum(results):
+    """Checksum of the canonical JSON form of some results."""
+    canonical = json.dumps(results, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed store of document processing results.
+
+    Entries are keyed by the hash of the document contents and a
+    fingerprint of the processing applied to it (a configuration's content
+    hash, or a step fingerprint), so a document dropped again under another
+    name is still recognised. Each entry carries a checksum of its results
+    and is discarded if the check fails. When the cache grows past
+    ``max_bytes``, the least recently used entries are removed.
+
+    The cache directory can be shared by several processes; writes are
+    atomic renames and eviction tolerates entries vanishing underneath it.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=512 * 1024 * 1024):
+        """
+        Initialize the result cache.
+
+        Args:
+            cache_dir: Directory of the cache. If None, uses ~/.flexipy/cache/results.
+            max_bytes: Size the cache is trimmed to
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser("~"), ".flexipy", "cache", "results")
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # Bytes written since the last size check; avoids a scan per write
+        self.unchecked_bytes = max_bytes
+
+    def _entry_path(self, doc_hash, fingerprint):
+        """Return the file of an entry, sharded by the first bytes of its key."""
+        key = hashlib.blake2b(
+            f"{doc_hash}|{fingerprint}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, doc_hash, fingerprint):
+        """
+        Look up the results of a document.
+
+        Args:
+            doc_hash: Hash of the document contents, from hash_file
+            fingerprint: Fingerprint of the processing applied
+
+        Returns:
+            dict: The stored results, or None on a miss or a failed check
+        """
+        path = self._entry_path(doc_hash, fingerprint)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning("Discarding unreadable cache entry %s: %s", path, e)
+            self._remove(path)
+            return None
+
+        if (entry.get("doc_hash") != doc_hash
+                or entry.get("fingerprint") != fingerprint
+                or entry.get("checksum") != _checksum(entry.get("results"))):
+            logger.warning("Discarding corrupt cache entry %s", path)
+            self._remove(path)
+            return None
+
+        # The modification time doubles as the last-used time for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["results"]
+
+    def put(self, doc_hash, fingerprint, results):
+        """
+        Store the results of a document.
+
+        Args:
+            doc_hash: Hash of the document contents, from hash_file
+            fingerprint: Fingerprint of the processing applied
+            results: JSON-serializable results
+        """
+        path = self._entry_path(doc_hash, fingerprint)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps({
+            "doc_hash": doc_hash,
+            "fingerprint": fingerprint,
+            "checksum": _checksum(results),
+            "results": results,
+        })
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except IOError as e:
+            logger.error("Error writing cache entry %s: %s", path, e)
+            self._remove(tmp_path)
+            return
+
+        self.unchecked_bytes += len(data)
+        if self.unchecked_bytes >= self.max_bytes // 10:
+            self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            int: Number of entries removed
+        """
+        self.unchecked_bytes = 0
+        entries = []
+        total = 0
+        for shard in _scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in _scandir(shard.path):
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            return 0
+
+        # Trim a little below the limit so the next writes do not evict again
+        target = self.max_bytes * 9 // 10
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Remove every entry."""
+        for shard in _scandir(self.cache_dir):
+            if shard.is_dir():
+                for entry in _scandir(shard.path):
+                    self._remove(entry.path)
+
+    def _remove(self, path):
+        """Delete a file that another process may already have removed."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error("Error removing cache entry %s: %s", path, e)
+
+
+def _scandir(path):
+    """List a directory, returning nothing if it does not exist."""
+    try:
+        with os.scandir(path) as entries:
+            return list(entries)
+    except FileNotFoundError:
+        return []
+
@@ -0,0 +1,322 @@
+"""
+Document processing steps.
+Defines the step interface and the built-in steps a configuration can use.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+import shutil
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Registry of step classes by type name
+STEP_TYPES = {}
+
+
+def register_step(step_type):
+    """
+    Class decorator that registers a step under a type name.
+
+    Args:
+        step_type: Name used in the "type" field of a configuration step
+    """
+    def decorator(cls):
+        cls.step_type = step_type
+        STEP_TYPES[step_type] = cls
+        return cls
+    return decorator
+
+
+def create_step(spec):
+    """
+    Create a step from its configuration entry.
+
+    Args:
+        spec: Dictionary with a "type" and optional "params"
+
+    Returns:
+        Step: The configured step
+
+    Raises:
+        ValueError: If the step type is unknown
+    """
+    step_type = spec.get("type")
+    if step_type not in STEP_TYPES:
+        raise ValueError(f"Unknown step type: {step_type}")
+    return STEP_TYPES[step_type](**spec.get("params", {}))
+
+
+def fingerprint_steps(specs):
+    """
+    Fingerprint each step of a pipeline.
+
+    A step's fingerprint covers its type, version and parameters and the
+    fingerprint of the step before it, so changing a step changes the
+    fingerprints of that step and every later one, and nothing earlier.
+
+    Args:
+        specs: Ordered list of step configuration entries
+
+    Returns:
+        list: Hex fingerprints, one per step
+    """
+    fingerprints = []
+    previous = ""
+    for spec in specs:
+        step_cls = STEP_TYPES.get(spec.get("type"))
+        canonical = json.dumps({
+            "previous": previous,
+            "type": spec.get("type"),
+            "version": getattr(step_cls, "version", 0),
+            "params": spec.get("params", {}),
+        }, sort_keys=True, separators=(",", ":"))
+        previous = hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+        fingerprints.append(previous)
+    return fingerprints
+
+
+class Step:
+    """
+    Base class for document processing steps.
+
+    Pages flow through the steps one at a time. ``begin`` is called before
+    the first page of a document, ``process_page`` for every page and
+    ``finish`` after the last one, so a step only ever holds the page it is
+    working on.
+    """
+
+    step_type = None
+
+    # Bump when a change to the step's code changes its results
+    version = 1
+
+    # Whether the results of the step can be stored and reused later
+    cacheable = True
+
+    # Whether process_page returns pages different from the ones it gets.
+    # Later steps cannot be resumed from the source past such a step.
+    rewrites_pages = False
+
+    # Whether page ranges of a document can be processed separately and
+    # their results combined with merge
+    page_parallel = False
+
+    # (first, stop) pages the step is run over, set by the pipeline before
+    # begin; None when it sees the whole document
+    page_range = None
+
+    def __init__(self, **params):
+        """
+        Initialize the step.
+
+        Args:
+            **params: Step parameters from the configuration
+        """
+        self.params = params
+
+    def begin(self, document):
+        """
+        Prepare for a new document.
+
+        Args:
+            document: DocumentModel about to be processed
+        """
+
+    def process_page(self, page, document):
+        """
+        Process one page.
+
+        Args:
+            page: Page to process
+            document: DocumentModel the page belongs to. Steps store their
+                output in ``document.results``.
+
+        Returns:
+            Page: The page passed on to the next step, or None to drop it.
+            If a different page is returned, the input page is released.
+        """
+        return page
+
+    def finish(self, document):
+        """
+        Complete a document after its last page.
+
+        Args:
+            document: DocumentModel that was processed
+        """
+
+    @classmethod
+    def merge(cls, partials):
+        """
+        Combine the results of the page ranges of one document.
+
+        Only called for page_parallel steps.
+
+        Args:
+            partials: Results of the step for each range, in page order
+
+        Returns:
+            The results for the whole document
+        """
+        raise NotImplementedError
+
+    @property
+    def first_range(self):
+        """Whether the step is run over the first pages of the document."""
+        return self.page_range is None or self.page_range[0] == 0
+
+
+@register_step("file_info")
+class FileInfoStep(Step):
+    """Records the size, modification time and page count of the document."""
+
+    # The size and time belong to the file at the path, not to its contents
+    cacheable = False
+
+    page_parallel = True
+
+    def begin(self, document):
+        stat = os.stat(document.path)
+        self.info = {"size": stat.st_size, "mtime": stat.st_mtime, "pages": 0}
+
+    def process_page(self, page, document):
+        self.info["pages"] += 1
+        return page
+
+    def finish(self, document):
+        document.results[self.step_type] = self.info
+
+    @classmethod
+    def merge(cls, partials):
+        merged = dict(partials[0])
+        merged["pages"] = sum(partial["pages"] for partial in partials)
+        return merged
+
+
+@register_step("hash")
+class HashStep(Step):
+    """
+    Computes a digest of the document.
+
+    By default the file contents are hashed, so a document has the same
+    digest whichever optional packages are installed. With ``pages`` set,
+    the page data is hashed as it streams past instead: the rasterized
+    pixels of PDFs and images when PyMuPDF or Pillow is installed, and the
+    raw file blocks otherwise.
+
+    The file is hashed by whichever task covers the first pages, so split
+    documents hash it once. Page digests run through every page in order
+    and cannot be split.
+    """
+
+    # The default went from hashing page data back to hashing the file
+    version = 2
+
+    page_parallel = True
+
+    def __init__(self, algorithm="sha256", chunk_size=1024 * 1024, pages=False):
+        super().__init__(algorithm=algorithm, chunk_size=chunk_size, pages=pages)
+        self.algorithm = algorithm
+        self.chunk_size = chunk_size
+        self.pages = pages
+        self.page_parallel = not pages
+
+    def begin(self, document):
+        self.digest = hashlib.new(self.algorithm)
+
+    def process_page(self, page, document):
+        if self.pages:
+            self.digest.update(page.data)
+        return page
+
+    def finish(self, document):
+        if not self.pages:
+            if not self.first_range:
+                document.results[self.step_type] = None
+                return
+            with open(document.path, "rb") as f:
+                for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                    self.digest.update(chunk)
+        document.results[self.step_type] = self.digest.hexdigest()
+
+    @classmethod
+    def merge(cls, partials):
+        return partials[0]
+
+
+@register_step("copy")
+class CopyStep(Step):
+    """Copies the document into an output directory, from the task covering the first pages."""
+
+    # The copy is a side effect of running the step and the target depends on the path
+    cacheable = False
+
+    page_parallel = True
+
+    def __init__(self, output_dir):
+        super().__init__(output_dir=output_dir)
+        self.output_dir = os.path.expanduser(output_dir)
+
+    def finish(self, document):
+        if not self.first_range:
+            document.results[self.step_type] = None
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        target = os.path.join(self.output_dir, os.path.basename(document.path))
+        shutil.copy2(document.path, target)
+        document.results[self.step_type] = target
+
+    @classmethod
+    def merge(cls, partials):
+        return partials[0]
+
+
+@register_step("preview")
+class PreviewStep(Step):
+    """
+    Renders a small preview of the first page.
+
+    The preview is stored in the results as a base64-encoded PNG with its
+    size, so it travels with the rest of the results and needs no cleanup.
+    """
+
+    # The preview used to be a shared memory reference
+    version = 2
+
+    page_parallel = True
+
+    def __init__(self, max_size=256):
+        super().__init__(max_size=max_size)
+        self.max_size = max_size
+
+    def begin(self, document):
+        self.preview = None
+
+    def process_page(self, page, document):
+        if (self.preview is None and self.first_range and page.width
+                and Image is not None):
+            image = Image.frombuffer(
+                page.mode, (page.width, page.height), page.data, "raw", page.mode, 0, 1
+            )
+            image.thumbnail((self.max_size, self.max_size))
+            png = io.BytesIO()
+            image.save(png, format="PNG")
+            self.preview = {
+                "index": page.index,
+                "width": image.width,
+                "height": image.height,
+                "png": base64.b64encode(png.getvalue()).decode("ascii"),
+            }
+        return page
+
+    def finish(self, document):
+        document.results[self.step_type] = self.preview
+
+    @classmethod
+    def merge(cls, partials):
+        return partials[0]
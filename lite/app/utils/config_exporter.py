@@ -0,0 +1,276 @@
+"""
+Configuration exporter for the application.
+Writes stored configurations into a single compressed bundle.
+"""
+import gzip
+import io
+import json
+import logging
+import os
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from models.config_model import ConfigModel
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_ZIP = "zip"
+FORMAT_NDJSON_GZ = "ndjson.gz"
+FORMAT_TAR_ZST = "tar.zst"
+
+EXPORT_FORMATS = (FORMAT_ZIP, FORMAT_NDJSON_GZ, FORMAT_TAR_ZST)
+
+
+def detect_format(path):
+    """
+    Guess the bundle format from a file name.
+
+    Args:
+        path: Path of the bundle
+
+    Returns:
+        str: One of EXPORT_FORMATS, defaults to zip
+    """
+    lower = path.lower()
+    if lower.endswith((".ndjson.gz", ".jsonl.gz")):
+        return FORMAT_NDJSON_GZ
+    if lower.endswith((".tar.zst", ".tzst")):
+        return FORMAT_TAR_ZST
+    return FORMAT_ZIP
+
+
+def _read_config(path):
+    """Read a configuration file and normalise it through ConfigModel."""
+    with open(path, "r") as f:
+        return ConfigModel.from_dict(json.load(f)).to_dict()
+
+
+def _encode_chunk(items, export_format, level):
+    """
+    Serialize a chunk of configurations.
+
+    Runs inside a worker process. For NDJSON the chunk is also compressed
+    into a standalone gzip member, so members can be concatenated as-is.
+
+    Args:
+        items: List of (name, path) tuples
+        export_format: One of EXPORT_FORMATS
+        level: Compression level
+
+    Returns:
+        tuple: (payload, count, errors) where errors is a list of
+        (name, message) tuples
+    """
+    errors = []
+
+    if export_format == FORMAT_NDJSON_GZ:
+        lines = []
+        for name, path in items:
+            try:
+                record = {"name": name, "config": _read_config(path)}
+            except (json.JSONDecodeError, IOError) as e:
+                errors.append((name, str(e)))
+                continue
+            lines.append(json.dumps(record, ensure_ascii=False))
+
+        if not lines:
+            return b"", 0, errors
+
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        return gzip.compress(data, compresslevel=level, mtime=0), len(lines), errors
+
+    entries = []
+    for name, path in items:
+        try:
+            config = _read_config(path)
+        except (json.JSONDecodeError, IOError) as e:
+            errors.append((name, str(e)))
+            continue
+        entries.append((f"{name}.json", json.dumps(config, indent=2).encode("utf-8")))
+
+    return entries, len(entries), errors
+
+
+class ConfigExporter:
+    """
+    Exports configurations from a ConfigManager into a compressed bundle.
+
+    Configurations are serialized in chunks on a process pool. At most
+    ``max_pending`` chunks are in flight at once and finished chunks are
+    written to the output in order, so memory use stays bounded no matter
+    how large the export is.
+    """
+
+    def __init__(self, config_manager, workers=None, chunk_size=256,
+                 max_pending=None, compress_level=6):
+        """
+        Initialize the exporter.
+
+        Args:
+            config_manager: ConfigManager whose configurations are exported
+            workers: Number of worker processes. If None, uses all cores.
+            chunk_size: Number of configurations serialized per task
+            max_pending: Maximum chunks in flight. If None, twice the workers.
+            compress_level: Compression level used for the bundle
+        """
+        self.config_manager = config_manager
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending = max_pending or self.workers * 2
+        self.compress_level = compress_level
+        self.errors = []
+
+    def export(self, output_path, names=None, export_format=None):
+        """
+        Export configurations to a bundle.
+
+        Args:
+            output_path: Path of the bundle to write
+            names: Names of the configurations to export. If None, exports all.
+            export_format: One of EXPORT_FORMATS. If None, guessed from the path.
+
+        Returns:
+            int: Number of configurations written
+        """
+        export_format = export_format or detect_format(output_path)
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        if export_format == FORMAT_TAR_ZST and zstandard is None:
+            raise RuntimeError("The zstandard package is required for tar.zst exports")
+
+        if names is None:
+            names = self.config_manager.list_config_names()
+
+        self.errors = []
+        written = 0
+        tmp_path = f"{output_path}.part"
+
+        try:
+            with open(tmp_path, "wb") as raw:
+                writer = self._open_writer(raw, export_format)
+                try:
+                    for payload, count in self._encode(names, export_format):
+                        writer.write_chunk(payload)
+                        written += count
+                finally:
+                    writer.close()
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        for name, message in self.errors:
+            logger.error("Error exporting configuration %s: %s", name, message)
+
+        return written
+
+    def _chunks(self, names):
+        """Yield lists of (name, path) tuples of at most chunk_size items."""
+        chunk = []
+        for name in names:
+            chunk.append((name, self.config_manager.get_config_path(name)))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _encode(self, names, export_format):
+        """Yield encoded chunks in order, keeping the pending queue bounded."""
+        chunks = self._chunks(names)
+
+        # Small exports are not worth the cost of starting a process pool
+        if len(names) <= self.chunk_size or self.workers == 1:
+            for chunk in chunks:
+                payload, count, errors = _encode_chunk(
+                    chunk, export_format, self.compress_level
+                )
+                self.errors.extend(errors)
+                yield payload, count
+            return
+
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for chunk in chunks:
+                pending.append(executor.submit(
+                    _encode_chunk, chunk, export_format, self.compress_level
+                ))
+                if len(pending) >= self.max_pending:
+                    yield self._collect(pending.popleft())
+
+            while pending:
+                yield self._collect(pending.popleft())
+
+    def _collect(self, future):
+        """Wait for a chunk and record its errors."""
+        payload, count, errors = future.result()
+        self.errors.extend(errors)
+        return payload, count
+
+    def _open_writer(self, raw, export_format):
+        """Create the bundle writer for the given format."""
+        if export_format == FORMAT_NDJSON_GZ:
+            return _NdjsonGzipWriter(raw)
+        if export_format == FORMAT_TAR_ZST:
+            return _TarZstdWriter(raw, self.compress_level)
+        return _ZipWriter(raw, self.compress_level)
+
+
+class _NdjsonGzipWriter:
+    """Writes pre-compressed gzip members back to back."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def write_chunk(self, payload):
+        self.raw.write(payload)
+
+    def close(self):
+        pass
+
+
+class _ZipWriter:
+    """Writes serialized configurations as deflated zip entries."""
+
+    def __init__(self, raw, level):
+        self.archive = zipfile.ZipFile(
+            raw, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=level
+        )
+
+    def write_chunk(self, entries):
+        for arcname, data in entries:
+            self.archive.writestr(arcname, data)
+
+    def close(self):
+        self.archive.close()
+
+
+class _TarZstdWriter:
+    """Writes serialized configurations into a zstd-compressed tar stream."""
+
+    def __init__(self, raw, level):
+        # zstd compresses on its own worker threads
+        compressor = zstandard.ZstdCompressor(level=level, threads=-1)
+        self.stream = compressor.stream_writer(raw, closefd=False)
+        self.archive = tarfile.open(fileobj=self.stream, mode="w|")
+        self.mtime = int(time.time())
+
+    def write_chunk(self, entries):
+        for arcname, data in entries:
+            info = tarfile.TarInfo(arcname)
+            info.size = len(data)
+            info.mtime = self.mtime
+            self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.archive.close()
+        self.stream.close()
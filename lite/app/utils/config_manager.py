@@ -4,8 +4,24 @@ Handles loading, saving, and managing configurations.
 """
 import os
 import json
+import logging
 from typing import Dict, Optional
 from models.config_model import ConfigModel
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+_load_seconds = metrics.histogram(
+    "config_load_seconds", "Time to load every stored configuration")
+_load_errors = metrics.counter(
+    "config_load_errors_total", "Configuration files that could not be loaded")
+_loaded = metrics.gauge(
+    "configs_loaded", "Configurations loaded by the last full load")
+_save_seconds = metrics.histogram(
+    "config_save_seconds", "Time to save one configuration")
+_save_errors = metrics.counter(
+    "config_save_errors_total", "Configurations that could not be saved")
+
 
 class ConfigManager:
     """
@@ -32,6 +48,9 @@ class ConfigManager:
         
         # Cache for loaded configurations
         self.configs = {}
+        
+        # Callables(name, config) invoked after a configuration is saved
+        self.save_listeners = []
     
     def load_all_configs(self):
         """
@@ -45,20 +64,57 @@ class ConfigManager:
         # Get all JSON files in the config directory
         if not os.path.exists(self.config_dir):
             return self.configs
-            
+        
+        with _load_seconds.time():
+            self._load_files()
+        _loaded.set(len(self.configs))
+        return self.configs
+    
+    def _load_files(self):
+        """Load every configuration file in the config directory into the cache."""
         for filename in os.listdir(self.config_dir):
             if filename.endswith(".json"):
                 config_name = filename[:-5]  # Remove .json extension
                 config_path = os.path.join(self.config_dir, filename)
                 
                 try:
-                    with open(config_path, "r") as f:
+                    with open(config_path, "r", encoding="utf-8") as f:
                         config_data = json.load(f)
-                        self.configs[config_name] = ConfigModel.from_dict(config_data)
-                except (json.JSONDecodeError, IOError) as e:
-                    print(f"Error loading configuration {config_name}: {e}")
+                    if not isinstance(config_data, dict):
+                        raise ValueError("not a JSON object")
+                    self.configs[config_name] = ConfigModel.from_dict(config_data)
+                except (ValueError, IOError) as e:
+                    # ValueError covers malformed JSON and undecodable bytes
+                    _load_errors.inc()
+                    logger.error("Error loading configuration %s: %s", config_name, e)
+    
+    def list_config_names(self):
+        """
+        List the names of the stored configurations without loading them.
         
-        return self.configs
+        Returns:
+            list: Sorted list of configuration names
+        """
+        if not os.path.exists(self.config_dir):
+            return []
+        
+        with os.scandir(self.config_dir) as entries:
+            return sorted(
+                entry.name[:-5] for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            )
+    
+    def get_config_path(self, name):
+        """
+        Get the path of the file that stores a configuration.
+        
+        Args:
+            name: Name of the configuration
+            
+        Returns:
+            str: Path to the configuration file
+        """
+        return os.path.join(self.config_dir, f"{name}.json")
     
     def get_config(self, name):
         """
@@ -72,6 +128,15 @@ class ConfigManager:
         """
         return self.configs.get(name)
     
+    def add_save_listener(self, listener):
+        """
+        Register a callable to be told about saved configurations.
+        
+        Args:
+            listener: Callable(name, config) invoked after each successful save
+        """
+        self.save_listeners.append(listener)
+    
     def save_config(self, name, config):
         """
         Save a configuration.
@@ -83,15 +148,20 @@ class ConfigManager:
         Returns:
             bool: True if saved successfully, False otherwise
         """
-        config_path = os.path.join(self.config_dir, f"{name}.json")
+        config_path = self.get_config_path(name)
         
         try:
-            with open(config_path, "w") as f:
-                json.dump(config.to_dict(), f, indent=2)
+            with _save_seconds.time():
+                with open(config_path, "w") as f:
+                    json.dump(config.to_dict(), f, indent=2)
                 
             # Update cache
             self.configs[name] = config
-            return True
         except IOError as e:
-            print(f"Error saving configuration {name}: {e}")
-            return False
\ No newline at end of file
+            _save_errors.inc()
+            logger.error("Error saving configuration %s: %s", name, e)
+            return False
+        
+        for listener in self.save_listeners:
+            listener(name, config)
+        return True
\ No newline at end of file
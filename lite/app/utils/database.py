@@ -0,0 +1,499 @@
+"""
+Database access for the application.
+Stores batch and document metadata through a connection pool, with SQLite as the default driver.
+"""
+import contextlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+BATCH_RUNNING = "running"
+BATCH_FINISHED = "finished"
+
+DOC_PENDING = "pending"
+DOC_DONE = "done"
+DOC_FAILED = "failed"
+
+# Rows sent to the driver per executemany call in bulk writes
+BULK_CHUNK_SIZE = 5000
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS batches (
+        batch_id TEXT PRIMARY KEY,
+        config_name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        failed INTEGER NOT NULL DEFAULT 0,
+        started_at REAL,
+        finished_at REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS batches_status ON batches (status, started_at)",
+    "CREATE INDEX IF NOT EXISTS batches_config ON batches (config_name, started_at)",
+    """
+    CREATE TABLE IF NOT EXISTS documents (
+        batch_id TEXT NOT NULL,
+        path TEXT NOT NULL,
+        config_name TEXT NOT NULL,
+        status TEXT NOT NULL,
+        error TEXT,
+        results TEXT,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (batch_id, path)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS documents_batch_status ON documents (batch_id, status)",
+    "CREATE INDEX IF NOT EXISTS documents_config_status ON documents (config_name, status)",
+]
+
+# Statements are kept as constants so drivers can reuse their prepared form
+_UPSERT_DOCUMENT = (
+    "INSERT INTO documents (batch_id, path, config_name, status, error, results, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (batch_id, path) DO UPDATE SET config_name = excluded.config_name, "
+    "status = excluded.status, error = excluded.error, results = excluded.results, "
+    "updated_at = excluded.updated_at"
+)
+_UPDATE_DOCUMENT_STATUS = (
+    "UPDATE documents SET status = ?, error = ?, updated_at = ? WHERE batch_id = ? AND path = ?"
+)
+_UPSERT_BATCH = (
+    "INSERT INTO batches (batch_id, config_name, status, total, failed, started_at, finished_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (batch_id) DO UPDATE SET config_name = excluded.config_name, "
+    "status = excluded.status, total = excluded.total, failed = excluded.failed, "
+    "started_at = excluded.started_at, finished_at = excluded.finished_at"
+)
+_DOCUMENT_COLUMNS = "batch_id, path, config_name, status, error, results, updated_at"
+_BATCH_COLUMNS = "batch_id, config_name, status, total, failed, started_at, finished_at"
+
+# Registry of driver classes, keyed by name
+DRIVERS = {}
+
+
+def connect_sqlite(path, **kwargs):
+    """
+    Open a SQLite database in WAL mode, in autocommit mode for explicit transactions.
+
+    Args:
+        path: Path of the database file; its folder is created if missing
+        **kwargs: Further arguments of sqlite3.connect
+
+    Returns:
+        sqlite3.Connection: The connection
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, **kwargs)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL with NORMAL sync survives process crashes without an fsync per commit
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def register_driver(name):
+    """
+    Register a driver class under a name.
+
+    Args:
+        name: Name passed to Database to select the driver
+
+    Returns:
+        Decorator that registers the class
+    """
+    def decorator(cls):
+        cls.name = name
+        DRIVERS[name] = cls
+        return cls
+    return decorator
+
+
+class Driver:
+    """
+    Opens connections to a database engine and speaks its dialect.
+
+    Statements are written with ``?`` placeholders and the ON CONFLICT
+    upsert syntax shared by SQLite and PostgreSQL. A driver whose module
+    uses another parameter style sets ``placeholder``; statements are then
+    rewritten once and reused.
+    """
+
+    name = None
+    placeholder = "?"
+
+    def __init__(self, target):
+        """
+        Initialize the driver.
+
+        Args:
+            target: Where the database lives, e.g. a path or a DSN
+        """
+        self.target = target
+        self.statements = {}
+
+    def connect(self):
+        """Open a new connection."""
+        raise NotImplementedError
+
+    def sql(self, statement):
+        """Return a statement in the driver's parameter style."""
+        if self.placeholder == "?":
+            return statement
+        translated = self.statements.get(statement)
+        if translated is None:
+            translated = statement.replace("?", self.placeholder)
+            self.statements[statement] = translated
+        return translated
+
+    def begin(self, conn):
+        """Start a transaction."""
+
+    def commit(self, conn):
+        conn.commit()
+
+    def rollback(self, conn):
+        conn.rollback()
+
+
+@register_driver("sqlite")
+class SqliteDriver(Driver):
+    """SQLite in WAL mode, so readers never wait on the writer."""
+
+    def connect(self):
+        # Pooled connections move between threads
+        conn = connect_sqlite(self.target, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def begin(self, conn):
+        # Take the write lock up front instead of failing to upgrade a read lock later
+        conn.execute("BEGIN IMMEDIATE")
+
+    def commit(self, conn):
+        conn.execute("COMMIT")
+
+    def rollback(self, conn):
+        conn.execute("ROLLBACK")
+
+
+class ConnectionPool:
+    """
+    Bounded pool of database connections shared by threads.
+
+    Connections are opened lazily up to ``size`` and handed out most
+    recently used first, so a light load keeps reusing one warm
+    connection. When every connection is busy, callers wait up to
+    ``timeout`` seconds for one to be returned.
+    """
+
+    def __init__(self, driver, size=4, timeout=30.0):
+        """
+        Initialize the pool.
+
+        Args:
+            driver: Driver that opens the connections
+            size: Maximum number of open connections
+            timeout: Seconds to wait for a free connection
+        """
+        self.driver = driver
+        self.size = size
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.opened = 0
+        self.closed = False
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with block."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def _acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Connection pool is closed")
+            can_open = self.opened < self.size
+            if can_open:
+                self.opened += 1
+        if can_open:
+            try:
+                return self.driver.connect()
+            except Exception:
+                with self.lock:
+                    self.opened -= 1
+                raise
+
+        try:
+            return self.idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No database connection free after {self.timeout} seconds")
+
+    def _release(self, conn):
+        with self.lock:
+            closed = self.closed
+            if closed:
+                self.opened -= 1
+        if closed:
+            conn.close()
+        else:
+            self.idle.put(conn)
+
+    def close(self):
+        """Close the idle connections; busy ones are closed when returned."""
+        with self.lock:
+            self.closed = True
+        while True:
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self.lock:
+                self.opened -= 1
+
+
+class Database:
+    """
+    Batch and document metadata store.
+
+    Documents are keyed by batch and path. Bulk writes run as one
+    transaction with ``executemany`` over a constant statement, which the
+    driver prepares once and reuses for every row; a single call can
+    update tens of thousands of document statuses. Queries by batch,
+    status and configuration are served from indexes.
+    """
+
+    def __init__(self, target=None, driver="sqlite", pool_size=4):
+        """
+        Open the database, creating its tables if needed.
+
+        Args:
+            target: Path or DSN of the database. If None, uses ~/.flexipy/flexipy.db.
+            driver: Name of a registered driver
+            pool_size: Maximum number of open connections
+        """
+        if driver not in DRIVERS:
+            raise ValueError(f"Unknown database driver: {driver}")
+        if target is None:
+            target = os.path.join(os.path.expanduser("~"), ".flexipy", "flexipy.db")
+
+        self.driver = DRIVERS[driver](target)
+        self.pool = ConnectionPool(self.driver, pool_size)
+
+        with self.transaction() as cursor:
+            for statement in _SCHEMA:
+                cursor.execute(statement)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Run a with block in a transaction on a pooled connection; yields a cursor."""
+        with self.pool.connection() as conn:
+            self.driver.begin(conn)
+            cursor = conn.cursor()
+            try:
+                yield cursor
+            except BaseException:
+                self.driver.rollback(conn)
+                raise
+            else:
+                self.driver.commit(conn)
+            finally:
+                cursor.close()
+
+    def _execute_many(self, cursor, statement, rows):
+        """Run a statement over rows in chunks and return the rows affected."""
+        statement = self.driver.sql(statement)
+        affected = 0
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                cursor.executemany(statement, chunk)
+                affected += cursor.rowcount
+                chunk = []
+        if chunk:
+            cursor.executemany(statement, chunk)
+            affected += cursor.rowcount
+        return affected
+
+    def _query(self, statement, params=()):
+        """Run a read-only query and return all rows."""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.driver.sql(statement), params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def record_batch(self, batch_id, config_name, paths, started_at=None):
+        """
+        Record a new batch and its documents as pending.
+
+        Args:
+            batch_id: Identifier of the batch
+            config_name: Name of the configuration applied
+            paths: Paths of the documents
+            started_at: Start time. If None, uses now.
+        """
+        paths = list(paths)
+        now = time.time()
+        started_at = started_at or now
+        with self.transaction() as cursor:
+            cursor.execute(self.driver.sql(_UPSERT_BATCH), (
+                batch_id, config_name, BATCH_RUNNING, len(paths), 0, started_at, None
+            ))
+            self._execute_many(cursor, _UPSERT_DOCUMENT, (
+                (batch_id, path, config_name, DOC_PENDING, None, None, now) for path in paths
+            ))
+
+    def finish_batch(self, batch):
+        """
+        Store the outcome of a finished batch and of all its documents.
+
+        Args:
+            batch: Finished BatchModel
+        """
+        now = time.time()
+        with self.transaction() as cursor:
+            cursor.execute(self.driver.sql(_UPSERT_BATCH), (
+                batch.batch_id, batch.config_name, BATCH_FINISHED, len(batch.paths),
+                batch.failed, batch.started_at, batch.finished_at or now
+            ))
+            self._execute_many(cursor, _UPSERT_DOCUMENT, (
+                (batch.batch_id, document.path, batch.config_name,
+                 DOC_FAILED if document.error else DOC_DONE, document.error,
+                 json.dumps(document.results), now)
+                for document in batch.documents
+            ))
+
+    def upsert_documents(self, records):
+        """
+        Insert or replace document records in bulk.
+
+        Args:
+            records: Iterable of dicts with batch_id, path, config_name,
+                status and optionally error and results
+
+        Returns:
+            int: Number of records written
+        """
+        now = time.time()
+        with self.transaction() as cursor:
+            return self._execute_many(cursor, _UPSERT_DOCUMENT, (
+                (record["batch_id"], record["path"], record["config_name"], record["status"],
+                 record.get("error"), json.dumps(record.get("results")), now)
+                for record in records
+            ))
+
+    def update_document_status(self, updates):
+        """
+        Update the status of documents in bulk.
+
+        Args:
+            updates: Iterable of (batch_id, path, status, error) tuples
+
+        Returns:
+            int: Number of documents updated
+        """
+        now = time.time()
+        with self.transaction() as cursor:
+            return self._execute_many(cursor, _UPDATE_DOCUMENT_STATUS, (
+                (status, error, now, batch_id, path) for batch_id, path, status, error in updates
+            ))
+
+    def documents(self, batch_id=None, status=None, config_name=None, limit=None):
+        """
+        Query document records.
+
+        Args:
+            batch_id: Only documents of this batch
+            status: Only documents with this status
+            config_name: Only documents processed with this configuration
+            limit: Maximum number of records
+
+        Returns:
+            list: Records as dictionaries, results decoded
+        """
+        clauses, params = [], []
+        for column, value in (("batch_id", batch_id), ("status", status),
+                              ("config_name", config_name)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        statement = f"SELECT {_DOCUMENT_COLUMNS} FROM documents"
+        if clauses:
+            statement += " WHERE " + " AND ".join(clauses)
+        if limit is not None:
+            statement += " LIMIT ?"
+            params.append(limit)
+
+        records = []
+        for row in self._query(statement, params):
+            record = dict(zip(("batch_id", "path", "config_name", "status", "error",
+                               "results", "updated_at"), row))
+            record["results"] = json.loads(record["results"]) if record["results"] else None
+            records.append(record)
+        return records
+
+    def count_documents(self, batch_id):
+        """
+        Count the documents of a batch by status.
+
+        Args:
+            batch_id: Identifier of the batch
+
+        Returns:
+            dict: Number of documents per status
+        """
+        return dict(self._query(
+            "SELECT status, COUNT(*) FROM documents WHERE batch_id = ? GROUP BY status",
+            (batch_id,)
+        ))
+
+    def batches(self, status=None, config_name=None, limit=100):
+        """
+        Query batch records, newest first.
+
+        Args:
+            status: Only batches with this status
+            config_name: Only batches of this configuration
+            limit: Maximum number of records
+
+        Returns:
+            list: Records as dictionaries
+        """
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if config_name is not None:
+            clauses.append("config_name = ?")
+            params.append(config_name)
+
+        statement = f"SELECT {_BATCH_COLUMNS} FROM batches"
+        if clauses:
+            statement += " WHERE " + " AND ".join(clauses)
+        statement += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+
+        columns = ("batch_id", "config_name", "status", "total", "failed",
+                   "started_at", "finished_at")
+        return [dict(zip(columns, row)) for row in self._query(statement, params)]
+
+    def close(self):
+        """Close the pooled connections."""
+        self.pool.close()
@@ -0,0 +1,293 @@
+"""
+Event loop monitor for the application.
+Measures how late the Qt event loop runs and captures the stack of the GUI thread when it stalls.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+from PySide6.QtWidgets import QApplication
+
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Set to 1 to enable the monitor, or to a stall threshold in milliseconds
+ENV_VAR = "FLEXIPY_LOOP_MONITOR"
+
+DEFAULT_STALL_MS = 100
+
+_loop_lateness = metrics.histogram("ui_event_loop_lateness_seconds",
+                                   "How late the event loop heartbeat fires")
+_dispatch_seconds = metrics.histogram("ui_event_dispatch_seconds",
+                                      "Time to dispatch one event on the GUI thread")
+
+
+def stall_threshold_from_env():
+    """
+    Read the monitor setting from the environment.
+
+    Returns:
+        float: Stall threshold in milliseconds, or None if monitoring is off
+    """
+    value = os.environ.get(ENV_VAR, "").strip()
+    if value in ("", "0"):
+        return None
+    try:
+        threshold = float(value)
+    except ValueError:
+        return DEFAULT_STALL_MS
+    return threshold if threshold > 1 else DEFAULT_STALL_MS
+
+
+def default_log_path():
+    """Return the path of the monitor log under the user's home directory."""
+    return os.path.join(os.path.expanduser("~"), ".flexipy", "logs", "event_loop.log")
+
+
+class MonitoredApplication(QApplication):
+    """
+    QApplication that times the events it dispatches for an EventLoopMonitor.
+
+    Only outermost dispatches are timed, so an event handler that opens a
+    modal dialog counts as one long dispatch; the heartbeat keeps running
+    inside the dialog's own loop and does not report it as a stall.
+    """
+
+    def __init__(self, argv):
+        super().__init__(argv)
+        self.monitor = None
+        self._depth = 0
+
+    def notify(self, receiver, event):
+        monitor = self.monitor
+        if monitor is None or self._depth:
+            return super().notify(receiver, event)
+
+        # Work out the key first; the receiver may be deleted by the event
+        key = (type(receiver).__name__, event.type())
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            return super().notify(receiver, event)
+        finally:
+            self._depth -= 1
+            monitor.record_dispatch(key, (time.perf_counter() - start) * 1000)
+
+
+class EventLoopMonitor(QObject):
+    """
+    Measures event loop latency on the GUI thread and reports stalls.
+
+    A precise heartbeat timer records how late each tick fires. A watchdog
+    thread notices when the heartbeat stops for longer than the stall
+    threshold and captures the GUI thread's Python stack while it is still
+    blocked, so the handler responsible shows up in the log. The log file
+    is only written from the watchdog thread.
+    """
+
+    # Emitted on the GUI thread when a stall ends, with its record
+    stall_detected = Signal(object)
+
+    def __init__(self, interval_ms=20, stall_ms=DEFAULT_STALL_MS, log_path=None,
+                 max_stalls=50, parent=None):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval_ms: Heartbeat interval in milliseconds
+            stall_ms: Lateness in milliseconds reported as a stall
+            log_path: File the stalls are appended to. If None, uses the default.
+            max_stalls: Number of recent stalls kept in memory
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.stall_ms = stall_ms
+        self.log_path = log_path or default_log_path()
+
+        # Kept in the metrics registry, so they are exported with every other metric
+        self.latency = _loop_lateness
+        self.dispatch = _dispatch_seconds
+        # (receiver class, event type) -> [count, total ms, max ms]
+        self.dispatch_by_key = {}
+        self.stalls = deque(maxlen=max_stalls)
+        self.stall_count = 0
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._on_heartbeat)
+
+        self._gui_thread = None
+        self._last_beat = 0.0
+        self._captured_beat = None
+        self._captured = None
+        self._log_lines = deque()
+        self._stopping = threading.Event()
+        self._watchdog = None
+
+    def start(self):
+        """Start the heartbeat and the watchdog. Must be called on the GUI thread."""
+        if self._watchdog is not None:
+            return
+        self._gui_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopping.clear()
+        self.timer.start(self.interval_ms)
+
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+
+        self._log(f"Monitoring started: heartbeat {self.interval_ms} ms, "
+                  f"stall threshold {self.stall_ms:g} ms")
+        self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog",
+                                          daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        """Stop monitoring and write a summary to the log."""
+        if self._watchdog is None:
+            return
+        self.timer.stop()
+        self._log(f"Monitoring stopped: {self.summary_line()}")
+        self._stopping.set()
+        self._watchdog.join(timeout=2.0)
+        self._watchdog = None
+
+    def record_dispatch(self, key, elapsed_ms):
+        """
+        Record how long the dispatch of one event took.
+
+        Args:
+            key: (receiver class name, event type) of the event
+            elapsed_ms: Dispatch time in milliseconds
+        """
+        self.dispatch.observe(elapsed_ms / 1000)
+        stats = self.dispatch_by_key.get(key)
+        if stats is None:
+            self.dispatch_by_key[key] = [1, elapsed_ms, elapsed_ms]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed_ms
+            if elapsed_ms > stats[2]:
+                stats[2] = elapsed_ms
+
+    def slowest_dispatches(self, count=3):
+        """
+        Return the event kinds with the longest single dispatch.
+
+        Returns:
+            list: (receiver class, event type name, dispatches, max ms) tuples
+        """
+        ranked = sorted(self.dispatch_by_key.items(), key=lambda item: item[1][2],
+                        reverse=True)
+        return [
+            (receiver, getattr(event_type, "name", str(event_type)), stats[0], stats[2])
+            for (receiver, event_type), stats in ranked[:count]
+        ]
+
+    def snapshot(self):
+        """Return the current statistics as a dictionary."""
+        return {
+            "latency": _snapshot_ms(self.latency),
+            "dispatch": _snapshot_ms(self.dispatch),
+            "slowest": self.slowest_dispatches(),
+            "stalls": self.stall_count,
+            "last_stall": self.stalls[-1] if self.stalls else None,
+        }
+
+    def summary_line(self):
+        """Return the latency and stall statistics on one line."""
+        latency = _snapshot_ms(self.latency)
+        return (f"latency p50 {latency['p50']:.1f} ms, p99 {latency['p99']:.1f} ms, "
+                f"max {latency['max']:.1f} ms over {latency['count']} beats, "
+                f"{self.stall_count} stall(s)")
+
+    def _on_heartbeat(self):
+        now = time.monotonic()
+        late_ms = max((now - self._last_beat) * 1000 - self.interval_ms, 0.0)
+        self._last_beat = now
+        self.latency.observe(late_ms / 1000)
+
+        if late_ms >= self.stall_ms:
+            captured, self._captured = self._captured, None
+            where, stack = captured if captured else ("unknown", [])
+            stall = {
+                "time": time.time(),
+                "duration_ms": late_ms,
+                "where": where,
+                "stack": stack,
+            }
+            self.stalls.append(stall)
+            self.stall_count += 1
+            self._log(f"Stall ended after {late_ms:.0f} ms in {where}")
+            self.stall_detected.emit(stall)
+
+    def _watch(self):
+        """Watchdog thread: capture the GUI stack during stalls and write the log."""
+        poll = max(self.stall_ms / 4000.0, 0.005)
+        log_file = None
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            log_file = open(self.log_path, "a", encoding="utf-8")
+        except OSError as e:
+            logger.error("Error opening event loop log %s: %s", self.log_path, e)
+
+        while True:
+            stopping = self._stopping.wait(poll)
+
+            last_beat = self._last_beat
+            blocked_ms = (time.monotonic() - last_beat) * 1000 - self.interval_ms
+            if (not stopping and blocked_ms >= self.stall_ms
+                    and last_beat != self._captured_beat):
+                # Capture once per stall, while the GUI thread is still stuck
+                self._captured_beat = last_beat
+                self._captured = self._capture_stack()
+                where, stack = self._captured
+                self._log(f"Stall: GUI thread blocked for {blocked_ms:.0f} ms in {where}\n"
+                          + "".join(stack).rstrip())
+
+            if log_file is not None and self._log_lines:
+                try:
+                    while self._log_lines:
+                        log_file.write(self._log_lines.popleft() + "\n")
+                    log_file.flush()
+                except OSError as e:
+                    logger.error("Error writing event loop log %s: %s", self.log_path, e)
+
+            if stopping:
+                break
+
+        if log_file is not None:
+            log_file.close()
+
+    def _capture_stack(self):
+        """Return where the GUI thread is and its formatted stack."""
+        frame = sys._current_frames().get(self._gui_thread)
+        if frame is None:
+            return "unknown", []
+        code = frame.f_code
+        where = f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        return where, traceback.format_stack(frame)
+
+    def _log(self, message):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._log_lines.append(f"{stamp} {message}")
+
+
+def _snapshot_ms(histogram):
+    """Return the count, mean, p50, p99 and maximum of a histogram in milliseconds."""
+    stats = histogram.snapshot()
+    return {
+        "count": stats["count"],
+        "mean": stats["sum"] / stats["count"] * 1000 if stats["count"] else 0.0,
+        "p50": stats["p50"] * 1000,
+        "p99": stats["p99"] * 1000,
+        "max": stats["max"] * 1000,
+    }
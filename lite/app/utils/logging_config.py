@@ -0,0 +1,228 @@
+"""
+Logging configuration for the application.
+Hands log records to a background thread that formats them and writes them to stderr and rotating files.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+# Overrides of the level and format, e.g. FLEXIPY_LOG_LEVEL=DEBUG FLEXIPY_LOG_JSON=1
+LEVEL_ENV_VAR = "FLEXIPY_LOG_LEVEL"
+JSON_ENV_VAR = "FLEXIPY_LOG_JSON"
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s %(processName)s %(name)s: %(message)s"
+
+# Attributes every LogRecord has; anything else was passed in extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+_lock = threading.Lock()
+
+
+def default_log_path():
+    """Return the path of the application log under the user's home directory."""
+    return os.path.join(os.path.expanduser("~"), ".flexipy", "logs", "flexipy.log")
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including extra fields."""
+
+    def format(self, record):
+        data = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.processName,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = record.stack_info
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops repeats of the same message beyond a burst per period.
+
+    Messages are told apart by logger, level and format string, not by
+    their arguments, so "Error claiming %s" for a thousand files counts as
+    one message. The first record let through after a quiet spell says
+    how many were dropped.
+    """
+
+    def __init__(self, burst=10, period=60.0):
+        """
+        Initialize the filter.
+
+        Args:
+            burst: Records of one message let through per period
+            period: Length of the period in seconds
+        """
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        # (logger, level, msg) -> [period start, records let through, records dropped]
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.get(key)
+            if window is None or now - window[0] >= self.period:
+                dropped = window[2] if window is not None else 0
+                self.windows[key] = [now, 1, 0]
+                if len(self.windows) > 10000:
+                    self._prune(now)
+            elif window[1] < self.burst:
+                window[1] += 1
+                dropped = 0
+            else:
+                window[2] += 1
+                return False
+
+        if dropped:
+            record.suppressed = dropped
+        return True
+
+    def _prune(self, now):
+        for key in [key for key, window in self.windows.items()
+                    if now - window[0] >= self.period]:
+            del self.windows[key]
+
+
+class _SuppressedFormatter(logging.Formatter):
+    """Text formatter that notes how many repeats were dropped before a record."""
+
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" ({suppressed} similar message(s) suppressed)"
+        return text
+
+
+def setup_logging(level=None, log_file="", json_format=None, console=True,
+                  max_bytes=10 * 1024 * 1024, backup_count=5, burst=10, period=60.0):
+    """
+    Route the root logger through a queue to a background writer.
+
+    Logging calls only format the message and put the record on the
+    queue; the listener thread does the file and console output, so
+    logging never blocks the GUI thread or the engine threads on I/O.
+    Calling it again does nothing until shutdown_logging.
+
+    Args:
+        level: Level name or number. If None, uses FLEXIPY_LOG_LEVEL or INFO.
+        log_file: Rotating log file. If empty, uses the default; if None, no file.
+        json_format: Write JSON lines. If None, uses FLEXIPY_LOG_JSON.
+        console: Also write to stderr
+        max_bytes: Size at which the log file is rotated
+        backup_count: Rotated files kept
+        burst: Records of one message let through per period
+        period: Rate limiting period in seconds
+
+    Returns:
+        QueueListener: The running listener
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        if level is None:
+            level = os.environ.get(LEVEL_ENV_VAR, "INFO").upper()
+        if json_format is None:
+            json_format = os.environ.get(JSON_ENV_VAR, "") not in ("", "0")
+        formatter = JsonFormatter() if json_format else _SuppressedFormatter(TEXT_FORMAT)
+
+        handlers = []
+        if console:
+            handlers.append(logging.StreamHandler())
+        if log_file == "":
+            log_file = default_log_path()
+        if log_file is not None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+                handlers.append(logging.handlers.RotatingFileHandler(
+                    log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+                ))
+            except OSError as e:
+                logging.getLogger(__name__).warning("Cannot open log file %s: %s", log_file, e)
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        # Unbounded, so a slow disk delays the writer but never the caller
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter(burst, period))
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers,
+                                                   respect_handler_level=True)
+        _listener.queue_handler = queue_handler
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging():
+    """Write out the queued records and stop the background writer."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_listener.queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+class _TaggedQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that wraps records in a ("log", record) message."""
+
+    def enqueue(self, record):
+        self.queue.put(("log", record))
+
+
+def setup_worker_logging(outbox, level=None):
+    """
+    Send the records of a worker process to its parent.
+
+    The parent passes ("log", record) messages from the outbox to
+    handle_worker_record, so worker records end up in the parent's files.
+
+    Args:
+        outbox: Queue the worker reports to
+        level: Lowest level sent to the parent. If None, uses FLEXIPY_LOG_LEVEL or INFO.
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_TaggedQueueHandler(outbox))
+    root.setLevel(level or os.environ.get(LEVEL_ENV_VAR, "INFO").upper())
+
+
+def handle_worker_record(record):
+    """Log a record received from a worker process in this process."""
+    logger = logging.getLogger(record.name)
+    if logger.isEnabledFor(record.levelno):
+        logger.handle(record)
@@ -0,0 +1,354 @@
+"""
+Metrics registry for the application.
+Provides counters, gauges and latency histograms, exported as Prometheus text or a JSON snapshot.
+"""
+import json
+import math
+import threading
+import time
+
+# Sub-bucket bits of the histograms: each power of two is split into 2^7 buckets,
+# which keeps every recorded value within 1% of its bucket
+_SUB_BITS = 7
+_SUB_MASK = (1 << _SUB_BITS) - 1
+
+# Values below this many microseconds get a bucket each
+_EXACT_LIMIT = 2 << _SUB_BITS
+
+# Upper bounds in seconds of the buckets exported to Prometheus
+PROMETHEUS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                      1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Cells:
+    """
+    Per-thread storage of a metric.
+
+    Each thread updates only its own cell, so updates need no lock; readers
+    add the cells up. Cells of threads that have exited are kept, so
+    nothing they recorded is lost.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.local = threading.local()
+        self.cells = []
+        self.lock = threading.Lock()
+
+    def get(self):
+        """Return the cell of the calling thread, creating it on first use."""
+        try:
+            return self.local.cell
+        except AttributeError:
+            cell = self.factory()
+            with self.lock:
+                self.cells.append(cell)
+            self.local.cell = cell
+            return cell
+
+    def all(self):
+        """Return every cell."""
+        with self.lock:
+            return list(self.cells)
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self):
+        self._cells = _Cells(lambda: [0])
+
+    def inc(self, amount=1):
+        """
+        Increase the count.
+
+        Args:
+            amount: Non-negative amount to add
+        """
+        self._cells.get()[0] += amount
+
+    @property
+    def value(self):
+        return sum(cell[0] for cell in self._cells.all())
+
+
+class Gauge:
+    """Value that can go up and down, such as a queue length."""
+
+    kind = "gauge"
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def set(self, value):
+        """Set the value."""
+        self.value = value
+
+    def inc(self, amount=1):
+        """Add amount to the value."""
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        """Subtract amount from the value."""
+        with self.lock:
+            self.value -= amount
+
+
+class _HistogramCell:
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+
+class _Timer:
+    """Context manager that records its duration in a histogram."""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Histogram:
+    """
+    Latency histogram with HDR-style log-linear buckets.
+
+    Values are recorded in microseconds into buckets that split every
+    power of two into 128 parts, so percentiles are accurate to about 1%
+    from one microsecond to hours, in a few hundred sparse buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(self):
+        self._cells = _Cells(_HistogramCell)
+
+    def observe(self, seconds):
+        """
+        Record a duration.
+
+        Args:
+            seconds: Duration in seconds
+        """
+        value = int(seconds * 1e6) if seconds > 0 else 0
+        if value < _EXACT_LIMIT:
+            key = value
+        else:
+            # Keep the leading bit and the _SUB_BITS bits after it
+            shift = value.bit_length() - _SUB_BITS - 1
+            key = ((shift + 1) << _SUB_BITS) + ((value >> shift) & _SUB_MASK)
+
+        cell = self._cells.get()
+        cell.counts[key] = cell.counts.get(key, 0) + 1
+        cell.count += 1
+        cell.total += seconds
+        if seconds < cell.min:
+            cell.min = seconds
+        if seconds > cell.max:
+            cell.max = seconds
+
+    def time(self):
+        """Return a context manager that records how long its block takes."""
+        return _Timer(self)
+
+    def merged(self):
+        """
+        Add up the cells of every thread.
+
+        Returns:
+            tuple: (sorted list of (bucket upper bound in seconds, count), count,
+            total, min, max)
+        """
+        counts = {}
+        count, total, low, high = 0, 0.0, math.inf, 0.0
+        for cell in self._cells.all():
+            for key, n in list(cell.counts.items()):
+                counts[key] = counts.get(key, 0) + n
+            count += cell.count
+            total += cell.total
+            low = min(low, cell.min)
+            high = max(high, cell.max)
+
+        buckets = []
+        for key in sorted(counts):
+            if key < _EXACT_LIMIT:
+                upper = key + 1
+            else:
+                shift = (key >> _SUB_BITS) - 1
+                upper = ((1 << _SUB_BITS) + (key & _SUB_MASK) + 1) << shift
+            buckets.append((upper / 1e6, counts[key]))
+        return buckets, count, total, (low if count else 0.0), high
+
+    def snapshot(self):
+        """Return the count, sum, extremes and percentiles in seconds as a dictionary."""
+        buckets, count, total, low, high = self.merged()
+        result = {"count": count, "sum": total, "min": low, "max": high}
+        for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999)):
+            result[name] = _percentile(buckets, count, fraction, high)
+        return result
+
+
+def _percentile(buckets, count, fraction, maximum):
+    if not count:
+        return 0.0
+    rank = fraction * count
+    seen = 0
+    for upper, n in buckets:
+        seen += n
+        if seen >= rank:
+            return min(upper, maximum)
+    return maximum
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of the process.
+
+    A metric is identified by its name and labels; asking for the same
+    pair again returns the same object, so callers can look a metric up
+    once and keep it.
+    """
+
+    def __init__(self):
+        # name -> (kind, help); (name, sorted labels) -> metric
+        self.families = {}
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def counter(self, name, help="", **labels):
+        """Return the counter with the given name and labels."""
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help="", **labels):
+        """Return the gauge with the given name and labels."""
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name, help="", **labels):
+        """Return the histogram, in seconds, with the given name and labels."""
+        return self._get(Histogram, name, help, labels)
+
+    def _get(self, cls, name, help, labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        metric = self.metrics.get(key)
+        if metric is not None:
+            return metric
+
+        with self.lock:
+            family = self.families.get(name)
+            if family is not None and family[0] != cls.kind:
+                raise ValueError(f"Metric {name} is a {family[0]}, not a {cls.kind}")
+            if family is None or (help and not family[1]):
+                self.families[name] = (cls.kind, help)
+            metric = self.metrics.get(key)
+            if metric is None:
+                metric = self.metrics[key] = cls()
+        return metric
+
+    def _items(self):
+        with self.lock:
+            return sorted(self.metrics.items(), key=lambda item: item[0])
+
+    def snapshot(self):
+        """
+        Return every metric as plain data.
+
+        Returns:
+            dict: Metric name -> list of {"labels": dict, ...values}
+        """
+        result = {}
+        for (name, labels), metric in self._items():
+            entry = {"labels": dict(labels)}
+            if isinstance(metric, Histogram):
+                entry.update(metric.snapshot())
+            else:
+                entry["value"] = metric.value
+            result.setdefault(name, []).append(entry)
+        return result
+
+    def to_json(self):
+        """Return a JSON snapshot of every metric."""
+        return json.dumps({"time": time.time(), "metrics": self.snapshot()}, indent=2)
+
+    def to_prometheus(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        described = set()
+        for (name, labels), metric in self._items():
+            if name not in described:
+                described.add(name)
+                kind, help = self.families[name]
+                if help:
+                    lines.append(f"# HELP {name} {_escape(help, quote=False)}")
+                lines.append(f"# TYPE {name} {kind}")
+
+            if not isinstance(metric, Histogram):
+                lines.append(f"{name}{_labels(labels)} {_number(metric.value)}")
+                continue
+
+            buckets, count, total, _, _ = metric.merged()
+            cumulative = 0
+            index = 0
+            for bound in PROMETHEUS_BUCKETS:
+                while index < len(buckets) and buckets[index][0] <= bound:
+                    cumulative += buckets[index][1]
+                    index += 1
+                lines.append(f"{name}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+            lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {count}')
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Write every metric to a file, as JSON if the path ends in .json and
+        as Prometheus text otherwise.
+
+        Args:
+            path: Path of the file
+        """
+        text = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def _escape(text, quote=True):
+    text = text.replace("\\", "\\\\").replace("\n", "\\n")
+    return text.replace('"', '\\"') if quote else text
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value) if math.isfinite(value) else ("+Inf" if value > 0 else "NaN")
+    return str(value)
+
+
+# Registry shared by the whole process
+REGISTRY = MetricsRegistry()
+
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
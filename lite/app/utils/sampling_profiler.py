@@ -0,0 +1,136 @@
+"""
+Sampling profiler for the application.
+Samples the stacks of every thread while running and writes them as collapsed stacks for flame graphs.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def default_profile_dir():
+    """Return the directory profiles are written to under the user's home directory."""
+    return os.path.join(os.path.expanduser("~"), ".flexipy", "profiles")
+
+
+class SamplingProfiler:
+    """
+    In-process sampling profiler.
+
+    While running, a thread reads the stack of every other thread through
+    sys._current_frames at a fixed interval and counts identical stacks.
+    Nothing is hooked into the interpreter and no thread exists while the
+    profiler is stopped, so it costs nothing until it is switched on.
+    The output is one "thread;outer;...;inner count" line per stack, the
+    collapsed format read by flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self, interval=0.005, output_dir=None):
+        """
+        Initialize the profiler.
+
+        Args:
+            interval: Seconds between samples
+            output_dir: Directory profiles are written to. If None, uses the default.
+        """
+        self.interval = interval
+        self.output_dir = output_dir or default_profile_dir()
+        self.thread = None
+        self.stopping = threading.Event()
+        self.output_path = None
+        self.samples = 0
+
+    @property
+    def running(self):
+        """Whether the profiler is sampling."""
+        return self.thread is not None
+
+    def start(self):
+        """
+        Start sampling.
+
+        Returns:
+            str: Path the profile will be written to when the profiler stops
+        """
+        if self.thread is not None:
+            return self.output_path
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.output_path = os.path.join(self.output_dir, f"profile-{stamp}.folded")
+        self.samples = 0
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+        return self.output_path
+
+    def stop(self):
+        """
+        Stop sampling and write the profile.
+
+        Returns:
+            str: Path of the written profile, or None if nothing was written
+        """
+        if self.thread is None:
+            return None
+        self.stopping.set()
+        self.thread.join()
+        self.thread = None
+        return self.output_path if os.path.exists(self.output_path) else None
+
+    def toggle(self):
+        """
+        Start the profiler if it is stopped, stop it otherwise.
+
+        Returns:
+            str: Path of the profile being recorded or just written
+        """
+        return self.stop() if self.running else self.start()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        # Stacks are counted as tuples of code objects and only named when written
+        counts = {}
+        names = {}
+
+        while not self.stopping.wait(self.interval):
+            names.update((thread.ident, thread.name) for thread in threading.enumerate())
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                key = (thread_id, tuple(reversed(stack)))
+                counts[key] = counts.get(key, 0) + 1
+            self.samples += 1
+
+        self._write(counts, names)
+
+    def _write(self, counts, names):
+        labels = {}
+
+        def label(code):
+            text = labels.get(code)
+            if text is None:
+                filename = os.path.basename(code.co_filename)
+                # Semicolons separate frames in the collapsed format
+                text = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+                labels[code] = text
+            return text
+
+        lines = {}
+        for (thread_id, stack), count in counts.items():
+            thread_name = names.get(thread_id, f"thread-{thread_id}").replace(";", ":")
+            line = ";".join([thread_name] + [label(code) for code in stack])
+            lines[line] = lines.get(line, 0) + count
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(self.output_path, "w", encoding="utf-8") as f:
+                for line, count in sorted(lines.items()):
+                    f.write(f"{line} {count}\n")
+        except IOError as e:
+            logger.error("Error writing profile %s: %s", self.output_path, e)
@@ -0,0 +1,230 @@
+"""
+Thumbnail cache for the application.
+Provides the in-memory and on-disk tiers used to store document thumbnails.
+"""
+import logging
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Record header in a pack file: data length, key length
+_RECORD_HEADER = struct.Struct("<IH")
+
+
+class MemoryLRU:
+    """
+    Least recently used cache bounded by the total cost of its entries.
+    """
+
+    def __init__(self, max_cost):
+        """
+        Initialize the cache.
+
+        Args:
+            max_cost: Total cost the cache may hold, e.g. bytes
+        """
+        self.max_cost = max_cost
+        self.entries = OrderedDict()
+        self.total_cost = 0
+
+    def get(self, key):
+        """
+        Get an entry and mark it as recently used.
+
+        Args:
+            key: Key of the entry
+
+        Returns:
+            The cached value, or None if absent
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, cost):
+        """
+        Add an entry, evicting the least recently used ones to make room.
+
+        Args:
+            key: Key of the entry
+            value: Value to cache
+            cost: Cost of the value, e.g. its size in bytes
+        """
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.total_cost -= old[1]
+        self.entries[key] = (value, cost)
+        self.total_cost += cost
+        while self.total_cost > self.max_cost and len(self.entries) > 1:
+            _, (_, evicted_cost) = self.entries.popitem(last=False)
+            self.total_cost -= evicted_cost
+
+    def clear(self):
+        """Remove every entry."""
+        self.entries.clear()
+        self.total_cost = 0
+
+
+class ThumbnailPack:
+    """
+    Append-only file holding the encoded thumbnails of one batch.
+
+    Each record is a small header, the key and the encoded image. The
+    index is rebuilt from the headers when the pack is opened, so there is
+    no separate index file to keep in sync; a record cut short by a crash
+    is truncated away. Safe to use from several threads.
+    """
+
+    def __init__(self, path):
+        """
+        Open or create a pack.
+
+        Args:
+            path: Path of the pack file
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.index = {}
+        self.lock = threading.Lock()
+        self.file = open(path, "a+b")
+        self._load_index()
+        # The modification time doubles as the last-used time for prune_packs
+        os.utime(path)
+
+    def _load_index(self):
+        """Scan the record headers and map each key to its data."""
+        f = self.file
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        offset = 0
+        while offset + _RECORD_HEADER.size <= size:
+            f.seek(offset)
+            data_length, key_length = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+            data_offset = offset + _RECORD_HEADER.size + key_length
+            if data_offset + data_length > size:
+                break
+            key = f.read(key_length).decode("utf-8")
+            self.index[key] = (data_offset, data_length)
+            offset = data_offset + data_length
+
+        if offset < size:
+            logger.warning("Truncating damaged thumbnail pack %s at %d bytes", self.path, offset)
+            f.truncate(offset)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, key):
+        """
+        Read the encoded thumbnail of a key.
+
+        Args:
+            key: Key of the thumbnail
+
+        Returns:
+            bytes: Encoded image, or None if absent
+        """
+        with self.lock:
+            location = self.index.get(key)
+            if location is None or self.file.closed:
+                return None
+            self.file.seek(location[0])
+            return self.file.read(location[1])
+
+    def put(self, key, data):
+        """
+        Append the encoded thumbnail of a key.
+
+        Args:
+            key: Key of the thumbnail
+            data: Encoded image
+        """
+        encoded_key = key.encode("utf-8")
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.seek(0, os.SEEK_END)
+            offset = self.file.tell()
+            self.file.write(_RECORD_HEADER.pack(len(data), len(encoded_key)))
+            self.file.write(encoded_key)
+            self.file.write(data)
+            self.file.flush()
+            self.index[key] = (offset + _RECORD_HEADER.size + len(encoded_key), len(data))
+
+    def close(self):
+        """Close the pack file. Later reads find nothing and writes are dropped."""
+        with self.lock:
+            self.file.close()
+
+
+def prune_packs(directory, max_bytes, keep=()):
+    """
+    Delete the least recently used packs until the rest fit in max_bytes.
+
+    Args:
+        directory: Directory holding the packs
+        max_bytes: Total size the packs may take
+        keep: Paths of packs in use, which are never deleted
+
+    Returns:
+        int: Number of packs deleted
+    """
+    keep = {os.path.abspath(path) for path in keep}
+    packs = []
+    total = 0
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".pack"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                packs.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    except FileNotFoundError:
+        return 0
+
+    removed = 0
+    for _, size, path in sorted(packs):
+        if total <= max_bytes:
+            break
+        if os.path.abspath(path) in keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error("Error removing thumbnail pack %s: %s", path, e)
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def default_pack_dir():
+    """Return the directory thumbnail packs are stored in, under ~/.flexipy/cache."""
+    return os.path.join(os.path.expanduser("~"), ".flexipy", "cache", "thumbnails")
+
+
+def default_pack_path(batch_id):
+    """
+    Return where the thumbnail pack of a batch is stored.
+
+    Args:
+        batch_id: Identifier of the batch
+
+    Returns:
+        str: Path under ~/.flexipy/cache/thumbnails
+    """
+    return os.path.join(default_pack_dir(), f"{batch_id}.pack")
@@ -0,0 +1,457 @@
+import locale
+from bisect import bisect_left
+from itertools import groupby
+from operator import attrgetter
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+def collation_key_function():
+    """
+    Return a function mapping text to a key that sorts in the user's locale.
+
+    The keys are plain strings, so sorting compares them at C speed instead
+    of calling into a collator for every comparison. QApplication applies
+    the user's locale on start-up; without one, text sorts case-insensitively.
+    """
+    try:
+        language, _ = locale.getlocale(locale.LC_COLLATE)
+    except ValueError:
+        language = None
+    if language in (None, "C", "POSIX"):
+        return str.casefold
+    return locale.strxfrm
+
+
+class Column:
+    """A column of the configuration table."""
+
+    def __init__(self, header, value, key=None):
+        """
+        Initialize the column.
+
+        Args:
+            header: Header text
+            value: Attribute of ConfigModel shown, or a callable(ConfigModel)
+                returning the displayed value
+            key: Callable(value) returning the sort key. If None, text is collated.
+        """
+        self.header = header
+        self.attribute = value if isinstance(value, str) else None
+        self.value = attrgetter(value) if isinstance(value, str) else value
+        self.key = key
+
+
+# Above this many row ranges, a reload is applied as one layout change
+MAX_RANGES = 64
+
+
+# Metadata columns go here; numeric ones should pass key=lambda value: value
+COLUMNS = [
+    Column("Name", "name"),
+    Column("Description", "description"),
+]
+
+
+class ConfigTableModel(QAbstractTableModel):
+    """
+    Table model of the stored configurations with precomputed sort keys.
+
+    Rows get a permanent id when they are added. The sorted order is a
+    list of ids, always ascending by (key, id): a descending view reads it
+    back to front, so flipping the direction does not sort again. Sort keys
+    are computed once per column, the first time it is sorted, and kept up
+    to date from then on, so a changed configuration is moved to its new
+    row with a binary search instead of a full sort.
+    """
+
+    def __init__(self, columns=None, parent=None):
+        """
+        Initialize the model.
+
+        Args:
+            columns: List of Column. If None, uses COLUMNS.
+            parent: Parent QObject
+        """
+        super().__init__(parent)
+        self.columns = columns or COLUMNS
+        attributes = [column.attribute for column in self.columns]
+        if None in attributes:
+            values = [column.value for column in self.columns]
+            self.row_values = lambda config: tuple(value(config) for value in values)
+        else:
+            # Every displayed value of a row at once, in C
+            self.row_values = attrgetter(*attributes)
+        self.collate = collation_key_function()
+        self.configs = {}
+        self.ids = {}
+        self.next_id = 0
+        self.order = []
+        # column -> {id: sort key}, for the columns sorted so far
+        self.keys = {}
+        self.sort_column = -1
+        self.descending = False
+
+    # Qt model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        config = self.configs[self._id_at(index.row())]
+        return self.columns[index.column()].value(config)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section].header
+        return super().headerData(section, orientation, role)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort by a column, keeping the selection and other persistent indexes."""
+        descending = order == Qt.DescendingOrder
+        if column == self.sort_column and descending == self.descending:
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        persistent_ids = [self._id_at(index.row()) for index in persistent]
+
+        if column != self.sort_column:
+            if column < 0:
+                self.order = list(self.configs)
+            else:
+                keys = self._column_keys(column)
+                # Ids are in ascending order and the sort is stable, so ties stay by id
+                self.order = sorted(self.configs, key=keys.__getitem__)
+            self.sort_column = column
+        self.descending = descending
+
+        self.changePersistentIndexList(persistent, [
+            self.index(self._row_of(row_id), index.column())
+            for row_id, index in zip(persistent_ids, persistent)
+        ])
+        self.layoutChanged.emit()
+
+    # Configurations
+
+    def config(self, row):
+        """Return the configuration shown in a row."""
+        return self.configs[self._id_at(row)]
+
+    def row_of(self, name):
+        """Return the row of a configuration by name, or -1 if it is not shown."""
+        row_id = self.ids.get(name)
+        return -1 if row_id is None else self._row_of(row_id)
+
+    def set_configs(self, configs):
+        """
+        Replace every row.
+
+        Args:
+            configs: Iterable of ConfigModel with unique names
+        """
+        self.beginResetModel()
+        self.configs = {}
+        self.ids = {}
+        for config in configs:
+            self.configs[self.next_id] = config
+            self.ids[config.name] = self.next_id
+            self.next_id += 1
+        self.keys = {}
+        if self.sort_column >= 0:
+            self.order = sorted(self.configs,
+                                key=self._column_keys(self.sort_column).__getitem__)
+        else:
+            self.order = list(self.configs)
+        self.endResetModel()
+
+    def add_config(self, config):
+        """
+        Insert a configuration at its sorted position, or update it if its
+        name is already shown.
+
+        Args:
+            config: ConfigModel to insert
+        """
+        if config.name in self.ids:
+            self.update_config(config)
+            return
+
+        row_id = self.next_id
+        self.next_id += 1
+        position = bisect_left(self.order, self._sort_tuple(row_id, config),
+                               key=self._order_key)
+        row = self._view_row(position, len(self.order) + 1)
+
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.configs[row_id] = config
+        self.ids[config.name] = row_id
+        self._set_keys(row_id, config)
+        self.order.insert(position, row_id)
+        self.endInsertRows()
+
+    def update_config(self, config):
+        """
+        Replace the configuration with the same name and move it to its new
+        sorted row.
+
+        Args:
+            config: ConfigModel replacing the one shown
+        """
+        row_id = self.ids.get(config.name)
+        if row_id is None:
+            self.add_config(config)
+            return
+
+        row = self._move_row(row_id, config)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+
+    def _move_row(self, row_id, config):
+        """Store a row's new configuration and move the row to its sorted place."""
+        count = len(self.order)
+        old_position = self._position_of(row_id)
+        insert_at = bisect_left(self.order, self._sort_tuple(row_id, config),
+                                key=self._order_key)
+        new_position = insert_at - 1 if insert_at > old_position else insert_at
+
+        if new_position == old_position:
+            self.configs[row_id] = config
+            self._set_keys(row_id, config)
+            return self._view_row(old_position, count)
+
+        old_row = self._view_row(old_position, count)
+        new_row = self._view_row(new_position, count)
+        # The destination is the row the moved one goes before, as it is now
+        destination = new_row + 1 if new_row > old_row else new_row
+        self.beginMoveRows(QModelIndex(), old_row, old_row, QModelIndex(), destination)
+        self.order.pop(old_position)
+        self.configs[row_id] = config
+        self._set_keys(row_id, config)
+        self.order.insert(new_position, row_id)
+        self.endMoveRows()
+        return new_row
+
+    def remove_config(self, name):
+        """
+        Remove a configuration by name.
+
+        Args:
+            name: Name of the configuration
+        """
+        row_id = self.ids.get(name)
+        if row_id is None:
+            return
+        position = self._position_of(row_id)
+        row = self._view_row(position, len(self.order))
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.order.pop(position)
+        del self.configs[row_id]
+        del self.ids[name]
+        for keys in self.keys.values():
+            keys.pop(row_id, None)
+        self.endRemoveRows()
+
+    def reconcile(self, configs):
+        """
+        Update the rows to a new snapshot of the configurations, emitting
+        only what changed.
+
+        Rows whose displayed values are unchanged get the new object
+        silently. Removed, inserted and repainted rows are coalesced into
+        contiguous ranges, so the view keeps its selection and scroll
+        position and repaints only those. When a reload touches more than
+        MAX_RANGES ranges, it is applied as a single layout change instead.
+
+        Args:
+            configs: Iterable of ConfigModel with unique names
+
+        Returns:
+            tuple: Number of (added, changed, removed) configurations
+        """
+        snapshot = {config.name: config for config in configs}
+        removed = [row_id for name, row_id in self.ids.items() if name not in snapshot]
+        added = []
+        changed = []
+        moved = []
+        sort_keys = self.keys.get(self.sort_column)
+        ids = self.ids
+        stored = self.configs
+        row_values = self.row_values
+
+        for name, config in snapshot.items():
+            row_id = ids.get(name)
+            if row_id is None:
+                added.append(config)
+                continue
+            old = stored[row_id]
+            if old is config:
+                continue
+            if row_values(old) == row_values(config):
+                stored[row_id] = config
+            elif sort_keys is not None and self._sort_tuple(row_id, config)[0] != sort_keys[row_id]:
+                moved.append((row_id, config))
+            else:
+                changed.append((row_id, config))
+
+        if not (removed or added or changed or moved):
+            return 0, 0, 0
+
+        # Removed rows as ranges of positions in the ascending order
+        removal_ranges = _ranges(sorted(self._position_of(row_id) for row_id in removed))
+
+        for row_id in removed:
+            del self.ids[self.configs[row_id].name]
+        for config in added:
+            self.ids[config.name] = self.next_id
+            self.configs[self.next_id] = config
+            self.next_id += 1
+        entering = [self.ids[config.name] for config in added]
+
+        if len(removal_ranges) + len(moved) + len(entering) > MAX_RANGES:
+            self._apply_as_layout(removed, moved, changed, entering)
+        else:
+            self._apply_as_ranges(removed, moved, changed, entering, removal_ranges)
+
+        return len(added), len(changed) + len(moved), len(removed)
+
+    def _apply_as_ranges(self, removed, moved, changed, entering, removal_ranges):
+        """Apply a reload as row removals, moves, insertions and repaints."""
+        count = len(self.order)
+        # From the end, so the positions of the ranges still to go stay valid
+        for first, last in reversed(removal_ranges):
+            rows = sorted((self._view_row(first, count), self._view_row(last, count)))
+            self.beginRemoveRows(QModelIndex(), rows[0], rows[1])
+            del self.order[first:last + 1]
+            count = len(self.order)
+            self.endRemoveRows()
+
+        self._drop_rows(removed)
+        # Moved one by one, so a selected row stays selected
+        for row_id, config in moved:
+            self._move_row(row_id, config)
+        for row_id, config in changed:
+            self.configs[row_id] = config
+            self._set_keys(row_id, config)
+        for row_id in entering:
+            self._set_keys(row_id, self.configs[row_id])
+
+        # Rows landing at the same position go in together, in sorted order
+        entering.sort(key=self._order_key)
+        blocks = groupby(entering, key=lambda row_id: bisect_left(
+            self.order, self._order_key(row_id), key=self._order_key))
+        for position, block in reversed([(position, list(block)) for position, block in blocks]):
+            count = len(self.order) + len(block)
+            rows = sorted((self._view_row(position, count),
+                           self._view_row(position + len(block) - 1, count)))
+            self.beginInsertRows(QModelIndex(), rows[0], rows[1])
+            self.order[position:position] = block
+            self.endInsertRows()
+
+        last_column = len(self.columns) - 1
+        repainted = sorted(self._row_of(row_id) for row_id, _ in changed + moved)
+        for first, last in _ranges(repainted):
+            self.dataChanged.emit(self.index(first, 0), self.index(last, last_column))
+
+    def _apply_as_layout(self, removed, moved, changed, entering):
+        """Apply a large reload as one layout change, keeping persistent indexes."""
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        persistent_ids = [self._id_at(index.row()) for index in persistent]
+
+        leaving_ids = set(removed)
+        leaving_ids.update(row_id for row_id, _ in moved)
+        entering = entering + [row_id for row_id, _ in moved]
+        kept = [row_id for row_id in self.order if row_id not in leaving_ids]
+
+        self._drop_rows(removed)
+        for row_id, config in moved + changed:
+            self.configs[row_id] = config
+            self._set_keys(row_id, config)
+        for row_id in entering:
+            self._set_keys(row_id, self.configs[row_id])
+
+        # Merge the sorted newcomers into the kept order in one pass
+        entering.sort(key=self._order_key)
+        order = []
+        start = 0
+        for row_id in entering:
+            position = bisect_left(kept, self._order_key(row_id), lo=start, key=self._order_key)
+            order.extend(kept[start:position])
+            order.append(row_id)
+            start = position
+        order.extend(kept[start:])
+        self.order = order
+
+        removed_ids = set(removed)
+        self.changePersistentIndexList(persistent, [
+            QModelIndex() if row_id in removed_ids
+            else self.index(self._row_of(row_id), index.column())
+            for row_id, index in zip(persistent_ids, persistent)
+        ])
+        # Row counts may change too; views re-read them on layoutChanged
+        self.layoutChanged.emit()
+
+    def _drop_rows(self, row_ids):
+        for row_id in row_ids:
+            del self.configs[row_id]
+            for keys in self.keys.values():
+                keys.pop(row_id, None)
+
+    # Ordering
+
+    def _column_keys(self, column):
+        """Return the sort keys of a column, computing them on first use."""
+        keys = self.keys.get(column)
+        if keys is None:
+            key = self.columns[column].key or self.collate
+            value = self.columns[column].value
+            keys = {row_id: key(value(config)) for row_id, config in self.configs.items()}
+            self.keys[column] = keys
+        return keys
+
+    def _set_keys(self, row_id, config):
+        for column, keys in self.keys.items():
+            key = self.columns[column].key or self.collate
+            keys[row_id] = key(self.columns[column].value(config))
+
+    def _sort_tuple(self, row_id, config):
+        """Return the (key, id) a row with this configuration sorts by."""
+        if self.sort_column < 0:
+            return (row_id,)
+        column = self.columns[self.sort_column]
+        return ((column.key or self.collate)(column.value(config)), row_id)
+
+    def _order_key(self, row_id):
+        if self.sort_column < 0:
+            return (row_id,)
+        return (self.keys[self.sort_column][row_id], row_id)
+
+    def _position_of(self, row_id):
+        """Return the position of a row in the ascending order."""
+        return bisect_left(self.order, self._order_key(row_id), key=self._order_key)
+
+    def _view_row(self, position, count):
+        return count - 1 - position if self.descending else position
+
+    def _id_at(self, row):
+        return self.order[self._view_row(row, len(self.order))]
+
+    def _row_of(self, row_id):
+        return self._view_row(self._position_of(row_id), len(self.order))
+
+
+def _ranges(values):
+    """Coalesce sorted integers into (first, last) runs of consecutive values."""
+    ranges = []
+    for value in values:
+        if ranges and value == ranges[-1][1] + 1:
+            ranges[-1][1] = value
+        else:
+            ranges.append([value, value])
+    return [tuple(run) for run in ranges]
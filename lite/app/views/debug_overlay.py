@@ -0,0 +1,68 @@
+from PySide6.QtWidgets import QLabel
+from PySide6.QtCore import Qt, QEvent, QTimer
+
+
+class DebugOverlay(QLabel):
+    """Translucent panel in the corner of a window showing event loop statistics."""
+
+    def __init__(self, monitor, parent, refresh_ms=500):
+        """
+        Initialize the overlay.
+
+        Args:
+            monitor: EventLoopMonitor whose statistics are shown
+            parent: Window the overlay is drawn over
+            refresh_ms: Refresh interval in milliseconds
+        """
+        super().__init__(parent)
+        self.monitor = monitor
+        self.setTextFormat(Qt.PlainText)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 170); color: #FFFFFF; "
+            "font-family: monospace; font-size: 11px; padding: 6px; border-radius: 4px;"
+        )
+
+        # Follow the window as it is resized
+        parent.installEventFilter(self)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(refresh_ms)
+        self.refresh()
+        self.show()
+
+    def eventFilter(self, watched, event):
+        if watched is self.parentWidget() and event.type() == QEvent.Resize:
+            self._reposition()
+        return False
+
+    def refresh(self):
+        """Show the latest statistics of the monitor."""
+        stats = self.monitor.snapshot()
+        latency = stats["latency"]
+        dispatch = stats["dispatch"]
+        lines = [
+            f"Loop latency  p50 {latency['p50']:6.1f}  p99 {latency['p99']:6.1f}  "
+            f"max {latency['max']:7.1f} ms",
+        ]
+        if dispatch["count"]:
+            lines.append(
+                f"Dispatch      p50 {dispatch['p50']:6.1f}  p99 {dispatch['p99']:6.1f}  "
+                f"max {dispatch['max']:7.1f} ms"
+            )
+            for receiver, event_type, count, slowest in stats["slowest"]:
+                lines.append(f"  {receiver}/{event_type}: {slowest:.1f} ms max, {count} events")
+        lines.append(f"Stalls        {stats['stalls']}")
+        last = stats["last_stall"]
+        if last is not None:
+            lines.append(f"  last {last['duration_ms']:.0f} ms in {last['where']}")
+
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        self._reposition()
+        self.raise_()
+
+    def _reposition(self):
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - 12, 12)
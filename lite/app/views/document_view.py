@@ -0,0 +1,380 @@
+import logging
+import os
+
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QListView, QLabel
+from PySide6.QtCore import (Qt, QSize, Signal, Slot, QObject, QRunnable, QThreadPool,
+                            QAbstractListModel, QModelIndex, QTimer, QBuffer,
+                            QByteArray, QIODevice)
+from PySide6.QtGui import QImage, QImageReader, QPixmap, QColor
+
+from processing import page_source
+from utils import metrics
+from utils.thumbnail_cache import MemoryLRU, ThumbnailPack, default_pack_path, prune_packs
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = 128
+
+# Thumbnail packs of earlier batches are deleted, least recently used first, past this size
+PACK_BYTES = 256 * 1024 * 1024
+
+_fetch_seconds = metrics.histogram(
+    "document_model_fetch_seconds", "Time to answer a thumbnail request of the document model")
+_fetch_memory = metrics.counter(
+    "document_model_fetches_total", "Thumbnail requests of the document model", result="memory")
+_fetch_pending = metrics.counter(
+    "document_model_fetches_total", "Thumbnail requests of the document model", result="pending")
+_thumbnail_pack = metrics.counter(
+    "thumbnails_loaded_total", "Thumbnails loaded off the GUI thread", source="pack")
+_thumbnail_rendered = metrics.counter(
+    "thumbnails_loaded_total", "Thumbnails loaded off the GUI thread", source="rendered")
+_render_seconds = metrics.histogram(
+    "thumbnail_render_seconds", "Time to render a thumbnail from its document")
+
+
+def render_thumbnail(path, size):
+    """
+    Render a thumbnail of the first page of a document.
+
+    Args:
+        path: Path of the document
+        size: Longest side of the thumbnail in pixels
+
+    Returns:
+        QImage: The thumbnail, null if the document cannot be rendered
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in page_source.IMAGE_EXTENSIONS:
+        # Let the decoder scale while reading instead of decoding full size
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        full_size = reader.size()
+        if full_size.isValid():
+            reader.setScaledSize(full_size.scaled(size, size, Qt.KeepAspectRatio))
+        return reader.read()
+
+    if extension in page_source.PDF_EXTENSIONS and page_source.fitz is not None:
+        fitz = page_source.fitz
+        with fitz.open(path) as document:
+            if document.page_count == 0:
+                return QImage()
+            page = document[0]
+            zoom = size / max(page.rect.width, page.rect.height)
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            image = QImage(pixmap.samples, pixmap.width, pixmap.height,
+                           pixmap.stride, QImage.Format_RGB888)
+            # Detach from the pixmap buffer before it is freed
+            return image.copy()
+
+    return QImage()
+
+
+def encode_thumbnail(image):
+    """Encode a thumbnail for the on-disk pack."""
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "JPG", 85)
+    return bytes(data)
+
+
+class _ThumbnailSignals(QObject):
+    """Signals of the thumbnail tasks, which cannot emit them themselves."""
+
+    # Key, generation of the loader the task was started in, and the image
+    loaded = Signal(str, int, QImage)
+
+
+class ThumbnailTask(QRunnable):
+    """Loads one thumbnail from the pack, or renders and stores it."""
+
+    def __init__(self, key, path, pack, size, signals, generation=0):
+        super().__init__()
+        # The loader keeps the task alive so it can still be cancelled
+        self.setAutoDelete(False)
+        self.key = key
+        self.path = path
+        self.pack = pack
+        self.size = size
+        self.signals = signals
+        self.generation = generation
+        self.cancelled = False
+
+    def run(self):
+        if self.cancelled:
+            return
+
+        image = QImage()
+        data = self.pack.get(self.key) if self.pack is not None else None
+        if data is not None:
+            image.loadFromData(data)
+
+        if not image.isNull():
+            _thumbnail_pack.inc()
+        else:
+            if self.cancelled:
+                return
+            _thumbnail_rendered.inc()
+            try:
+                with _render_seconds.time():
+                    image = render_thumbnail(self.path, self.size)
+            except Exception as e:
+                logger.warning("Error rendering thumbnail of %s: %s", self.path, e)
+                image = QImage()
+            if not image.isNull() and self.pack is not None:
+                self.pack.put(self.key, encode_thumbnail(image))
+
+        self.signals.loaded.emit(self.key, self.generation, image)
+
+
+class ThumbnailLoader(QObject):
+    """
+    Serves thumbnails from a memory LRU, a per-batch pack file or by
+    rendering them on a thread pool.
+
+    Requests made later run first, since they belong to what the user is
+    looking at now, and requests for rows that scrolled out of view are
+    cancelled before they start. Switching batches never waits for running
+    tasks: they finish against the closed pack of the previous batch and
+    their results are ignored.
+    """
+
+    thumbnail_ready = Signal(str)
+
+    def __init__(self, size=THUMBNAIL_SIZE, memory_bytes=64 * 1024 * 1024):
+        """
+        Initialize the loader.
+
+        Args:
+            size: Longest side of the thumbnails in pixels
+            memory_bytes: Size of the in-memory tier
+        """
+        super().__init__()
+        self.size = size
+        self.pool = QThreadPool()
+        self.memory = MemoryLRU(memory_bytes)
+        self.pack = None
+        self.pending = {}
+        self.priority = 0
+        # Bumped on every batch switch, so results of earlier batches are ignored
+        self.generation = 0
+
+        self.signals = _ThumbnailSignals()
+        self.signals.loaded.connect(self._on_loaded)
+
+    def set_pack(self, pack):
+        """
+        Switch to the thumbnail pack of another batch.
+
+        Args:
+            pack: ThumbnailPack, or None to keep thumbnails in memory only
+        """
+        self.retain(set())
+        self.generation += 1
+        # Tasks still running find the previous pack closed and skip it
+        if self.pack is not None:
+            self.pack.close()
+        self.pack = pack
+        self.memory.clear()
+        if pack is not None:
+            prune_packs(os.path.dirname(pack.path), PACK_BYTES, keep=[pack.path])
+
+    def thumbnail(self, key, path):
+        """
+        Return a thumbnail if it is in memory, otherwise request it.
+
+        Args:
+            key: Key of the thumbnail
+            path: Path of the document
+
+        Returns:
+            QPixmap: The thumbnail, a null pixmap if it cannot be rendered,
+            or None while it is loading
+        """
+        pixmap = self.memory.get(key)
+        if pixmap is not None:
+            return pixmap
+
+        if key not in self.pending:
+            self.priority += 1
+            task = ThumbnailTask(key, path, self.pack, self.size, self.signals, self.generation)
+            self.pending[key] = task
+            self.pool.start(task, self.priority)
+        return None
+
+    def retain(self, keys):
+        """
+        Cancel pending requests that are not in keys.
+
+        Args:
+            keys: Set of keys that are still wanted
+        """
+        for key in [key for key in self.pending if key not in keys]:
+            task = self.pending.pop(key)
+            task.cancelled = True
+            self.pool.tryTake(task)
+
+    def shutdown(self):
+        """Cancel pending work and close the pack."""
+        self.set_pack(None)
+
+    @Slot(str, int, QImage)
+    def _on_loaded(self, key, generation, image):
+        """Move a loaded thumbnail into the memory tier."""
+        if generation != self.generation:
+            return
+        self.pending.pop(key, None)
+        pixmap = QPixmap() if image.isNull() else QPixmap.fromImage(image)
+        self.memory.put(key, pixmap, max(1, image.sizeInBytes()))
+        self.thumbnail_ready.emit(key)
+
+
+class DocumentListModel(QAbstractListModel):
+    """List model of the documents of a batch, decorated with thumbnails."""
+
+    def __init__(self, loader):
+        super().__init__()
+        self.loader = loader
+        self.paths = []
+        self.rows = {}
+        self.placeholder = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        self.placeholder.fill(QColor("#E6E7EE"))
+
+    @staticmethod
+    def thumbnail_key(path):
+        """Key of the first-page thumbnail of a document."""
+        return f"{path}:0"
+
+    def set_documents(self, paths):
+        """
+        Replace the documents shown.
+
+        Args:
+            paths: Paths of the documents
+        """
+        self.beginResetModel()
+        self.paths = list(paths)
+        self.rows = {self.thumbnail_key(path): row for row, path in enumerate(self.paths)}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        path = self.paths[index.row()]
+
+        if role == Qt.DisplayRole:
+            return os.path.basename(path)
+        if role == Qt.ToolTipRole:
+            return path
+        if role == Qt.DecorationRole:
+            # Only rows being painted ask for data, so only visible rows load
+            with _fetch_seconds.time():
+                pixmap = self.loader.thumbnail(self.thumbnail_key(path), path)
+            if pixmap is None:
+                _fetch_pending.inc()
+                return self.placeholder
+            _fetch_memory.inc()
+            if pixmap.isNull():
+                return self.placeholder
+            return pixmap
+        return None
+
+    @Slot(str)
+    def thumbnail_ready(self, key):
+        """Repaint the row whose thumbnail finished loading."""
+        row = self.rows.get(key)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class DocumentView(QWidget):
+    """Grid of the documents of a batch with their page thumbnails."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.title_label = QLabel("Documents")
+        self.title_label.setStyleSheet("font-weight: bold; margin: 5px;")
+        layout.addWidget(self.title_label)
+
+        self.list_view = QListView()
+        self.list_view.setViewMode(QListView.IconMode)
+        self.list_view.setResizeMode(QListView.Adjust)
+        self.list_view.setMovement(QListView.Static)
+        self.list_view.setUniformItemSizes(True)
+        # Lay out large batches in chunks so the view stays responsive
+        self.list_view.setLayoutMode(QListView.Batched)
+        self.list_view.setBatchSize(500)
+        self.list_view.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.list_view.setGridSize(QSize(THUMBNAIL_SIZE + 24, THUMBNAIL_SIZE + 40))
+        layout.addWidget(self.list_view)
+
+        self.loader = ThumbnailLoader(THUMBNAIL_SIZE)
+        self.model = DocumentListModel(self.loader)
+        self.loader.thumbnail_ready.connect(self.model.thumbnail_ready)
+        self.list_view.setModel(self.model)
+
+        # Cancel off-screen requests once scrolling settles
+        self.viewport_timer = QTimer(self)
+        self.viewport_timer.setSingleShot(True)
+        self.viewport_timer.setInterval(50)
+        self.viewport_timer.timeout.connect(self._cancel_hidden_requests)
+        self.list_view.verticalScrollBar().valueChanged.connect(self.viewport_timer.start)
+
+    def set_batch(self, batch):
+        """
+        Show the documents of a batch.
+
+        Args:
+            batch: BatchModel to show
+        """
+        self.title_label.setText(f"Documents of batch {batch.batch_id[:8]}")
+        self.loader.set_pack(ThumbnailPack(default_pack_path(batch.batch_id)))
+        self.model.set_documents(document.path for document in batch.documents)
+
+    def visible_rows(self):
+        """
+        Return the range of rows inside the viewport.
+
+        Worked out from the item rects: items sit on a uniform grid, so the
+        rect of the first item and the first item of the second line give
+        the origin, the items per line and the line height.
+        """
+        view = self.list_view
+        count = self.model.rowCount()
+        if count == 0:
+            return range(0)
+
+        origin = view.visualRect(self.model.index(0)).top()
+        columns = 1
+        while columns < count and view.visualRect(self.model.index(columns)).top() == origin:
+            columns += 1
+        if columns == count:
+            # A single line, all of it shown at once
+            return range(count)
+
+        line_height = view.visualRect(self.model.index(columns)).top() - origin
+        if line_height <= 0:
+            return range(count)
+        height = view.viewport().height()
+        first_line = max(0, -origin // line_height)
+        last_line = max(0, (height - 1 - origin) // line_height)
+        return range(first_line * columns, min(count, (last_line + 1) * columns))
+
+    def _cancel_hidden_requests(self):
+        """Drop thumbnail requests for rows that are no longer visible."""
+        paths = self.model.paths
+        self.loader.retain({
+            DocumentListModel.thumbnail_key(paths[row]) for row in self.visible_rows()
+        })
+
+    def shutdown(self):
+        """Stop loading thumbnails."""
+        self.loader.shutdown()
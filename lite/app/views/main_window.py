@@ -1,16 +1,65 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                               QTableView, QLabel, QPushButton, QFrame, QSplitter,
-                              QHeaderView, QToolButton, QSizePolicy)
-from PySide6.QtCore import Qt, QSize, Signal, Slot, QPoint
-from PySide6.QtGui import QIcon, QStandardItemModel, QStandardItem, QFont
+                              QHeaderView, QToolButton, QSizePolicy, QFileDialog,
+                              QMessageBox, QStackedWidget)
+from PySide6.QtCore import Qt, QSize, Signal, Slot, QPoint, QObject, QRunnable, QThreadPool
+from PySide6.QtGui import QIcon, QFont, QKeySequence, QShortcut
 
 from controllers.sidebar_controller import SidebarController
+from controllers.batch_controller import BatchController
+from views.config_table_model import ConfigTableModel
+from views.document_view import DocumentView
+from views.options_view import OptionsView
 from models.config_model import ConfigModel
 from utils.theme_manager import ThemeManager
 from utils.config_manager import ConfigManager
+from utils.config_exporter import ConfigExporter
+from utils.sampling_profiler import SamplingProfiler
+from utils import metrics
+from processing.ingestion import IngestionService
+
+
+class _ExportSignals(QObject):
+    """Signals of the export task, which cannot emit them itself."""
+
+    # Path of the bundle and number of configurations written
+    finished = Signal(str, int)
+    failed = Signal(str)
+
+
+class _ExportTask(QRunnable):
+    """Writes an export bundle on a pool thread, so the window stays responsive."""
+
+    def __init__(self, exporter, path, names):
+        super().__init__()
+        # The window keeps the task until it reports back
+        self.setAutoDelete(False)
+        self.exporter = exporter
+        self.path = path
+        self.names = names
+        self.signals = _ExportSignals()
+
+    def run(self):
+        try:
+            count = self.exporter.export(self.path, self.names)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(self.path, count)
+
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, batch_controller=None, ingestion_service=None):
+        """
+        Initialize the main window.
+        
+        Args:
+            batch_controller: BatchController running the batches. If None,
+                one with worker processes, job queue and database is started.
+            ingestion_service: Service watching the input folders, with
+                start and stop methods. If None, one is started for the
+                stored configurations.
+        """
         super().__init__()
         self.setWindowTitle("FlexiPy Lite")
         self.resize(1200, 800)
@@ -22,6 +71,34 @@ class MainWindow(QMainWindow):
         self.theme_manager = ThemeManager()
         self.config_manager = ConfigManager()
         
+        # Export running on the thread pool, if any
+        self.export_task = None
+        
+        # Background batch processing; progress of the running batches by batch id
+        self.batch_progress = {}
+        self.batch_controller = batch_controller or BatchController()
+        self.batch_controller.batch_started.connect(self.on_batch_started)
+        self.batch_controller.batch_progress.connect(self.on_batch_progress)
+        self.batch_controller.batch_finished.connect(self.on_batch_finished)
+        self.batch_controller.worker_metrics.connect(self.on_worker_metrics)
+        self.batch_controller.resume()
+        
+        # Build the stored pipelines in the workers now, and again whenever one is saved
+        configs = list(self.config_manager.load_all_configs().values())
+        self.batch_controller.preload_configs(configs)
+        self.config_manager.add_save_listener(
+            lambda name, config: self.batch_controller.preload_configs([config])
+        )
+        self.config_manager.add_save_listener(
+            lambda name, config: self.config_model.add_config(config)
+        )
+        
+        # Watch the input folders of the stored configurations
+        self.ingestion_service = ingestion_service or IngestionService(
+            configs, self.batch_controller.run_batch
+        )
+        self.ingestion_service.start()
+        
         # Set up the main layout
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
@@ -51,20 +128,52 @@ class MainWindow(QMainWindow):
         self.config_list.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.config_list.setSelectionBehavior(QTableView.SelectRows)
         self.config_list.setSelectionMode(QTableView.SingleSelection)
+        self.config_list.doubleClicked.connect(self.run_config)
         
-        # Create model for the table
-        self.config_model = QStandardItemModel()
-        self.config_model.setHorizontalHeaderLabels(["Name", "Description"])
+        # Create model for the table, sorted by name until a header is clicked
+        self.config_model = ConfigTableModel()
         self.config_list.setModel(self.config_model)
+        self.config_list.setSortingEnabled(True)
+        self.config_list.sortByColumn(0, Qt.AscendingOrder)
+        
+        # Documents of the last finished batch, next to the configurations
+        self.document_view = DocumentView()
+        self.content_splitter = QSplitter(Qt.Horizontal)
+        self.content_splitter.addWidget(self.config_list)
+        self.content_splitter.addWidget(self.document_view)
+        self.content_splitter.setStretchFactor(0, 1)
+        self.content_splitter.setStretchFactor(1, 2)
         
-        self.content_layout.addWidget(self.config_list)
+        # Options page, shown instead of the configurations
+        self.options_view = OptionsView()
+        self.options_view.profiler_toggled.connect(self.set_profiling)
+        self.options_view.export_metrics_requested.connect(self.export_metrics)
+        
+        self.content_stack = QStackedWidget()
+        self.content_stack.addWidget(self.content_splitter)
+        self.content_stack.addWidget(self.options_view)
+        self.content_layout.addWidget(self.content_stack)
+        
+        # Profiler for live sessions; no sampling thread exists while it is off
+        self.profiler = SamplingProfiler()
+        self.profiler_shortcut = QShortcut(QKeySequence("Ctrl+Shift+P"), self)
+        self.profiler_shortcut.activated.connect(
+            lambda: self.set_profiling(not self.profiler.running)
+        )
         
         # Add widgets to main layout
         self.main_layout.addWidget(self.sidebar)
         self.main_layout.addWidget(self.content_area, 1)
         
-        # Load sample data
-        self.load_sample_data()
+        # Utilisation of the worker processes, next to the batch messages
+        self.worker_label = QLabel()
+        self.statusBar().addPermanentWidget(self.worker_label)
+        
+        # Show the stored configurations, or samples when there are none yet
+        if configs:
+            self.config_model.set_configs(configs)
+        else:
+            self.load_sample_data()
         
     def load_sample_data(self):
         # Add some sample data to the list
@@ -74,10 +183,7 @@ class MainWindow(QMainWindow):
             ("Custom 2", "Another custom configuration")
         ]
         
-        for name, desc in sample_data:
-            name_item = QStandardItem(name)
-            desc_item = QStandardItem(desc)
-            self.config_model.appendRow([name_item, desc_item])
+        self.config_model.set_configs(ConfigModel(name, desc) for name, desc in sample_data)
             
     def center_window(self):
         """Center the window on the screen."""
@@ -89,9 +195,16 @@ class MainWindow(QMainWindow):
         
     def handle_sidebar_button(self, button_id):
         """Handle sidebar button clicks."""
+        # Options have their own page; every other button shows the configurations
+        if button_id == "settings":
+            self.content_stack.setCurrentWidget(self.options_view)
+        else:
+            self.content_stack.setCurrentWidget(self.content_splitter)
+        
         # Update the title based on which button was clicked
         if button_id == "start":
             self.title_label.setText("Start")
+            self.refresh_configs()
         elif button_id == "new":
             self.title_label.setText("New Configuration")
         elif button_id == "edit":
@@ -102,5 +215,157 @@ class MainWindow(QMainWindow):
             self.title_label.setText("Import Configuration")
         elif button_id == "export":
             self.title_label.setText("Export Configuration")
+            self.export_configs()
         elif button_id == "settings":
-            self.title_label.setText("Options")
\ No newline at end of file
+            self.title_label.setText("Options")
+    
+    def refresh_configs(self):
+        """Reload the stored configurations and update only the rows that changed."""
+        # An empty snapshot is reconciled too, so deleting the last one clears the table
+        configs = self.config_manager.load_all_configs()
+        added, changed, removed = self.config_model.reconcile(configs.values())
+        if added or changed or removed:
+            self.statusBar().showMessage(
+                f"Configurations: {added} added, {changed} changed, {removed} removed"
+            )
+    
+    def selected_config_names(self):
+        """Return the names of the configurations selected in the table."""
+        rows = self.config_list.selectionModel().selectedRows(0)
+        return [self.config_model.config(index.row()).name for index in rows]
+    
+    def export_configs(self):
+        """Export the selected configurations, or all of them, to a bundle."""
+        if self.export_task is not None:
+            QMessageBox.information(self, "Export Configuration", "An export is already running")
+            return
+        
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export Configuration",
+            "configs.zip",
+            "Zip archive (*.zip);;NDJSON gzip (*.ndjson.gz);;Tar zstd (*.tar.zst)"
+        )
+        if not path:
+            return
+        
+        # Export everything when nothing is selected
+        names = self.selected_config_names() or None
+        if names is not None:
+            stored = set(self.config_manager.list_config_names())
+            names = [name for name in names if name in stored]
+        
+        self.export_task = _ExportTask(ConfigExporter(self.config_manager), path, names)
+        self.export_task.signals.finished.connect(self.on_export_finished)
+        self.export_task.signals.failed.connect(self.on_export_failed)
+        QThreadPool.globalInstance().start(self.export_task)
+        self.statusBar().showMessage(f"Exporting to {path}...")
+    
+    @Slot(str, int)
+    def on_export_finished(self, path, count):
+        """Report a finished export."""
+        self.export_task = None
+        self.statusBar().showMessage(f"Exported {count} configuration(s) to {path}")
+        QMessageBox.information(
+            self, "Export Configuration", f"Exported {count} configuration(s) to {path}"
+        )
+    
+    @Slot(str)
+    def on_export_failed(self, message):
+        """Report a failed export."""
+        self.export_task = None
+        self.statusBar().clearMessage()
+        QMessageBox.warning(self, "Export Configuration", f"Export failed: {message}")
+    
+    def run_config(self, index):
+        """Run the configuration of the given row over documents chosen by the user."""
+        config = self.config_model.config(index.row())
+        paths, _ = QFileDialog.getOpenFileNames(self, f"Run {config.name}")
+        if paths:
+            self.batch_controller.run_batch(config, paths)
+    
+    def set_profiling(self, enabled):
+        """Start or stop the sampling profiler and show where the profile goes."""
+        if enabled and not self.profiler.running:
+            path = self.profiler.start()
+            self.statusBar().showMessage(f"Profiling to {path}")
+        elif not enabled and self.profiler.running:
+            path = self.profiler.stop()
+            if path:
+                self.statusBar().showMessage(f"Profile written to {path}")
+            else:
+                self.statusBar().showMessage("Profile could not be written")
+        self.options_view.set_profiler_state(self.profiler.running, self.profiler.output_path)
+    
+    def export_metrics(self):
+        """Save a snapshot of the application metrics to a file chosen by the user."""
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Metrics",
+            "metrics.prom",
+            "Prometheus text (*.prom *.txt);;JSON (*.json)"
+        )
+        if not path:
+            return
+        try:
+            metrics.REGISTRY.write(path)
+        except IOError as e:
+            QMessageBox.warning(self, "Save Metrics", f"Saving failed: {e}")
+            return
+        self.statusBar().showMessage(f"Metrics saved to {path}")
+    
+    @Slot(str, int)
+    def on_batch_started(self, batch_id, total):
+        """Show that a batch has been queued."""
+        self.statusBar().showMessage(f"Batch {batch_id[:8]}: 0/{total} documents")
+    
+    @Slot(object)
+    def on_batch_progress(self, progress):
+        """
+        Show the progress of the running batches.
+        
+        Args:
+            progress: {batch_id: (done, total)} of the batches that progressed
+                since the last update
+        """
+        self.batch_progress.update(progress)
+        if len(self.batch_progress) == 1:
+            (batch_id, (done, total)), = self.batch_progress.items()
+            self.statusBar().showMessage(f"Batch {batch_id[:8]}: {done}/{total} documents")
+        else:
+            done = sum(done for done, total in self.batch_progress.values())
+            total = sum(total for done, total in self.batch_progress.values())
+            self.statusBar().showMessage(
+                f"{len(self.batch_progress)} batches: {done}/{total} documents"
+            )
+    
+    @Slot(object)
+    def on_batch_finished(self, batch):
+        """Show the outcome of a finished batch."""
+        self.batch_progress.pop(batch.batch_id, None)
+        self.statusBar().showMessage(
+            f"Batch {batch.batch_id[:8]} finished: {len(batch.documents)} documents, "
+            f"{batch.failed} failed"
+        )
+        self.document_view.set_batch(batch)
+    
+    @Slot(object)
+    def on_worker_metrics(self, worker_stats):
+        """Show how busy the worker processes were over the last second."""
+        if not worker_stats:
+            return
+        average = sum(m["utilisation"] for m in worker_stats) / len(worker_stats)
+        self.worker_label.setText(f"Workers: {len(worker_stats)} at {average:.0%}")
+        self.worker_label.setToolTip("\n".join(
+            f"Worker {m['worker']}: {m['utilisation']:.0%} busy, {m['tasks']} tasks, "
+            f"{m['steals']} stolen, {m['queued']} queued"
+            for m in worker_stats
+        ))
+    
+    def closeEvent(self, event):
+        """Stop background workers when the window closes."""
+        self.set_profiling(False)
+        self.ingestion_service.stop(flush=False)
+        self.batch_controller.shutdown()
+        self.document_view.shutdown()
+        super().closeEvent(event)
@@ -0,0 +1,54 @@
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QGroupBox, QCheckBox, QLabel,
+                               QPushButton)
+from PySide6.QtCore import Qt, Signal
+
+
+class OptionsView(QWidget):
+    """Options page of the main window."""
+
+    # Emitted when the user switches the sampling profiler on or off
+    profiler_toggled = Signal(bool)
+    # Emitted when the user asks to save the application metrics
+    export_metrics_requested = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.layout = QVBoxLayout(self)
+        self.layout.setAlignment(Qt.AlignTop)
+
+        diagnostics = QGroupBox("Diagnostics")
+        diagnostics_layout = QVBoxLayout(diagnostics)
+
+        self.profiler_check = QCheckBox("Record a sampling profile (Ctrl+Shift+P)")
+        self.profiler_check.toggled.connect(self.profiler_toggled.emit)
+        diagnostics_layout.addWidget(self.profiler_check)
+
+        self.profiler_label = QLabel()
+        self.profiler_label.setWordWrap(True)
+        self.profiler_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        diagnostics_layout.addWidget(self.profiler_label)
+
+        self.metrics_button = QPushButton("Save Metrics...")
+        self.metrics_button.clicked.connect(self.export_metrics_requested.emit)
+        diagnostics_layout.addWidget(self.metrics_button, 0, Qt.AlignLeft)
+
+        self.layout.addWidget(diagnostics)
+
+    def set_profiler_state(self, running, path):
+        """
+        Show the state of the profiler without emitting profiler_toggled.
+
+        Args:
+            running: Whether the profiler is recording
+            path: Profile being recorded, or the last one written
+        """
+        self.profiler_check.blockSignals(True)
+        self.profiler_check.setChecked(running)
+        self.profiler_check.blockSignals(False)
+
+        if running:
+            self.profiler_label.setText(f"Recording to {path}")
+        elif path:
+            self.profiler_label.setText(f"Last profile: {path}")
+        else:
+            self.profiler_label.setText("")
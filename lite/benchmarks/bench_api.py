@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load test for the local REST API.
+Drives many concurrent keep-alive status polls and event streams against a running api.py using only asyncio.
+
+Start the server first, e.g. ``python lite/app/api.py``, then:
+
+    python lite/benchmarks/bench_api.py --config NAME --inputs /docs --connections 1000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+
+class HttpConnection:
+    """Minimal HTTP/1.1 keep-alive client connection."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    async def send(self, method, path, body=None):
+        """Send a request without waiting for the response."""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        data = b""
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+            lines.append("Content-Type: application/json")
+        lines.append(f"Content-Length: {len(data)}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data)
+        await self.writer.drain()
+
+    async def read_head(self):
+        """Read the status line and headers of a response."""
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return status, headers
+
+    async def read_chunks(self, headers):
+        """Yield the body of a response as it arrives."""
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    return
+                chunk = await self.reader.readexactly(size + 2)
+                yield chunk[:-2]
+        else:
+            length = int(headers.get("content-length", 0))
+            if length:
+                yield await self.reader.readexactly(length)
+
+    async def request(self, method, path, body=None):
+        """Send a request and return its status and decoded JSON body."""
+        await self.send(method, path, body)
+        status, headers = await self.read_head()
+        data = b"".join([chunk async for chunk in self.read_chunks(headers)])
+        return status, json.loads(data) if data else None
+
+
+async def poll_worker(host, port, path, deadline, latencies, errors):
+    """Poll a path over one keep-alive connection until the deadline."""
+    connection = HttpConnection(host, port)
+    try:
+        await connection.open()
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            status, _ = await connection.request("GET", path)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+    except (OSError, ConnectionError, asyncio.IncompleteReadError) as e:
+        errors.append(type(e).__name__)
+    finally:
+        connection.close()
+
+
+async def stream_worker(host, port, path, counts, errors):
+    """Follow an event stream until its finished event and count the events."""
+    connection = HttpConnection(host, port)
+    events = 0
+    buffer = ""
+    try:
+        await connection.open()
+        await connection.send("GET", path)
+        status, headers = await connection.read_head()
+        if status != 200:
+            errors.append(status)
+            return
+        async for chunk in connection.read_chunks(headers):
+            buffer += chunk.decode("utf-8")
+            while "\n\n" in buffer:
+                message, buffer = buffer.split("\n\n", 1)
+                if message.startswith("event:"):
+                    events += 1
+                if message.startswith("event: finished"):
+                    counts.append(events)
+                    return
+    except (OSError, ConnectionError, asyncio.IncompleteReadError) as e:
+        errors.append(type(e).__name__)
+    finally:
+        connection.close()
+
+
+def percentile(values, fraction):
+    """Return a percentile of a sorted list."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(args):
+    path = args.path
+    stream_path = None
+    if args.config:
+        connection = HttpConnection(args.host, args.port)
+        await connection.open()
+        status, batch = await connection.request(
+            "POST", "/batches", {"config": args.config, "inputs": args.inputs}
+        )
+        connection.close()
+        if status != 202:
+            raise SystemExit(f"Submitting the batch failed with {status}: {batch}")
+        path = f"/batches/{batch['batch_id']}"
+        stream_path = f"{path}/events"
+        print(f"Submitted batch {batch['batch_id']} with {batch['total']} documents")
+
+    latencies, poll_errors = [], []
+    counts, stream_errors = [], []
+    deadline = time.perf_counter() + args.duration
+
+    started = time.perf_counter()
+    tasks = [
+        poll_worker(args.host, args.port, path, deadline, latencies, poll_errors)
+        for _ in range(args.connections)
+    ]
+    if stream_path is not None:
+        tasks += [
+            stream_worker(args.host, args.port, stream_path, counts, stream_errors)
+            for _ in range(args.streams)
+        ]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    results = {
+        "connections": args.connections,
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+        },
+        "poll_errors": len(poll_errors),
+    }
+    if stream_path is not None:
+        results.update({
+            "streams": args.streams,
+            "streams_finished": len(counts),
+            "events_per_stream": round(statistics.fmean(counts), 1) if counts else 0.0,
+            "stream_errors": len(stream_errors),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the FlexiPy Lite REST API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", default="/batches",
+                        help="path to poll when no batch is submitted")
+    parser.add_argument("--config", default=None,
+                        help="submit a batch with this configuration and poll its status")
+    parser.add_argument("--inputs", nargs="*", default=[],
+                        help="files or folders of the submitted batch")
+    parser.add_argument("--connections", type=int, default=500,
+                        help="concurrent keep-alive polling connections")
+    parser.add_argument("--streams", type=int, default=500,
+                        help="concurrent event streams on the submitted batch")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="seconds to poll for")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    latency = results["latency_ms"]
+    print(f"Polls:   {results['requests']} over {args.connections} connections, "
+          f"{results['requests_per_second']:.0f} req/s, errors {results['poll_errors']}")
+    print(f"Latency: mean {latency['mean']} ms, p50 {latency['p50']} ms, "
+          f"p95 {latency['p95']} ms, p99 {latency['p99']} ms")
+    if "streams" in results:
+        print(f"Streams: {results['streams_finished']}/{results['streams']} finished, "
+              f"{results['events_per_stream']} events each, errors {results['stream_errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the shared-memory page buffer pool.
+Compares a fresh shared buffer per page against pooled buffers over a batch of pages.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from multiprocessing import shared_memory
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from processing.buffer_pool import BYTES_PER_PIXEL, SharedBufferPool
+
+# Page sizes of a typical mixed batch at 72 dpi: A4, Letter, Legal and A3
+PAGE_SIZES = [(595, 842), (612, 792), (612, 1008), (842, 1191)]
+
+
+def make_pages(count, seed):
+    """Return a deterministic list of (width, height, mode) tuples."""
+    rng = random.Random(seed)
+    modes = ["L", "L", "RGB"]
+    return [rng.choice(PAGE_SIZES) + (rng.choice(modes),) for _ in range(count)]
+
+
+def make_fills(pages):
+    """Return the bytes written into each page size, standing in for rasterized pixels."""
+    fills = {}
+    for width, height, mode in pages:
+        size = width * height * BYTES_PER_PIXEL[mode]
+        fills.setdefault(size, b"\x7f" * size)
+    return fills
+
+
+def bench_fresh(pages, fills, in_flight):
+    """Allocate a new shared segment for every page."""
+    live = []
+    peak = resident = 0
+    start = time.perf_counter()
+    for width, height, mode in pages:
+        size = width * height * BYTES_PER_PIXEL[mode]
+        segment = shared_memory.SharedMemory(create=True, size=size)
+        segment.buf[:size] = fills[size]
+        live.append(segment)
+        resident += size
+        peak = max(peak, resident)
+        if len(live) > in_flight:
+            old = live.pop(0)
+            resident -= old.size
+            old.close()
+            old.unlink()
+    for segment in live:
+        segment.close()
+        segment.unlink()
+    return time.perf_counter() - start, peak
+
+
+def bench_pooled(pages, fills, in_flight):
+    """Check buffers out of a pool and return them when done."""
+    pool = SharedBufferPool()
+    live = []
+    start = time.perf_counter()
+    for width, height, mode in pages:
+        buffer = pool.checkout(width, height, mode)
+        buffer.view[:] = fills[buffer.size]
+        live.append(buffer)
+        if len(live) > in_flight:
+            live.pop(0).release()
+    for buffer in live:
+        buffer.release()
+    elapsed = time.perf_counter() - start
+    stats = pool.stats()
+    pool.close()
+    return elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--in-flight", type=int, default=8,
+                        help="pages held at once, as in a pipeline's queues")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages, args.seed)
+    fills = make_fills(pages)
+    fresh_time, fresh_peak = bench_fresh(pages, fills, args.in_flight)
+    pooled_time, stats = bench_pooled(pages, fills, args.in_flight)
+
+    print(f"pages:              {args.pages}")
+    print(f"fresh buffers:      {fresh_time:8.2f} s  {args.pages / fresh_time:8.0f} pages/s"
+          f"  peak {fresh_peak / 2 ** 20:7.1f} MiB")
+    print(f"pooled buffers:     {pooled_time:8.2f} s  {args.pages / pooled_time:8.0f} pages/s"
+          f"  peak {stats['peak_resident_bytes'] / 2 ** 20:7.1f} MiB")
+    print(f"pool hits:          {stats['hits']} ({stats['hit_rate']:.1%}), "
+          f"misses {stats['misses']}, evictions {stats['evictions']}")
+    if resource is not None:
+        print(f"process max RSS:    {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
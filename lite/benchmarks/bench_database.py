@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the metadata database.
+Measures bulk document inserts, status updates and indexed queries against a temporary SQLite file.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from utils.database import Database, DOC_DONE, DOC_FAILED, DOC_PENDING
+
+
+def bench_record(database, batches, documents):
+    """Record batches of pending documents and return documents per second."""
+    start = time.perf_counter()
+    for b in range(batches):
+        database.record_batch(
+            f"batch-{b}", f"config-{b % 5}",
+            (f"/docs/{b}/{d:06d}.pdf" for d in range(documents))
+        )
+    return batches * documents / (time.perf_counter() - start)
+
+
+def bench_updates(database, batches, documents, per_call, shuffle):
+    """Update document statuses, per_call at a time, and return updates per second."""
+    rng = random.Random(0)
+    updates = [
+        (f"batch-{b}", f"/docs/{b}/{d:06d}.pdf", DOC_FAILED if rng.random() < 0.01 else DOC_DONE,
+         None)
+        for b in range(batches) for d in range(documents)
+    ]
+    if shuffle:
+        # Worst case: every update lands on a different page
+        rng.shuffle(updates)
+    else:
+        # Documents finish roughly in order, give or take what the workers have in flight
+        keyed = sorted((i + rng.random() * 64, update) for i, update in enumerate(updates))
+        updates = [update for _, update in keyed]
+
+    start = time.perf_counter()
+    updated = 0
+    for offset in range(0, len(updates), per_call):
+        updated += database.update_document_status(updates[offset:offset + per_call])
+    return updated / (time.perf_counter() - start)
+
+
+def bench_queries(database, batches, repeat):
+    """Run indexed queries and return queries per second."""
+    start = time.perf_counter()
+    for i in range(repeat):
+        batch_id = f"batch-{i % batches}"
+        database.count_documents(batch_id)
+        database.documents(batch_id=batch_id, status=DOC_FAILED)
+        database.documents(config_name=f"config-{i % 5}", status=DOC_PENDING, limit=100)
+    return repeat * 3 / (time.perf_counter() - start)
+
+
+def bench_concurrent_reads(database, batches, threads, repeat):
+    """Query from several threads at once and return queries per second."""
+    def reader():
+        for i in range(repeat):
+            database.count_documents(f"batch-{i % batches}")
+
+    workers = [threading.Thread(target=reader) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the metadata database.")
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--documents", type=int, default=10000, help="documents per batch")
+    parser.add_argument("--per-call", type=int, default=1000,
+                        help="status updates per update_document_status call")
+    parser.add_argument("--shuffle", action="store_true",
+                        help="update documents in random order instead of completion order")
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Database(os.path.join(tmp, "bench.db"), pool_size=args.threads)
+        total = args.batches * args.documents
+
+        rate = bench_record(database, args.batches, args.documents)
+        print(f"Record:   {total} documents, {rate:,.0f} docs/s")
+
+        rate = bench_updates(database, args.batches, args.documents, args.per_call,
+                             args.shuffle)
+        verdict = "ok" if rate >= 50000 else "below the 50,000/s target"
+        print(f"Update:   {total} statuses, {args.per_call} per call, "
+              f"{rate:,.0f} updates/s ({verdict})")
+
+        rate = bench_queries(database, args.batches, 300)
+        print(f"Query:    {rate:,.0f} indexed queries/s")
+
+        rate = bench_concurrent_reads(database, args.batches, args.threads, 300)
+        print(f"Readers:  {args.threads} threads, {rate:,.0f} queries/s")
+
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
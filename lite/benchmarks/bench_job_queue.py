@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark for the persistent job queue.
+Measures enqueue/claim/ack throughput and checks that a killed worker's job is resumed.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from processing.job_queue import JobQueue
+
+
+def bench_enqueue(queue, count, batch):
+    """Enqueue count jobs, batch at a time, and return jobs per second."""
+    start = time.perf_counter()
+    for offset in range(0, count, batch):
+        queue.enqueue_many(
+            (f"job-{i}", {"paths": [f"/docs/{i}.pdf"]})
+            for i in range(offset, min(offset + batch, count))
+        )
+    return count / (time.perf_counter() - start)
+
+
+def bench_claim_ack(queue, count, limit):
+    """Claim and ack count jobs, limit at a time, and return jobs per second."""
+    start = time.perf_counter()
+    done = 0
+    while done < count:
+        jobs = queue.claim("bench", limit=limit)
+        if not jobs:
+            break
+        for job in jobs:
+            queue.ack(job.job_id)
+        done += len(jobs)
+    return done / (time.perf_counter() - start)
+
+
+def crash_test(db_path):
+    """Kill a process holding a claim and check the job is claimed again."""
+    queue = JobQueue(db_path, visibility_timeout=1.0)
+    queue.enqueue("crash-job", {"paths": ["/docs/crash.pdf"]})
+
+    child = subprocess.Popen([
+        sys.executable, "-c",
+        "import sys, time; sys.path.insert(0, sys.argv[1]);"
+        "from processing.job_queue import JobQueue;"
+        "q = JobQueue(sys.argv[2], visibility_timeout=1.0);"
+        "assert q.claim('child'); print('claimed', flush=True); time.sleep(60)",
+        sys.path[0], db_path
+    ], stdout=subprocess.PIPE, text=True)
+    child.stdout.readline()
+    os.kill(child.pid, signal.SIGKILL)
+    child.wait()
+
+    assert not queue.claim("parent"), "job visible before its claim expired"
+    time.sleep(1.1)
+    jobs = queue.claim("parent")
+    assert [job.job_key for job in jobs] == ["crash-job"], jobs
+    assert jobs[0].attempts == 2
+    queue.ack(jobs[0].job_id)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, "jobs.db"))
+        print(f"enqueue x1:        {bench_enqueue(queue, args.count // 10, 1):>10.0f} jobs/s")
+        queue.purge_done()
+        queue = JobQueue(os.path.join(tmp, "bulk.db"))
+        print(f"enqueue x1000:     {bench_enqueue(queue, args.count, 1000):>10.0f} jobs/s")
+        print(f"claim x100 + ack:  {bench_claim_ack(queue, args.count, 100):>10.0f} jobs/s")
+        print(f"kill -9 resume:    {'ok' if crash_test(os.path.join(tmp, 'crash.db')) else 'failed'}")
+
+
+if __name__ == "__main__":
+    main()
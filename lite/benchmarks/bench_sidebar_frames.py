@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Frame-time benchmark of the sidebar animation.
+Steps the collapse and expand animation frame by frame next to a filled configuration table and reports how long each frame took.
+
+    python lite/benchmarks/bench_sidebar_frames.py --cycles 20
+
+Each frame advances the animation by one frame interval, processes the
+pending events and paints the window, so layout and painting count
+towards the frame. The frames that start and end a toggle, where the
+layout changes, are included. Runs on the offscreen platform.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+# Must be set before PySide6 is first imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import corpus  # noqa: E402
+
+FRAME_MS = 16
+
+
+def build_window(rows=1000):
+    """
+    Build a shown window with the sidebar next to a configuration table.
+
+    Returns:
+        tuple: (window, SidebarController)
+    """
+    from PySide6.QtWidgets import QHBoxLayout, QTableView, QWidget
+    from controllers.sidebar_controller import SidebarController
+    from views.config_table_model import ConfigTableModel
+
+    window = QWidget()
+    layout = QHBoxLayout(window)
+    layout.setSpacing(0)
+    controller = SidebarController()
+    layout.addWidget(controller.get_sidebar())
+
+    model = ConfigTableModel()
+    model.set_configs(corpus.build_configs(rows, seed=rows))
+    table = QTableView()
+    table.setModel(model)
+    layout.addWidget(table, 1)
+    # Keep the model alive with the window
+    window.model = model
+
+    window.resize(1200, 800)
+    window.show()
+    return window, controller
+
+
+def toggle_frames(app, window, controller, animate=True):
+    """
+    Toggle the sidebar once, stepping the animation a frame at a time.
+
+    Returns:
+        list: Duration of each frame in seconds
+    """
+    from PySide6.QtCore import QAbstractAnimation
+
+    animation = controller.animation
+    frames = []
+
+    start = time.perf_counter()
+    controller.set_expanded(not controller.is_expanded, animate=animate)
+    # Drive the animation by hand instead of by the clock
+    if animation.state() == QAbstractAnimation.Running:
+        animation.pause()
+    app.processEvents()
+    window.repaint()
+    frames.append(time.perf_counter() - start)
+
+    while animation.state() != QAbstractAnimation.Stopped:
+        start = time.perf_counter()
+        animation.setCurrentTime(min(animation.currentTime() + FRAME_MS, animation.duration()))
+        app.processEvents()
+        window.repaint()
+        frames.append(time.perf_counter() - start)
+    return frames
+
+
+def measure(cycles=20, rows=1000, animate=True):
+    """
+    Collapse and expand the sidebar repeatedly.
+
+    Args:
+        cycles: Number of collapse and expand pairs
+        rows: Rows of the table next to the sidebar
+        animate: Animate the toggles, or switch the width at once
+
+    Returns:
+        list: Duration of each frame in seconds
+    """
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication([])
+    window, controller = build_window(rows)
+    app.processEvents()
+
+    frames = []
+    for _ in range(cycles * 2):
+        frames.extend(toggle_frames(app, window, controller, animate))
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    return frames
+
+
+def summarize(frames):
+    """Return the frame count, median, 99th percentile, maximum and frames over budget."""
+    ordered = sorted(frames)
+    return {
+        "frames": len(ordered),
+        "median_ms": statistics.median(ordered) * 1000,
+        "p99_ms": ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "over_budget": sum(1 for frame in ordered if frame * 1000 > FRAME_MS),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the frame times of the sidebar animation.")
+    parser.add_argument("--cycles", type=int, default=20, help="collapse and expand pairs")
+    parser.add_argument("--rows", type=int, default=1000, help="rows of the configuration table")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = {
+        label: summarize(measure(args.cycles, args.rows, animate))
+        for label, animate in (("animated", True), ("instant", False))
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for label, result in results.items():
+        print(f"{label:>8}: {result['frames']} frames, median {result['median_ms']:.2f} ms, "
+              f"p99 {result['p99_ms']:.2f} ms, max {result['max_ms']:.2f} ms, "
+              f"{result['over_budget']} over {FRAME_MS} ms")
+
+
+if __name__ == "__main__":
+    main()
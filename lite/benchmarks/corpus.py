@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthetic corpus generator.
+Writes deterministic configuration directories and document batches for benchmarks and stress tests.
+
+    python lite/benchmarks/corpus.py configs /tmp/configs --count 10000 --malformed 0.02
+    python lite/benchmarks/corpus.py documents /tmp/docs --batches 4 --per-batch 250
+
+The same seed and options always produce byte-identical files with the
+same modification times. Each corpus gets a manifest listing what was
+written, including which files are malformed and how, so tests can check
+what the application made of them.
+"""
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import unicodedata
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from models.config_model import ConfigModel
+
+# Written next to the corpus; the extension keeps ConfigManager from loading it
+MANIFEST_NAME = "corpus.manifest"
+
+# Fixed base for modification times, so repeated runs produce identical trees
+BASE_MTIME = 1700000000
+
+# Words used to build configuration and document names, by script
+NAME_WORDS = {
+    "ascii": ["Invoices", "Reports", "Orders", "Payroll", "Contracts", "Receipts", "Scans"],
+    "latin": ["Facturas", "Albarán", "Nóminas", "Pedidos", "Año fiscal", "Müller", "Ærø"],
+    "cyrillic": ["Счета", "Отчёты", "Договоры"],
+    "greek": ["Τιμολόγια", "Αναφορές"],
+    "cjk": ["請求書", "報告書", "契約", "注文"],
+    "arabic": ["فواتير", "تقارير"],
+    "emoji": ["📄 Docs", "🗂️ Archive", "✅ Done"],
+}
+
+# Log-normal parameters of description length in characters, and the range of step counts
+SIZE_PROFILES = {
+    "small": {"description": (3.0, 0.5), "steps": (1, 3)},
+    "mixed": {"description": (4.5, 1.2), "steps": (1, 8)},
+    "large": {"description": (7.0, 1.0), "steps": (8, 40)},
+}
+
+MALFORMED_KINDS = ["truncated", "empty", "binary", "not_object", "latin1"]
+
+STEP_TEMPLATES = [
+    lambda rng: {"type": "file_info", "params": {}},
+    lambda rng: {"type": "hash", "params": {"algorithm": rng.choice(["sha256", "md5", "sha1"])}},
+    lambda rng: {"type": "copy", "params": {"output_dir": f"/out/{rng.randrange(1000):03d}"}},
+    lambda rng: {"type": "preview", "params": {}},
+]
+
+DOCUMENT_KINDS = ["pdf", "png", "bin"]
+
+
+def make_name(rng, index, unicode_ratio):
+    """Build a unique configuration or document name."""
+    if rng.random() < unicode_ratio:
+        script = rng.choice([s for s in NAME_WORDS if s != "ascii"])
+    else:
+        script = "ascii"
+    name = f"{rng.choice(NAME_WORDS[script])} {index:06d}"
+    # Some names arrive decomposed, as they do from macOS file systems
+    if script == "latin" and rng.random() < 0.5:
+        name = unicodedata.normalize("NFD", name)
+    return name
+
+
+def make_config(rng, index, unicode_ratio=0.0, profile="mixed"):
+    """
+    Build one configuration.
+
+    Args:
+        rng: random.Random driving every choice
+        index: Index of the configuration, part of its name
+        unicode_ratio: Share of names drawn from non-ASCII scripts
+        profile: Key of SIZE_PROFILES
+
+    Returns:
+        ConfigModel: The configuration
+    """
+    sizes = SIZE_PROFILES[profile]
+    mu, sigma = sizes["description"]
+    length = min(100000, int(rng.lognormvariate(mu, sigma)))
+    words = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append(rng.choice(["lorem", "ipsum", "dolor", "sit", "amet", "factura",
+                                 "documento", "lote", "página", "résumé"]))
+    low, high = sizes["steps"]
+    steps = [rng.choice(STEP_TEMPLATES)(rng) for _ in range(rng.randint(low, high))]
+
+    return ConfigModel(
+        make_name(rng, index, unicode_ratio),
+        " ".join(words),
+        steps=steps,
+        input_dir=f"/data/in/{index:06d}"
+    )
+
+
+def build_configs(count, seed=0, unicode_ratio=0.0, profile="mixed"):
+    """
+    Build count configurations deterministically.
+
+    Returns:
+        list: ConfigModel instances
+    """
+    rng = random.Random(seed)
+    return [make_config(rng, index, unicode_ratio, profile) for index in range(count)]
+
+
+def malformed_bytes(rng, kind, config):
+    """Return the contents of a malformed configuration file of the given kind."""
+    text = json.dumps(config.to_dict(), indent=2, ensure_ascii=False)
+    if kind == "truncated":
+        return text.encode("utf-8")[:max(1, rng.randrange(len(text)))]
+    if kind == "empty":
+        return b""
+    if kind == "binary":
+        return rng.randbytes(rng.randint(16, 4096))
+    if kind == "not_object":
+        return json.dumps([config.to_dict()]).encode("utf-8")
+    # Valid JSON in the wrong encoding
+    return json.dumps({"name": config.name, "description": "Año ñandú"},
+                      ensure_ascii=False).encode("latin-1", errors="replace")
+
+
+def write_configs(directory, count, seed=0, malformed_ratio=0.0, unicode_ratio=0.0,
+                  profile="mixed"):
+    """
+    Write a configuration directory as ConfigManager stores it.
+
+    Args:
+        directory: Directory to write to; created if needed
+        count: Number of configuration files
+        seed: Seed of the generator
+        malformed_ratio: Share of files that are broken in one of MALFORMED_KINDS
+        unicode_ratio: Share of names drawn from non-ASCII scripts
+        profile: Key of SIZE_PROFILES
+
+    Returns:
+        dict: The manifest, also written to MANIFEST_NAME in directory
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    entries = []
+
+    for index in range(count):
+        config = make_config(rng, index, unicode_ratio, profile)
+        malformed = rng.choice(MALFORMED_KINDS) if rng.random() < malformed_ratio else None
+        if malformed is None:
+            data = json.dumps(config.to_dict(), indent=2).encode("utf-8")
+        else:
+            data = malformed_bytes(rng, malformed, config)
+
+        path = os.path.join(directory, f"{config.name}.json")
+        with open(path, "wb") as f:
+            f.write(data)
+        mtime = BASE_MTIME + index
+        os.utime(path, (mtime, mtime))
+        entries.append({"name": config.name, "bytes": len(data), "malformed": malformed})
+
+    manifest = {
+        "kind": "configs",
+        "seed": seed,
+        "count": count,
+        "malformed_ratio": malformed_ratio,
+        "unicode_ratio": unicode_ratio,
+        "profile": profile,
+        "valid": sum(1 for entry in entries if entry["malformed"] is None),
+        "entries": entries,
+    }
+    _write_manifest(directory, manifest)
+    return manifest
+
+
+def pdf_bytes(pages, label):
+    """Build a minimal valid PDF with one line of text per page."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for number in range(pages):
+        content = f"BT /F1 18 Tf 72 720 Td ({label} page {number + 1}) Tj ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref
+    )
+    return bytes(out)
+
+
+def png_bytes(width, height, seed):
+    """Build a valid RGB PNG with a deterministic gradient."""
+    red = bytes(((x * 255 // width) ^ seed) & 255 for x in range(width))
+    blue = bytes([seed & 255]) * width
+    raw = bytearray()
+    for y in range(height):
+        row = bytearray(width * 3)
+        row[0::3] = red
+        row[1::3] = bytes([y * 255 // height]) * width
+        row[2::3] = blue
+        # Filter type 0 before every scanline
+        raw.append(0)
+        raw += row
+    return _png(width, height, bytes(raw))
+
+
+def _png(width, height, raw):
+    """Wrap raw RGB scanlines into PNG chunks."""
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b""))
+
+
+def write_documents(directory, batches, per_batch, seed=0, malformed_ratio=0.0,
+                    unicode_ratio=0.0, max_pages=400, kinds=None):
+    """
+    Write batches of synthetic documents.
+
+    Page counts and file sizes are log-normal, so most documents are small
+    and a few are long enough to be split across workers.
+
+    Args:
+        directory: Directory to write to; each batch gets a subfolder
+        batches: Number of batches
+        per_batch: Documents per batch
+        seed: Seed of the generator
+        malformed_ratio: Share of documents that are truncated or garbage
+        unicode_ratio: Share of file names drawn from non-ASCII scripts
+        max_pages: Upper bound on pages per PDF
+        kinds: Document kinds to draw from; defaults to DOCUMENT_KINDS
+
+    Returns:
+        dict: The manifest, also written to MANIFEST_NAME in directory
+    """
+    rng = random.Random(seed)
+    kinds = kinds or DOCUMENT_KINDS
+    entries = []
+
+    for batch in range(batches):
+        batch_dir = os.path.join(directory, f"batch-{batch:04d}")
+        os.makedirs(batch_dir, exist_ok=True)
+        for index in range(per_batch):
+            kind = rng.choice(kinds)
+            name = make_name(rng, batch * per_batch + index, unicode_ratio)
+            pages = 1
+            if kind == "pdf":
+                pages = min(max_pages, max(1, int(rng.lognormvariate(1.5, 1.2))))
+                data = pdf_bytes(pages, f"Document {index}")
+            elif kind == "png":
+                width, height = rng.choice([(64, 64), (320, 240), (850, 1100)])
+                data = png_bytes(width, height, rng.randrange(256))
+            else:
+                data = rng.randbytes(min(64 * 1024 * 1024, int(rng.lognormvariate(11, 1.5))))
+
+            malformed = None
+            if rng.random() < malformed_ratio:
+                malformed = rng.choice(["truncated", "garbage"])
+                if malformed == "truncated":
+                    data = data[:max(1, len(data) // 3)]
+                else:
+                    data = data[:8] + rng.randbytes(256)
+
+            path = os.path.join(batch_dir, f"{name}.{kind}")
+            with open(path, "wb") as f:
+                f.write(data)
+            mtime = BASE_MTIME + len(entries)
+            os.utime(path, (mtime, mtime))
+            entries.append({
+                "path": os.path.relpath(path, directory), "kind": kind,
+                "pages": pages, "bytes": len(data), "malformed": malformed,
+            })
+
+    manifest = {
+        "kind": "documents",
+        "seed": seed,
+        "batches": batches,
+        "per_batch": per_batch,
+        "malformed_ratio": malformed_ratio,
+        "unicode_ratio": unicode_ratio,
+        "entries": entries,
+    }
+    _write_manifest(directory, manifest)
+    return manifest
+
+
+def _write_manifest(directory, manifest):
+    with open(os.path.join(directory, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic FlexiPy Lite corpus.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    configs = commands.add_parser("configs", help="write a configuration directory")
+    configs.add_argument("directory")
+    configs.add_argument("--count", type=int, default=1000)
+    configs.add_argument("--profile", choices=sorted(SIZE_PROFILES), default="mixed")
+
+    documents = commands.add_parser("documents", help="write document batches")
+    documents.add_argument("directory")
+    documents.add_argument("--batches", type=int, default=4)
+    documents.add_argument("--per-batch", type=int, default=250)
+    documents.add_argument("--max-pages", type=int, default=400)
+    documents.add_argument("--kinds", default=",".join(DOCUMENT_KINDS),
+                           help="comma-separated document kinds")
+
+    for command in (configs, documents):
+        command.add_argument("--seed", type=int, default=0)
+        command.add_argument("--malformed", type=float, default=0.0,
+                             help="share of malformed files, 0 to 1")
+        command.add_argument("--unicode", type=float, default=0.0,
+                             help="share of non-ASCII names, 0 to 1")
+    args = parser.parse_args()
+
+    if args.command == "configs":
+        manifest = write_configs(args.directory, args.count, args.seed, args.malformed,
+                                 args.unicode, args.profile)
+        print(f"Wrote {manifest['count']} configurations ({manifest['valid']} valid) "
+              f"to {args.directory}")
+    else:
+        manifest = write_documents(args.directory, args.batches, args.per_batch, args.seed,
+                                   args.malformed, args.unicode, args.max_pages,
+                                   args.kinds.split(","))
+        print(f"Wrote {len(manifest['entries'])} documents in {args.batches} batches "
+              f"to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
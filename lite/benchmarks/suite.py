@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for FlexiPy Lite.
+Times the configuration store, the models and the Qt views headless, and compares the results with a stored baseline.
+
+    python lite/benchmarks/suite.py --output results.json
+    python lite/benchmarks/suite.py --save-baseline
+    python lite/benchmarks/suite.py --compare
+
+Qt benchmarks run on the offscreen platform and are reported as skipped
+when PySide6 is not installed. Everything runs with HOME pointed at a
+temporary directory, so the user's configurations, caches and job queue
+are never touched. No baseline is committed, as timings only compare on
+the same machine; --compare without one runs the suite and says so.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+# Must be set before PySide6 is first imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import corpus  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Registered benchmarks: (name, setup function, needs Qt, sized)
+BENCHMARKS = []
+
+
+def benchmark(name, qt=False, sized=False):
+    """
+    Register a benchmark.
+
+    The decorated function receives the suite context, plus a size for
+    sized benchmarks, does its setup and returns a callable that is timed.
+
+    Args:
+        name: Name of the benchmark; sized ones get "[size]" appended
+        qt: The benchmark needs PySide6 and a QApplication
+        sized: Run the benchmark once per configured size
+    """
+    def decorator(func):
+        BENCHMARKS.append((name, func, qt, sized))
+        return func
+    return decorator
+
+
+class Context:
+    """Shared state of a suite run: scratch directories and the QApplication."""
+
+    def __init__(self, root):
+        self.root = root
+        self.config_dirs = {}
+        self.counter = 0
+        self.app = None
+
+    def new_dir(self, prefix):
+        """Return a new empty directory under the scratch root."""
+        self.counter += 1
+        path = os.path.join(self.root, f"{prefix}-{self.counter}")
+        os.makedirs(path)
+        return path
+
+    def config_dir(self, count):
+        """Return a directory holding count stored configurations, written once."""
+        directory = self.config_dirs.get(count)
+        if directory is None:
+            directory = self.new_dir(f"configs-{count}")
+            corpus.write_configs(directory, count, seed=count)
+            self.config_dirs[count] = directory
+        return directory
+
+    def qt_app(self):
+        """Return the QApplication, creating it on first use."""
+        if self.app is None:
+            from PySide6.QtWidgets import QApplication
+            self.app = QApplication.instance() or QApplication([])
+        return self.app
+
+
+def make_configs(count):
+    """Build count configurations with a few pipeline steps each."""
+    from models.config_model import ConfigModel
+
+    return [
+        ConfigModel(
+            f"config-{i:06d}",
+            f"Benchmark configuration {i}",
+            steps=[
+                {"type": "file_info", "params": {}},
+                {"type": "hash", "params": {"algorithm": "sha256"}},
+                {"type": "copy", "params": {"output_dir": f"/out/{i}"}},
+            ],
+            input_dir=f"/in/{i}"
+        )
+        for i in range(count)
+    ]
+
+
+@benchmark("config_manager.load_all_configs", sized=True)
+def bench_load_all_configs(context, size):
+    from utils.config_manager import ConfigManager
+
+    manager = ConfigManager(context.config_dir(size))
+    return manager.load_all_configs
+
+
+@benchmark("config_manager.save_config", sized=True)
+def bench_save_config(context, size):
+    from utils.config_manager import ConfigManager
+
+    manager = ConfigManager(context.new_dir("save"))
+    configs = make_configs(size)
+
+    def run():
+        for config in configs:
+            manager.save_config(config.name, config)
+    return run
+
+
+@benchmark("config_model.round_trip")
+def bench_config_round_trip(context):
+    from models.config_model import ConfigModel
+
+    data = [json.dumps(config.to_dict()) for config in make_configs(10000)]
+
+    def run():
+        for text in data:
+            json.dumps(ConfigModel.from_dict(json.loads(text)).to_dict())
+    return run
+
+
+@benchmark("config_model.content_hash")
+def bench_config_content_hash(context):
+    configs = make_configs(10000)
+
+    def run():
+        for config in configs:
+            config.content_hash()
+    return run
+
+
+@benchmark("config_table_model.sort", qt=True, sized=True)
+def bench_table_sort(context, size):
+    from PySide6.QtCore import Qt
+    from views.config_table_model import ConfigTableModel
+
+    model = ConfigTableModel()
+    model.set_configs(corpus.build_configs(size, seed=size, unicode_ratio=0.2))
+    # Compute the collation keys once; the timed runs sort with them
+    model.sort(1)
+
+    def run():
+        model.sort(-1)
+        model.sort(0, Qt.AscendingOrder)
+    return run
+
+
+@benchmark("config_table_model.update_x1000", qt=True, sized=True)
+def bench_table_update(context, size):
+    from models.config_model import ConfigModel
+    from views.config_table_model import ConfigTableModel
+
+    model = ConfigTableModel()
+    configs = corpus.build_configs(size, seed=size)
+    model.set_configs(configs)
+    model.sort(1)
+    changed = [ConfigModel(config.name, f"changed {i}") for i, config in enumerate(configs[:1000])]
+
+    def run():
+        for config in changed:
+            model.update_config(config)
+    return run
+
+
+@benchmark("config_table_model.reconcile", qt=True, sized=True)
+def bench_table_reconcile(context, size):
+    from models.config_model import ConfigModel
+    from views.config_table_model import ConfigTableModel
+
+    model = ConfigTableModel()
+    configs = corpus.build_configs(size, seed=size)
+    model.set_configs(configs)
+    # A reload with a few edits, additions and removals; runs alternate between the two
+    edited = list(configs[10:])
+    edited[::max(len(edited) // 10, 1)] = [
+        ConfigModel(config.name, f"edited {i}")
+        for i, config in enumerate(edited[::max(len(edited) // 10, 1)])
+    ]
+    edited += [ConfigModel(f"added {i}") for i in range(10)]
+    snapshots = [edited, configs]
+
+    def run():
+        snapshots.reverse()
+        model.reconcile(snapshots[0])
+    return run
+
+
+@benchmark("update_bus.post_x100k", qt=True)
+def bench_update_bus(context):
+    context.qt_app()
+    from controllers.update_bus import UpdateBus
+
+    bus = UpdateBus()
+    delivered = []
+    bus.delivered.connect(lambda topic, updates: delivered.append(len(updates)))
+    keys = [f"document-{i}" for i in range(100000)]
+
+    def run():
+        # Progress of 100k documents, each reported twice; one delivery carries it all
+        for done in (1, 2):
+            for key in keys:
+                bus.post("progress", key, done)
+        bus.flush()
+    return run
+
+
+@benchmark("main_window.construct", qt=True)
+def bench_main_window(context):
+    app = context.qt_app()
+    from PySide6.QtCore import QObject, Signal
+    from views.main_window import MainWindow
+
+    class IdleBatchController(QObject):
+        """Stands in for the worker processes, job queue and database."""
+
+        batch_started = Signal(str, int)
+        batch_progress = Signal(object)
+        batch_finished = Signal(object)
+        worker_metrics = Signal(object)
+
+        def resume(self):
+            pass
+
+        def preload_configs(self, configs):
+            pass
+
+        def run_batch(self, config, paths):
+            pass
+
+        def shutdown(self):
+            pass
+
+    class IdleIngestion:
+        """Stands in for the folder watching thread."""
+
+        def start(self):
+            pass
+
+        def stop(self, flush=True):
+            pass
+
+    def run():
+        # Only the window is measured, not the background services it would start
+        window = MainWindow(IdleBatchController(), IdleIngestion())
+        app.processEvents()
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+    return run
+
+
+@benchmark("sidebar_controller.create", qt=True)
+def bench_sidebar_create(context):
+    app = context.qt_app()
+    from controllers.sidebar_controller import SidebarController
+
+    def run():
+        controller = SidebarController()
+        controller.get_sidebar().deleteLater()
+        app.processEvents()
+    return run
+
+
+@benchmark("sidebar_controller.toggle_x100", qt=True)
+def bench_sidebar_toggle(context):
+    app = context.qt_app()
+    from controllers.sidebar_controller import SidebarController
+
+    controller = SidebarController()
+    sidebar = controller.get_sidebar()
+    sidebar.resize(200, 600)
+    sidebar.show()
+    app.processEvents()
+
+    def run():
+        for _ in range(100):
+            controller._toggle_sidebar()
+            app.processEvents()
+    return run
+
+
+@benchmark("sidebar_controller.animate_cycle", qt=True)
+def bench_sidebar_animate(context):
+    app = context.qt_app()
+    import bench_sidebar_frames
+
+    window, controller = bench_sidebar_frames.build_window()
+    app.processEvents()
+
+    def run():
+        # A collapse and an expand, a frame at a time; frame times: bench_sidebar_frames.py
+        for _ in range(2):
+            bench_sidebar_frames.toggle_frames(app, window, controller)
+    return run
+
+
+@benchmark("sidebar_button.icons", qt=True)
+def bench_sidebar_icons(context):
+    context.qt_app()
+    from controllers.sidebar_controller import SidebarButton
+
+    names = ["menu", "start", "new", "edit", "delete", "import", "export", "settings"]
+
+    def run():
+        for name in names:
+            SidebarButton(name, name.title()).button.deleteLater()
+    return run
+
+
+@benchmark("sidebar_button.white_icon", qt=True)
+def bench_white_icon(context):
+    context.qt_app()
+    from PySide6.QtCore import Qt
+    from PySide6.QtGui import QIcon, QPixmap
+    from controllers.sidebar_controller import SidebarButton
+
+    pixmap = QPixmap(64, 64)
+    pixmap.fill(Qt.black)
+    icon = QIcon(pixmap)
+    button = SidebarButton("start", "Start")
+
+    def run():
+        button._create_white_icon(icon)
+    return run
+
+
+def time_callable(func, repeat):
+    """Run func repeat times and return the timings in seconds."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    return timings
+
+
+def qt_available():
+    try:
+        import PySide6  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run_suite(sizes, repeat, only=None):
+    """
+    Run the registered benchmarks.
+
+    Args:
+        sizes: Sizes of the sized benchmarks
+        repeat: Timed runs per benchmark; runs above 10k items are timed once
+        only: Optional list of name prefixes to run
+
+    Returns:
+        dict: Results keyed by benchmark name
+    """
+    has_qt = qt_available()
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="flexipy-bench-") as root:
+        # Keep the app's defaults under ~/.flexipy away from real user data
+        os.environ["HOME"] = os.path.join(root, "home")
+        os.makedirs(os.environ["HOME"])
+        context = Context(root)
+
+        for name, setup, qt, sized in BENCHMARKS:
+            for size in (sizes if sized else [None]):
+                full_name = f"{name}[{size}]" if sized else name
+                if only and not any(full_name.startswith(prefix) for prefix in only):
+                    continue
+                if qt and not has_qt:
+                    results[full_name] = {"skipped": "PySide6 is not installed"}
+                    continue
+
+                print(f"  {full_name} ...", end="", file=sys.stderr, flush=True)
+                try:
+                    func = setup(context, size) if sized else setup(context)
+                    runs = 1 if size and size > 10000 else repeat
+                    timings = time_callable(func, runs)
+                except Exception as e:
+                    results[full_name] = {"error": f"{type(e).__name__}: {e}"}
+                    print(f" error: {e}", file=sys.stderr)
+                    continue
+
+                results[full_name] = {
+                    "median": statistics.median(timings),
+                    "min": min(timings),
+                    "max": max(timings),
+                    "runs": len(timings),
+                }
+                print(f" {statistics.median(timings) * 1000:.1f} ms", file=sys.stderr)
+
+    return results
+
+
+def compare(results, baseline, threshold, noise_floor=0.001):
+    """
+    Compare results with a baseline.
+
+    Args:
+        results: Results of this run
+        baseline: Results of the baseline run
+        threshold: Relative slowdown counted as a regression, e.g. 0.2
+        noise_floor: Absolute slowdown in seconds below which changes are ignored
+
+    Returns:
+        list: (name, baseline time, time, ratio, regressed) tuples
+    """
+    rows = []
+    for name, result in results.items():
+        before = baseline.get(name, {})
+        if "min" not in result or "min" not in before:
+            continue
+        # The fastest run is the least disturbed by the rest of the machine
+        ratio = result["min"] / before["min"] if before["min"] else float("inf")
+        regressed = ratio > 1 + threshold and result["min"] - before["min"] > noise_floor
+        rows.append((name, before["min"], result["min"], ratio, regressed))
+    return rows
+
+
+def metadata():
+    """Describe the machine and interpreter the suite ran on."""
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    if qt_available():
+        import PySide6
+        info["pyside6"] = PySide6.__version__
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the FlexiPy Lite benchmark suite.")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated configuration counts for the sized benchmarks")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--only", default=None,
+                        help="comma-separated name prefixes of the benchmarks to run")
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the results as the new baseline")
+    parser.add_argument("--compare", action="store_true",
+                        help="compare with the baseline and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    only = args.only.split(",") if args.only else None
+
+    # Said before the run, which can take minutes, rather than after it
+    compare_results = args.compare and not args.save_baseline
+    if compare_results and not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; the results are not compared. "
+              f"Run with --save-baseline first to create one.", file=sys.stderr)
+        compare_results = False
+
+    report = {"meta": metadata(), "results": run_suite(sizes, args.repeat, only)}
+    text = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(text)
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if compare_results:
+        try:
+            with open(args.baseline, "r") as f:
+                baseline = json.load(f)["results"]
+        except (IOError, json.JSONDecodeError, KeyError) as e:
+            print(f"Cannot read baseline {args.baseline}: {e}", file=sys.stderr)
+            return 2
+
+        rows = compare(report["results"], baseline, args.threshold)
+        regressions = 0
+        for name, before, after, ratio, regressed in rows:
+            regressions += regressed
+            flag = "REGRESSION" if regressed else ""
+            print(f"{name:45} {before * 1000:10.2f} ms {after * 1000:10.2f} ms "
+                  f"{ratio:6.2f}x {flag}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
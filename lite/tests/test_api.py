@@ -0,0 +1,126 @@
+import json
+import os
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+
+from api import create_app
+from models.config_model import ConfigModel
+from utils.config_manager import ConfigManager
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Return a client of an app with one stored configuration and a running engine."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    manager = ConfigManager(str(tmp_path / "configs"))
+    manager.save_config("hashes", ConfigModel("hashes", "Hash documents", [{"type": "hash"}]))
+    with TestClient(create_app(manager.config_dir, max_workers=1, use_cache=False)) as client:
+        yield client
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    """Return a folder of two documents."""
+    folder = tmp_path / "inputs"
+    folder.mkdir()
+    for name in ("a.txt", "b.txt"):
+        (folder / name).write_text(name)
+    return str(folder)
+
+
+def wait_until_finished(client, batch_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f"/batches/{batch_id}").json()
+        if status["state"] == "finished":
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"Batch {batch_id} did not finish")
+
+
+def read_events(response):
+    """Parse a server-sent event stream into (event, data) tuples."""
+    events = []
+    for block in response.text.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines()
+                      if line and not line.startswith(":"))
+        if fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_configs(client):
+    assert client.get("/configs").json() == [
+        {"name": "hashes", "description": "Hash documents", "steps": 1}
+    ]
+    assert client.get("/configs/hashes").json()["steps"] == [{"type": "hash"}]
+    assert client.get("/configs/missing").status_code == 404
+
+
+def test_batch_lifecycle(client, inputs):
+    response = client.post("/batches", json={"config": "hashes", "inputs": [inputs]})
+    assert response.status_code == 202
+    submitted = response.json()
+    batch_id = submitted["batch_id"]
+    assert submitted["total"] == 2
+    assert submitted["config"] == "hashes"
+
+    status = wait_until_finished(client, batch_id)
+    assert status["done"] == 2
+    assert status["failed"] == 0
+    assert [batch["batch_id"] for batch in client.get("/batches").json()] == [batch_id]
+
+    documents = client.get(f"/batches/{batch_id}/documents").json()
+    assert sorted(os.path.basename(document["path"]) for document in documents) == ["a.txt", "b.txt"]
+    assert client.delete(f"/batches/{batch_id}").status_code == 202
+
+
+@pytest.mark.parametrize("payload, code", [
+    ({"config": "missing", "inputs": []}, 404),
+    ({"config": "hashes", "inputs": "not a list"}, 400),
+    ({"inputs": []}, 400),
+    ([], 400),
+])
+def test_invalid_batches_are_rejected(client, payload, code):
+    assert client.post("/batches", json=payload).status_code == code
+
+
+def test_unknown_batches_are_not_found(client):
+    for path in ("/batches/missing", "/batches/missing/documents", "/batches/missing/events"):
+        assert client.get(path).status_code == 404
+    assert client.delete("/batches/missing").status_code == 404
+
+
+def test_events_stream_until_the_batch_finishes(client, inputs):
+    batch_id = client.post("/batches", json={"config": "hashes", "inputs": [inputs]}).json()["batch_id"]
+
+    with client.stream("GET", f"/batches/{batch_id}/events") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        response.read()
+    events = read_events(response)
+
+    assert all(name == "progress" for name, _ in events[:-1])
+    name, data = events[-1]
+    assert name == "finished"
+    assert data["batch_id"] == batch_id
+    assert data["done"] == data["total"] == 2
+
+
+def test_metrics(client, inputs):
+    batch_id = client.post("/batches", json={"config": "hashes", "inputs": [inputs]}).json()["batch_id"]
+    wait_until_finished(client, batch_id)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE" in response.text
+
+    snapshot = client.get("/metrics.json")
+    assert snapshot.headers["content-type"] == "application/json"
+    assert isinstance(snapshot.json(), dict)
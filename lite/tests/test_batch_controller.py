@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from models.config_model import ConfigModel
+from processing.job_queue import JobQueue
+from utils.database import Database
+
+
+@pytest.fixture
+def controller(qapp, monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    from controllers.batch_controller import BatchController
+
+    controller = BatchController(
+        max_workers=1,
+        job_queue=JobQueue(str(tmp_path / "jobs.db")),
+        database=Database(str(tmp_path / "flexipy.db")),
+    )
+    yield controller
+    controller.shutdown()
+
+
+def test_batches_are_queued_and_recorded_off_the_calling_thread(qapp, controller, tmp_path):
+    threads = {}
+    enqueue = controller.job_queue.enqueue
+
+    def recording_enqueue(*args):
+        threads["enqueue"] = threading.current_thread()
+        return enqueue(*args)
+
+    controller.job_queue.enqueue = recording_enqueue
+    record_batch = controller.database.record_batch
+
+    def recording_record_batch(*args):
+        threads["record_batch"] = threading.current_thread()
+        return record_batch(*args)
+
+    controller.database.record_batch = recording_record_batch
+
+    finished = threading.Event()
+    controller.batch_finished.connect(lambda batch: finished.set())
+    path = tmp_path / "doc.txt"
+    path.write_bytes(b"contents")
+
+    batch_id = controller.run_batch(ConfigModel("test", steps=[{"type": "hash"}]), [str(path)])
+
+    # batch_finished is delivered through the event loop of this thread
+    deadline = time.monotonic() + 60
+    while not finished.is_set() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    assert finished.is_set()
+    assert threads["enqueue"] is not threading.current_thread()
+    assert threads["record_batch"] is threads["enqueue"]
+    assert controller.database.batches()[0]["batch_id"] == batch_id
+
+
+def test_resume_dispatches_unfinished_batches_in_the_background(qapp, controller, tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_bytes(b"contents")
+    config = ConfigModel("test", steps=[{"type": "hash"}])
+    controller.job_queue.enqueue("left-over", {"config": config.to_dict(), "paths": [str(path)]})
+    controller.job_queue.claim("previous-run")
+
+    finished = []
+    controller.batch_finished.connect(lambda batch: finished.append(batch.batch_id))
+    controller.resume()
+
+    deadline = time.monotonic() + 60
+    while not finished and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    assert finished == ["left-over"]
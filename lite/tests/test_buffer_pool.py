@@ -0,0 +1,30 @@
+import gc
+from multiprocessing import shared_memory
+
+from processing.buffer_pool import SharedBufferPool
+
+
+def _exists(name):
+    try:
+        shared_memory.SharedMemory(name=name).close()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def test_idle_buffers_are_freed_with_the_pool():
+    pool = SharedBufferPool()
+    idle = pool.checkout(10, 10, "L")
+    held = pool.checkout(10, 10, "L")
+    idle.release()
+    idle_name, held_name = idle.name, held.name
+    del idle
+
+    # Buffers point back weakly, so dropping the pool is enough to free it
+    del pool
+    assert not _exists(idle_name)
+
+    held.release()
+    assert not _exists(held_name)
+    gc.collect()
+
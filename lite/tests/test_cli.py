@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import APP_DIR
+from models.config_model import ConfigModel
+from utils.config_manager import ConfigManager
+
+CLI = os.path.join(APP_DIR, "cli.py")
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    """Return a configuration folder holding two stored configurations."""
+    manager = ConfigManager(str(tmp_path / "configs"))
+    manager.save_config("hashes", ConfigModel("hashes", "Hash documents", [{"type": "hash"}],
+                                              input_dir=str(tmp_path / "inbox")))
+    manager.save_config("empty", ConfigModel("empty"))
+    return manager.config_dir
+
+
+def run_cli(tmp_path, *args):
+    """Run the CLI in a fresh process and return its exit code and JSON-line events."""
+    env = dict(os.environ, HOME=str(tmp_path))
+    result = subprocess.run([sys.executable, CLI, *args], capture_output=True, text=True,
+                            env=env, timeout=120)
+    events = [json.loads(line) for line in result.stdout.splitlines()]
+    return result.returncode, events
+
+
+def test_list_prints_one_line_per_configuration(tmp_path, config_dir):
+    code, events = run_cli(tmp_path, "--config-dir", config_dir, "list")
+
+    assert code == 0
+    assert [(event["event"], event["name"], event["steps"]) for event in events] == [
+        ("config", "empty", 0),
+        ("config", "hashes", 1),
+    ]
+    assert events[1]["description"] == "Hash documents"
+
+
+def test_run_reports_progress_and_documents(tmp_path, config_dir):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    for name in ("a.txt", "b.txt", ".hidden"):
+        (inbox / name).write_text(name)
+
+    code, events = run_cli(tmp_path, "--config-dir", config_dir, "run", "hashes",
+                           "--workers", "1", "--no-cache")
+
+    assert code == 0
+    kinds = [event["event"] for event in events]
+    assert kinds[0] == "started"
+    assert kinds[-1] == "finished"
+    assert events[0]["total"] == 2
+    assert events[-1]["documents"] == 2
+    assert events[-1]["failed"] == 0
+    assert "progress" in kinds
+    documents = [event for event in events if event["event"] == "document"]
+    assert sorted(os.path.basename(event["path"]) for event in documents) == ["a.txt", "b.txt"]
+    assert all(event["batch_id"] == events[0]["batch_id"]
+               for event in events if "batch_id" in event)
+
+
+def test_run_exits_with_one_when_a_document_fails(tmp_path, config_dir):
+    code, events = run_cli(tmp_path, "--config-dir", config_dir, "run", "hashes",
+                           str(tmp_path / "missing.txt"), "--workers", "1")
+
+    assert code == 1
+    assert events[-1]["event"] == "finished"
+    assert events[-1]["failed"] == 1
+
+
+@pytest.mark.parametrize("args", [["run", "unknown"], ["run", "empty"]])
+def test_run_rejects_bad_arguments(tmp_path, config_dir, args):
+    code, events = run_cli(tmp_path, "--config-dir", config_dir, *args)
+
+    assert code == 2
+    assert [event["event"] for event in events] == ["error"]
@@ -0,0 +1,108 @@
+import gzip
+import io
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+from models.config_model import ConfigModel
+from utils import config_exporter
+from utils.config_exporter import ConfigExporter, detect_format
+from utils.config_manager import ConfigManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Return a ConfigManager holding three configurations."""
+    manager = ConfigManager(str(tmp_path / "configs"))
+    for name in ("alpha", "beta", "gamma"):
+        manager.save_config(name, ConfigModel(name, f"{name} config", [{"type": "hash"}]))
+    return manager
+
+
+def read_zip(path):
+    with zipfile.ZipFile(path) as archive:
+        return {name: json.loads(archive.read(name)) for name in archive.namelist()}
+
+
+def read_ndjson_gz(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return {record["name"]: record["config"] for record in map(json.loads, f)}
+
+
+def read_tar_zst(path):
+    zstandard = pytest.importorskip("zstandard")
+    with open(path, "rb") as raw:
+        data = zstandard.ZstdDecompressor().stream_reader(raw).read()
+    with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+        return {member.name: json.load(archive.extractfile(member)) for member in archive}
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 256), (2, 1)])
+def test_zip_round_trip(tmp_path, manager, workers, chunk_size):
+    output = str(tmp_path / "configs.zip")
+    exporter = ConfigExporter(manager, workers=workers, chunk_size=chunk_size)
+
+    assert exporter.export(output) == 3
+    entries = read_zip(output)
+    assert sorted(entries) == ["alpha.json", "beta.json", "gamma.json"]
+    assert ConfigModel.from_dict(entries["beta.json"]).to_dict() == \
+        manager.get_config("beta").to_dict()
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 256), (2, 1)])
+def test_ndjson_gz_round_trip(tmp_path, manager, workers, chunk_size):
+    output = str(tmp_path / "configs.ndjson.gz")
+    exporter = ConfigExporter(manager, workers=workers, chunk_size=chunk_size)
+
+    assert exporter.export(output, names=["gamma", "alpha"]) == 2
+    records = read_ndjson_gz(output)
+    assert sorted(records) == ["alpha", "gamma"]
+    assert records["alpha"] == manager.get_config("alpha").to_dict()
+
+
+def test_tar_zst_round_trip(tmp_path, manager):
+    pytest.importorskip("zstandard")
+    output = str(tmp_path / "configs.tar.zst")
+
+    assert ConfigExporter(manager, workers=1).export(output, names=None) == 3
+    entries = read_tar_zst(output)
+    assert sorted(entries) == ["alpha.json", "beta.json", "gamma.json"]
+    assert entries["gamma.json"] == manager.get_config("gamma").to_dict()
+
+
+def test_tar_zst_needs_zstandard(tmp_path, manager, monkeypatch):
+    monkeypatch.setattr(config_exporter, "zstandard", None)
+    output = tmp_path / "configs.tar.zst"
+
+    with pytest.raises(RuntimeError):
+        ConfigExporter(manager).export(str(output))
+    assert not output.exists()
+
+
+def test_unknown_format_is_rejected(tmp_path, manager):
+    output = tmp_path / "configs.bin"
+
+    with pytest.raises(ValueError):
+        ConfigExporter(manager).export(str(output), export_format="bogus")
+    assert not output.exists()
+
+    # Without an explicit format an unknown extension is written as zip
+    assert detect_format("configs.bin") == "zip"
+    assert detect_format("CONFIGS.JSONL.GZ") == "ndjson.gz"
+    assert detect_format("configs.tzst") == "tar.zst"
+    assert ConfigExporter(manager).export(str(output)) == 3
+    assert zipfile.is_zipfile(output)
+
+
+def test_unreadable_configurations_are_skipped(tmp_path, manager):
+    with open(manager.get_config_path("beta"), "w") as f:
+        f.write("{broken")
+    output = str(tmp_path / "configs.zip")
+    exporter = ConfigExporter(manager, workers=1)
+
+    assert exporter.export(output) == 2
+    assert sorted(read_zip(output)) == ["alpha.json", "gamma.json"]
+    assert [name for name, _ in exporter.errors] == ["beta"]
+    assert not (tmp_path / "configs.zip.part").exists()
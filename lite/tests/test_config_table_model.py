@@ -0,0 +1,57 @@
+import pytest
+
+from models.config_model import ConfigModel
+
+
+@pytest.fixture
+def model(qapp):
+    from PySide6.QtTest import QAbstractItemModelTester
+    from views.config_table_model import ConfigTableModel
+
+    model = ConfigTableModel()
+    model.tester = QAbstractItemModelTester(
+        model, QAbstractItemModelTester.FailureReportingMode.Fatal
+    )
+    return model
+
+
+def names(model):
+    return [model.config(row).name for row in range(model.rowCount())]
+
+
+def test_sort_orders_rows_and_keeps_selection(model):
+    from PySide6.QtCore import QPersistentModelIndex, Qt
+
+    model.set_configs([ConfigModel("b", "2"), ConfigModel("c", "1"), ConfigModel("a", "3")])
+    model.sort(0, Qt.AscendingOrder)
+    assert names(model) == ["a", "b", "c"]
+
+    selected = QPersistentModelIndex(model.index(model.row_of("b"), 0))
+    model.sort(1, Qt.DescendingOrder)
+    assert names(model) == ["a", "b", "c"]
+    model.sort(1, Qt.AscendingOrder)
+    assert names(model) == ["c", "b", "a"]
+    assert selected.row() == model.row_of("b")
+
+
+def test_sorting_enabled_view_constructs(model):
+    from PySide6.QtCore import Qt
+    from PySide6.QtWidgets import QTableView
+
+    model.set_configs([ConfigModel("b"), ConfigModel("a")])
+    view = QTableView()
+    view.setModel(model)
+    view.setSortingEnabled(True)
+    view.sortByColumn(0, Qt.DescendingOrder)
+    assert names(model) == ["b", "a"]
+
+
+def test_reconcile_reports_changes(model):
+    model.set_configs([ConfigModel("a", "1"), ConfigModel("b", "2"), ConfigModel("c", "3")])
+    model.sort(0)
+    added, changed, removed = model.reconcile(
+        [ConfigModel("a", "1"), ConfigModel("c", "changed"), ConfigModel("d", "4")]
+    )
+    assert (added, changed, removed) == (1, 1, 1)
+    assert names(model) == ["a", "c", "d"]
+    assert model.config(model.row_of("c")).description == "changed"
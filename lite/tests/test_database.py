@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+from utils import database
+from utils.database import (
+    DOC_DONE, DOC_FAILED, DOC_PENDING, ConnectionPool, Database, Driver, SqliteDriver,
+    register_driver,
+)
+
+
+def test_pool_hands_each_thread_its_own_connection(tmp_path):
+    pool = ConnectionPool(SqliteDriver(str(tmp_path / "pool.db")), size=2)
+    lock = threading.Lock()
+    borrowed = set()
+    peak = [0]
+    errors = []
+
+    def borrow():
+        try:
+            for _ in range(20):
+                with pool.connection() as conn:
+                    with lock:
+                        assert id(conn) not in borrowed
+                        borrowed.add(id(conn))
+                        peak[0] = max(peak[0], len(borrowed))
+                    conn.execute("SELECT 1").fetchone()
+                    with lock:
+                        borrowed.discard(id(conn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=borrow) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert peak[0] <= 2
+    assert pool.opened <= 2
+    assert pool.idle.qsize() == pool.opened
+
+    pool.close()
+    assert pool.opened == 0
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            pass
+
+
+def test_pool_times_out_when_every_connection_is_busy(tmp_path):
+    pool = ConnectionPool(SqliteDriver(str(tmp_path / "pool.db")), size=1, timeout=0.05)
+    with pool.connection():
+        with pytest.raises(TimeoutError):
+            with pool.connection():
+                pass
+
+    # A connection returned after close is closed instead of kept
+    with pool.connection():
+        pool.close()
+    assert pool.opened == 0
+    assert pool.idle.empty()
+
+
+def test_registered_drivers_are_selected_by_name(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DRIVERS", dict(database.DRIVERS))
+
+    @register_driver("counting")
+    class CountingDriver(SqliteDriver):
+        connects = 0
+
+        def connect(self):
+            CountingDriver.connects += 1
+            return super().connect()
+
+    assert database.DRIVERS["counting"] is CountingDriver
+    assert CountingDriver.name == "counting"
+
+    db = Database(str(tmp_path / "flexipy.db"), driver="counting")
+    db.record_batch("batch", "config", ["a"])
+    assert isinstance(db.driver, CountingDriver)
+    assert CountingDriver.connects == 1
+    db.close()
+
+    with pytest.raises(ValueError):
+        Database(str(tmp_path / "other.db"), driver="missing")
+
+
+def test_driver_rewrites_placeholders_once():
+    class FormatDriver(Driver):
+        placeholder = "%s"
+
+    driver = FormatDriver("dsn")
+    statement = "UPDATE documents SET status = ? WHERE path = ?"
+    translated = driver.sql(statement)
+    assert translated == "UPDATE documents SET status = %s WHERE path = %s"
+    assert driver.sql(statement) is translated
+    assert SqliteDriver("path").sql(statement) is statement
+
+
+def test_batch_and_document_round_trip(tmp_path):
+    db = Database(str(tmp_path / "flexipy.db"))
+    db.record_batch("batch", "config", ["a", "b", "c"], started_at=100.0)
+
+    assert db.batches() == [{
+        "batch_id": "batch", "config_name": "config", "status": "running", "total": 3,
+        "failed": 0, "started_at": 100.0, "finished_at": None,
+    }]
+    assert db.count_documents("batch") == {DOC_PENDING: 3}
+
+    updated = db.update_document_status([
+        ("batch", "a", DOC_DONE, None),
+        ("batch", "b", DOC_FAILED, "unreadable"),
+        ("batch", "missing", DOC_DONE, None),
+    ])
+    assert updated == 2
+    assert db.count_documents("batch") == {DOC_PENDING: 1, DOC_DONE: 1, DOC_FAILED: 1}
+    failed = db.documents(batch_id="batch", status=DOC_FAILED)
+    assert [(record["path"], record["error"]) for record in failed] == [("b", "unreadable")]
+
+    written = db.upsert_documents([
+        {"batch_id": "batch", "path": "c", "config_name": "config", "status": DOC_DONE,
+         "results": {"pages": 2}},
+    ])
+    assert written == 1
+    done = {record["path"]: record["results"]
+            for record in db.documents(batch_id="batch", status=DOC_DONE)}
+    assert done == {"a": None, "c": {"pages": 2}}
+    assert len(db.documents(config_name="config", limit=2)) == 2
+    db.close()
+
+    # The records outlive the connections
+    reopened = Database(str(tmp_path / "flexipy.db"))
+    assert reopened.count_documents("batch") == {DOC_DONE: 2, DOC_FAILED: 1}
+    reopened.close()
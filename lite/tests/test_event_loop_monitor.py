@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from utils import metrics
+
+
+@pytest.fixture
+def monitor(qapp, tmp_path):
+    from utils.event_loop_monitor import EventLoopMonitor
+
+    monitor = EventLoopMonitor(interval_ms=20, stall_ms=100, log_path=str(tmp_path / "loop.log"))
+    yield monitor
+    monitor.deleteLater()
+
+
+def test_latencies_are_recorded_in_the_metrics_registry(monitor):
+    before = monitor.snapshot()
+
+    for elapsed_ms in (5.0, 10.0, 300.0):
+        monitor.record_dispatch(("QWidget", 12), elapsed_ms)
+    monitor._last_beat = time.monotonic() - 0.05
+    monitor._on_heartbeat()
+
+    stats = monitor.snapshot()
+    assert stats["dispatch"]["count"] == before["dispatch"]["count"] + 3
+    assert stats["dispatch"]["max"] == pytest.approx(300.0, rel=0.01)
+    assert stats["latency"]["count"] == before["latency"]["count"] + 1
+    assert 25.0 <= stats["latency"]["max"] < 100.0
+    assert stats["stalls"] == 0
+    assert stats["slowest"] == [("QWidget", "12", 3, 300.0)]
+
+    exported = metrics.REGISTRY.to_prometheus()
+    assert f"ui_event_dispatch_seconds_count {stats['dispatch']['count']}" in exported
+    assert f"ui_event_loop_lateness_seconds_count {stats['latency']['count']}" in exported
+
+
+def test_late_heartbeat_is_reported_as_a_stall(monitor):
+    stalls = []
+    monitor.stall_detected.connect(stalls.append)
+
+    monitor._last_beat = time.monotonic() - 0.25
+    monitor._on_heartbeat()
+
+    assert monitor.stall_count == 1
+    assert stalls[0]["duration_ms"] >= 200
+    assert "stall(s)" in monitor.summary_line()
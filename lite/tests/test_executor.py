@@ -0,0 +1,174 @@
+import operator
+import os
+import queue
+import signal
+import threading
+import time
+
+from models.config_model import ConfigModel
+from processing import page_source
+from processing.executor import WorkStealingExecutor
+
+
+def test_long_documents_are_split_merged_and_cached(tmp_path):
+    path = tmp_path / "doc.bin"
+    # Three raw blocks, so the document splits into three page ranges
+    path.write_bytes(b"\1" * (2 * page_source.RAW_BLOCK_SIZE + 10))
+    config = ConfigModel("test", steps=[
+        {"type": "hash", "params": {}},
+        {"type": "file_info", "params": {}},
+    ])
+
+    documents = []
+    done = threading.Event()
+
+    def on_document(batch_id, index, document):
+        documents.append(document)
+        done.set()
+
+    executor = WorkStealingExecutor(max_workers=2, cache_dir=str(tmp_path / "cache"),
+                                    pages_per_task=1, on_document=on_document)
+    try:
+        executor.submit("first", config, [str(path)])
+        assert done.wait(60)
+        done.clear()
+        executor.submit("second", config, [str(path)])
+        assert done.wait(60)
+    finally:
+        executor.shutdown()
+
+    first, second = documents
+    assert first.error is None
+    assert first.results["file_info"]["pages"] == 3
+    # Both runs split into three ranges; the second only runs file_info in
+    # them and takes the hash from the cache
+    assert executor.workers[0].tasks + executor.workers[1].tasks == 6
+    assert second.results == first.results
+    assert not executor.batches and not executor.cancelled
+
+
+def _run_batch(executor, config, paths, timeout=60):
+    documents = {}
+    done = threading.Event()
+
+    def on_document(batch_id, index, document):
+        documents[index] = document
+        if len(documents) == len(paths):
+            done.set()
+
+    executor.on_document = on_document
+    executor.submit("batch", config, paths)
+    assert done.wait(timeout), f"{len(documents)} of {len(paths)} documents reported"
+    return [documents[index] for index in range(len(paths))]
+
+
+def _small_files(tmp_path, count):
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"doc{index}.bin"
+        path.write_bytes(str(index).encode())
+        paths.append(str(path))
+    return paths
+
+
+HASH_CONFIG = ConfigModel("hash", steps=[{"type": "hash", "params": {}}])
+
+
+def test_workers_retire_after_max_tasks(tmp_path):
+    paths = _small_files(tmp_path, 60)
+    executor = WorkStealingExecutor(max_workers=3, use_cache=False, max_tasks=2)
+    try:
+        documents = _run_batch(executor, HASH_CONFIG, paths)
+        assert executor.scheduler.is_alive()
+    finally:
+        executor.shutdown()
+
+    assert [document.error for document in documents] == [None] * len(paths)
+    assert sum(worker.tasks for worker in executor.workers) == len(paths)
+    assert sum(worker.recycled for worker in executor.workers) >= len(paths) // 2 - 3
+
+
+class _LaggingOutbox:
+    """Outbox whose reader skips every other turn, so retired workers are
+    often seen dead before their last result is read."""
+
+    def __init__(self, outbox):
+        self.outbox = outbox
+        self.turns = 0
+
+    def get(self, timeout=None):
+        self.turns += 1
+        time.sleep(0.05)
+        if self.turns % 2:
+            raise queue.Empty
+        return self.outbox.get(timeout=timeout)
+
+    def __getattr__(self, name):
+        return getattr(self.outbox, name)
+
+    def __reduce__(self):
+        # Workers get the real queue
+        return operator.itemgetter(0), ([self.outbox],)
+
+
+def test_retired_worker_is_not_taken_for_a_crashed_one(tmp_path):
+    paths = _small_files(tmp_path, 8)
+    executor = WorkStealingExecutor(max_workers=1, use_cache=False, max_tasks=1)
+    executor.outbox = _LaggingOutbox(executor.outbox)
+    try:
+        documents = _run_batch(executor, HASH_CONFIG, paths, timeout=30)
+        assert executor.scheduler.is_alive()
+    finally:
+        executor.shutdown()
+
+    assert [document.error for document in documents] == [None] * len(paths)
+    assert executor.workers[0].recycled == len(paths)
+
+
+def test_workers_retire_past_the_memory_limit(tmp_path):
+    paths = _small_files(tmp_path, 10)
+    executor = WorkStealingExecutor(max_workers=2, use_cache=False, max_memory=1)
+    try:
+        documents = _run_batch(executor, HASH_CONFIG, paths)
+    finally:
+        executor.shutdown()
+
+    assert all(document.error is None for document in documents)
+    # Every task leaves its worker over the limit, so each one gets a fresh worker
+    assert sum(worker.recycled for worker in executor.workers) >= len(paths) - 2
+
+
+def test_crashed_worker_fails_its_task_and_is_restarted(tmp_path):
+    # Reading a FIFO with no writer blocks the worker until it is killed
+    fifo = tmp_path / "stuck.bin"
+    os.mkfifo(fifo)
+    executor = WorkStealingExecutor(max_workers=1, use_cache=False)
+    try:
+        results = {}
+        finished = threading.Event()
+
+        def on_document(batch_id, index, document):
+            results[batch_id] = document
+            finished.set()
+
+        executor.on_document = on_document
+        executor.submit("stuck", HASH_CONFIG, [str(fifo)])
+        worker = executor.workers[0]
+        deadline = time.monotonic() + 30
+        while worker.running is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        process = worker.process
+        time.sleep(0.5)
+        os.kill(process.pid, signal.SIGKILL)
+        assert finished.wait(30)
+        assert results["stuck"].error == "Worker process crashed"
+        assert worker.process is not process
+
+        finished.clear()
+        path = _small_files(tmp_path, 1)[0]
+        executor.submit("after", HASH_CONFIG, [path])
+        assert finished.wait(30)
+        assert results["after"].error is None
+    finally:
+        executor.shutdown()
+    assert not executor.tasks
@@ -0,0 +1,110 @@
+import os
+
+from models.config_model import ConfigModel
+from processing.incremental import run_incremental
+from processing.pipeline import Pipeline
+from processing.result_cache import ResultCache
+
+
+def make_pipeline(steps):
+    return Pipeline.from_config(ConfigModel("test", steps=steps))
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_copy_runs_for_every_file_with_identical_contents(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    out = tmp_path / "out"
+    pipeline = make_pipeline([
+        {"type": "hash", "params": {}},
+        {"type": "copy", "params": {"output_dir": str(out)}},
+    ])
+    first = write(tmp_path / "first.txt", b"same contents")
+    second = write(tmp_path / "second.txt", b"same contents")
+
+    assert run_incremental(pipeline, first, cache).results["copy"] == str(out / "first.txt")
+    document = run_incremental(pipeline, second, cache)
+
+    assert document.error is None
+    assert not document.cached
+    assert document.results["copy"] == str(out / "second.txt")
+    assert os.path.exists(out / "second.txt")
+
+
+def test_file_info_is_not_reused_across_paths(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    pipeline = make_pipeline([{"type": "file_info", "params": {}}])
+    first = write(tmp_path / "first.txt", b"same contents")
+    run_incremental(pipeline, first, cache)
+
+    second = write(tmp_path / "second.txt", b"same contents")
+    os.utime(second, (0, 0))
+    document = run_incremental(pipeline, second, cache)
+
+    assert not document.cached
+    assert document.results["file_info"]["mtime"] == 0
+
+
+def test_unchanged_cacheable_steps_are_reused(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    pipeline = make_pipeline([{"type": "hash", "params": {}}])
+    path = write(tmp_path / "doc.txt", b"contents")
+
+    first = run_incremental(pipeline, path, cache)
+    second = run_incremental(pipeline, path, cache)
+
+    assert second.cached
+    assert second.results == first.results
+
+
+def test_steps_after_file_info_are_reused(tmp_path, monkeypatch):
+    from processing.steps import HashStep
+
+    cache = ResultCache(str(tmp_path / "cache"))
+    pipeline = make_pipeline([
+        {"type": "file_info", "params": {}},
+        {"type": "hash", "params": {}},
+    ])
+    path = write(tmp_path / "doc.txt", b"contents")
+    first = run_incremental(pipeline, path, cache)
+
+    def fail(self, document):
+        raise AssertionError("hash ran again")
+
+    monkeypatch.setattr(HashStep, "finish", fail)
+    os.utime(path, (0, 0))
+    second = run_incremental(pipeline, path, cache)
+
+    assert second.error is None
+    assert not second.cached
+    assert second.results["hash"] == first.results["hash"]
+    # file_info cannot be cached, so it runs again and sees the new time
+    assert second.results["file_info"]["mtime"] == 0
+
+
+def test_identical_contents_reuse_results_around_uncached_steps(tmp_path, monkeypatch):
+    from processing.steps import HashStep
+
+    cache = ResultCache(str(tmp_path / "cache"))
+    out = tmp_path / "out"
+    pipeline = make_pipeline([
+        {"type": "file_info", "params": {}},
+        {"type": "hash", "params": {}},
+        {"type": "copy", "params": {"output_dir": str(out)}},
+    ])
+    first = run_incremental(pipeline, write(tmp_path / "first.txt", b"same contents"), cache)
+
+    def fail(self, document):
+        raise AssertionError("hash ran again")
+
+    monkeypatch.setattr(HashStep, "finish", fail)
+    second = run_incremental(pipeline, write(tmp_path / "second.txt", b"same contents"), cache)
+
+    assert second.error is None
+    assert second.results["hash"] == first.results["hash"]
+    assert second.results["copy"] == str(out / "second.txt")
+    assert os.path.exists(out / "second.txt")
@@ -0,0 +1,51 @@
+import os
+
+from models.config_model import ConfigModel
+from processing.ingestion import CLAIMED_DIR_NAME, DISPATCHED_LOG_NAME, IngestionService
+
+
+def make_service(input_dir, dispatched):
+    config = ConfigModel("test", input_dir=str(input_dir))
+    return IngestionService([config], lambda config, paths: dispatched.extend(paths),
+                            settle_time=0.0, tick=60.0, rescan_interval=60.0)
+
+
+def claim(input_dir, name):
+    claim_dir = input_dir / CLAIMED_DIR_NAME / "1"
+    claim_dir.mkdir(parents=True, exist_ok=True)
+    path = claim_dir / name
+    path.write_text(name)
+    return str(path)
+
+
+def test_claimed_files_left_undispatched_are_dispatched_on_start(tmp_path):
+    (tmp_path / CLAIMED_DIR_NAME).mkdir()
+    (tmp_path / CLAIMED_DIR_NAME / DISPATCHED_LOG_NAME).write_text(os.path.join("1", "done.txt") + "\n")
+    claim(tmp_path, "done.txt")
+    lost = claim(tmp_path, "lost.txt")
+
+    dispatched = []
+    service = make_service(tmp_path, dispatched)
+    service.start()
+    service.stop(flush=False)
+    assert dispatched == [lost]
+
+    # Dispatched once, so a second start leaves it to the job queue
+    dispatched.clear()
+    service = make_service(tmp_path, dispatched)
+    service.start()
+    service.stop(flush=False)
+    assert dispatched == []
+
+
+def test_claims_from_before_the_log_are_not_dispatched_again(tmp_path):
+    claim(tmp_path, "old.txt")
+
+    dispatched = []
+    service = make_service(tmp_path, dispatched)
+    service.start()
+    service.stop(flush=False)
+
+    assert dispatched == []
+    log = (tmp_path / CLAIMED_DIR_NAME / DISPATCHED_LOG_NAME).read_text()
+    assert log == os.path.join("1", "old.txt") + "\n"
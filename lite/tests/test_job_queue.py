@@ -0,0 +1,26 @@
+from processing.job_queue import JOB_DEAD, JOB_PENDING, JobQueue
+
+
+def test_release_claims_retries_until_the_last_attempt(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), max_attempts=2)
+    queue.enqueue("poison", {})
+
+    # Each start claims the job again and dies before acking it
+    assert len(queue.claim()) == 1
+    assert queue.release_claims() == 1
+    assert queue.counts() == {JOB_PENDING: 1}
+
+    assert len(queue.claim()) == 1
+    assert queue.release_claims() == 0
+    assert queue.counts() == {JOB_DEAD: 1}
+    assert queue.claim() == []
+
+
+def test_release_claims_of_one_worker(tmp_path):
+    queue = JobQueue(str(tmp_path / "nested" / "jobs.db"))
+    queue.enqueue_many([("a", {}), ("b", {})])
+    queue.claim("first")
+    queue.claim("second")
+
+    assert queue.release_claims("first") == 1
+    assert [job.job_key for job in queue.claim("third", limit=2)] == ["a"]
@@ -0,0 +1,115 @@
+import json
+import logging
+import multiprocessing
+
+import pytest
+
+from utils import logging_config
+from utils.logging_config import (
+    RateLimitFilter, handle_worker_record, setup_logging, setup_worker_logging, shutdown_logging,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_record(msg, *args, name="flexipy.test", level=logging.ERROR):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_rate_limit_lets_a_burst_through_then_counts_the_rest(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(logging_config.time, "monotonic", clock)
+    rate_limit = RateLimitFilter(burst=3, period=60.0)
+
+    passed = [rate_limit.filter(make_record("Error claiming %s", f"file{i}")) for i in range(10)]
+    assert passed == [True] * 3 + [False] * 7
+    # Other messages have their own budget
+    assert rate_limit.filter(make_record("Another error"))
+    assert rate_limit.filter(make_record("Error claiming %s", "file", level=logging.WARNING))
+
+    clock.now += 30.0
+    assert not rate_limit.filter(make_record("Error claiming %s", "late"))
+
+    clock.now += 30.0
+    record = make_record("Error claiming %s", "after")
+    assert rate_limit.filter(record)
+    assert record.suppressed == 8
+
+    # A quiet period has nothing to report
+    clock.now += 60.0
+    record = make_record("Error claiming %s", "quiet")
+    assert rate_limit.filter(record)
+    assert not hasattr(record, "suppressed")
+
+
+def _log_from_worker(outbox):
+    setup_worker_logging(outbox, level="DEBUG")
+    logger = logging.getLogger("flexipy.worker")
+    logger.info("Processed %s", "doc.pdf", extra={"pages": 3})
+    logger.debug("Details of %s", "doc.pdf")
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_worker_records_reach_the_parent():
+    outbox = multiprocessing.Queue()
+    worker = multiprocessing.Process(target=_log_from_worker, args=(outbox,))
+    worker.start()
+    messages = [outbox.get(timeout=30), outbox.get(timeout=30)]
+    worker.join(30)
+    assert [tag for tag, _ in messages] == ["log", "log"]
+
+    logger = logging.getLogger("flexipy.worker")
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        for _, record in messages:
+            handle_worker_record(record)
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(logging.NOTSET)
+
+    # The parent's level applies, so the debug record is dropped here
+    (record,) = handler.records
+    assert record.getMessage() == "Processed doc.pdf"
+    assert record.pages == 3
+    assert record.process == worker.pid
+
+
+@pytest.fixture
+def root_level():
+    root = logging.getLogger()
+    level = root.level
+    yield
+    shutdown_logging()
+    root.setLevel(level)
+
+
+def test_records_are_written_as_json_lines(tmp_path, root_level):
+    log_file = tmp_path / "logs" / "flexipy.log"
+    setup_logging(level="INFO", log_file=str(log_file), json_format=True, console=False)
+    logger = logging.getLogger("flexipy.test")
+    logger.info("Batch %s finished", "abc", extra={"documents": 2})
+    logger.debug("Not written")
+    shutdown_logging()
+
+    (line,) = log_file.read_text(encoding="utf-8").splitlines()
+    data = json.loads(line)
+    assert data["message"] == "Batch abc finished"
+    assert data["logger"] == "flexipy.test"
+    assert data["level"] == "INFO"
+    assert data["documents"] == 2
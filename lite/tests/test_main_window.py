@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+
+import pytest
+
+from models.config_model import ConfigModel
+
+
+class IdleIngestion:
+    def start(self):
+        pass
+
+    def stop(self, flush=True):
+        pass
+
+
+@pytest.fixture
+def window(qapp, monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    from PySide6.QtCore import QObject, Signal
+    from views.main_window import MainWindow
+
+    class IdleBatchController(QObject):
+        batch_started = Signal(str, int)
+        batch_progress = Signal(object)
+        batch_finished = Signal(object)
+        worker_metrics = Signal(object)
+
+        def resume(self):
+            pass
+
+        def preload_configs(self, configs):
+            pass
+
+        def run_batch(self, config, paths):
+            pass
+
+        def shutdown(self):
+            pass
+
+    window = MainWindow(IdleBatchController(), IdleIngestion())
+    yield window
+    window.close()
+
+
+def test_refresh_clears_the_sample_rows(window):
+    assert window.config_model.rowCount() == 3
+
+    window.refresh_configs()
+
+    assert window.config_model.rowCount() == 0
+
+
+def test_refresh_after_deleting_the_last_config(window):
+    window.config_manager.save_config("only", ConfigModel("only"))
+    window.refresh_configs()
+    assert [window.config_model.config(row).name
+            for row in range(window.config_model.rowCount())] == ["only"]
+
+    os.remove(window.config_manager.get_config_path("only"))
+    window.refresh_configs()
+
+    assert window.config_model.rowCount() == 0
+
+
+def _wait_for(qapp, condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_export_runs_off_the_gui_thread(qapp, window, monkeypatch, tmp_path):
+    from PySide6.QtWidgets import QFileDialog, QMessageBox
+    from utils import config_exporter
+
+    window.config_manager.save_config("only", ConfigModel("only"))
+    path = str(tmp_path / "configs.zip")
+    monkeypatch.setattr(QFileDialog, "getSaveFileName", lambda *args: (path, ""))
+    messages = []
+    monkeypatch.setattr(QMessageBox, "information", lambda *args: messages.append(args[2]))
+    monkeypatch.setattr(QMessageBox, "warning", lambda *args: messages.append(args[2]))
+
+    threads = []
+    export = config_exporter.ConfigExporter.export
+
+    def recording_export(self, *args, **kwargs):
+        threads.append(threading.current_thread())
+        return export(self, *args, **kwargs)
+
+    monkeypatch.setattr(config_exporter.ConfigExporter, "export", recording_export)
+
+    window.export_configs()
+    _wait_for(qapp, lambda: messages)
+
+    assert messages == [f"Exported 1 configuration(s) to {path}"]
+    assert threads and threads[0] is not threading.main_thread()
+    assert os.path.exists(path)
+    assert window.export_task is None
+
+
+def test_failed_export_is_reported(qapp, window, monkeypatch, tmp_path):
+    from PySide6.QtWidgets import QFileDialog, QMessageBox
+
+    path = str(tmp_path / "missing" / "configs.zip")
+    monkeypatch.setattr(QFileDialog, "getSaveFileName", lambda *args: (path, ""))
+    messages = []
+    monkeypatch.setattr(QMessageBox, "warning", lambda *args: messages.append(args[2]))
+
+    window.export_configs()
+    _wait_for(qapp, lambda: messages)
+
+    assert messages[0].startswith("Export failed:")
+    assert window.export_task is None
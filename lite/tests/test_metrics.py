@@ -0,0 +1,23 @@
+from utils.metrics import Histogram
+
+
+def test_buckets_split_each_power_of_two_into_128():
+    histogram = Histogram()
+    for micros in range(1 << 16, 1 << 17):
+        histogram.observe(micros / 1e6)
+
+    buckets, count, _, _, _ = histogram.merged()
+    assert count == 1 << 16
+    assert len(buckets) == 128
+
+
+def test_bucket_bounds_stay_within_one_percent():
+    histogram = Histogram()
+    values = [1, 7, 255, 256, 1000, 12345, 999999, 3600 * 10 ** 6]
+    for micros in values:
+        histogram.observe(micros / 1e6)
+
+    uppers = [upper * 1e6 for upper, _ in histogram.merged()[0]]
+    assert len(uppers) == len(values)
+    for micros, upper in zip(values, uppers):
+        assert micros < upper <= micros * 1.01 + 1
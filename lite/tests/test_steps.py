@@ -0,0 +1,70 @@
+import hashlib
+
+from models.config_model import ConfigModel
+from processing.pipeline import Pipeline
+from processing.steps import create_step
+
+
+def run(steps, path):
+    return Pipeline.from_config(ConfigModel("test", steps=steps)).run(path)
+
+
+def test_hash_defaults_to_the_file_contents(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF-1.4 not really a pdf" * 1000)
+
+    document = run([{"type": "hash", "params": {}}], str(path))
+
+    assert document.error is None
+    assert document.results["hash"] == hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_hash_accepts_chunk_size(tmp_path):
+    path = tmp_path / "doc.bin"
+    path.write_bytes(bytes(range(256)) * 100)
+
+    step = create_step({"type": "hash", "params": {"algorithm": "md5", "chunk_size": 7}})
+    document = run([{"type": "hash", "params": step.params}], str(path))
+
+    assert document.results["hash"] == hashlib.md5(path.read_bytes()).hexdigest()
+
+
+def test_split_ranges_merge_to_the_whole_document_result(tmp_path):
+    from processing.page_source import iter_pages
+    from processing.steps import STEP_TYPES
+
+    path = tmp_path / "doc.bin"
+    path.write_bytes(bytes(range(256)) * 100)
+    steps = [
+        {"type": "file_info", "params": {}},
+        {"type": "hash", "params": {}},
+        {"type": "copy", "params": {"output_dir": str(tmp_path / "out")}},
+        {"type": "preview", "params": {}},
+    ]
+    pipeline = Pipeline.from_config(ConfigModel("test", steps=steps))
+    assert pipeline.page_parallel
+
+    whole = pipeline.run(str(path))
+    # Small blocks stand in for the pages of a long document
+    pages = sum(1 for _ in iter_pages(str(path), block_size=1000))
+    import processing.pipeline as pipeline_module
+    original = pipeline_module.iter_pages
+    pipeline_module.iter_pages = lambda *args, **kwargs: original(*args, block_size=1000, **kwargs)
+    try:
+        partials = [pipeline.run(str(path), page_range=(first, min(first + 10, pages)))
+                    for first in range(0, pages, 10)]
+    finally:
+        pipeline_module.iter_pages = original
+
+    assert len(partials) > 1
+    merged = {key: STEP_TYPES[key].merge([partial.results[key] for partial in partials])
+              for key in whole.results}
+    assert merged["hash"] == whole.results["hash"]
+    assert merged["copy"] == whole.results["copy"]
+    assert merged["file_info"]["size"] == whole.results["file_info"]["size"]
+    assert merged["file_info"]["pages"] == pages
+
+
+def test_page_hashes_are_not_split():
+    assert create_step({"type": "hash", "params": {}}).page_parallel
+    assert not create_step({"type": "hash", "params": {"pages": True}}).page_parallel
@@ -0,0 +1,60 @@
+import os
+import time
+
+from utils.thumbnail_cache import ThumbnailPack, prune_packs
+
+
+def _touch(path, size, mtime):
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    os.utime(path, (mtime, mtime))
+
+
+def test_prune_packs_deletes_least_recently_used(tmp_path):
+    now = time.time()
+    for age, name in enumerate(["new", "middle", "old", "oldest"]):
+        _touch(tmp_path / f"{name}.pack", 100, now - age * 60)
+    (tmp_path / "other.txt").write_bytes(b"\0" * 1000)
+
+    keep = str(tmp_path / "oldest.pack")
+    assert prune_packs(str(tmp_path), 250, keep=[keep]) == 2
+
+    assert sorted(os.listdir(tmp_path)) == ["new.pack", "oldest.pack", "other.txt"]
+
+
+def test_closed_pack_drops_reads_and_writes(tmp_path):
+    pack = ThumbnailPack(str(tmp_path / "batch.pack"))
+    pack.put("a", b"data")
+    assert pack.get("a") == b"data"
+
+    pack.close()
+    pack.put("b", b"data")
+    assert pack.get("a") is None
+
+
+def test_visible_rows_follow_the_scroll_position(qapp, monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    from views.document_view import DocumentView, THUMBNAIL_SIZE
+
+    view = DocumentView()
+    view.resize(4 * (THUMBNAIL_SIZE + 24) + 40, 600)
+    view.model.set_documents(f"/nowhere/{i}.pdf" for i in range(1000))
+    view.show()
+    for _ in range(50):
+        qapp.processEvents()
+
+    rows = view.visible_rows()
+    assert rows.start == 0
+    assert 0 < len(rows) < 100
+
+    bar = view.list_view.verticalScrollBar()
+    bar.setValue(bar.maximum() // 2)
+    qapp.processEvents()
+    rows = view.visible_rows()
+    middle = view.model.index(rows.start + len(rows) // 2)
+    assert 0 < rows.start < 1000 - len(rows)
+    assert view.list_view.viewport().rect().intersects(view.list_view.visualRect(middle))
+    assert not view.list_view.viewport().rect().intersects(
+        view.list_view.visualRect(view.model.index(rows.start - len(rows))))
+
+    view.shutdown()
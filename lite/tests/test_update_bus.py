@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def bus(qapp):
+    from controllers.update_bus import UpdateBus
+
+    bus = UpdateBus(rate=10)
+    bus.deliveries = []
+    bus.delivered.connect(lambda topic, updates: bus.deliveries.append((topic, dict(updates))))
+    yield bus
+    bus.deleteLater()
+
+
+def spin(qapp, seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+
+
+def test_updates_within_one_tick_are_delivered_once(qapp, bus):
+    def post_progress():
+        for done in range(1, 1001):
+            bus.post("batch_progress", "a", (done, 1000))
+            bus.post("batch_progress", "b", (done // 2, 500))
+
+    threads = [threading.Thread(target=post_progress) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    bus.post("status", "a", "running")
+    bus.post("status", "b", "running")
+    bus.post("status", "c", "running")
+    bus.discard("status", "c")
+    for thread in threads:
+        thread.join()
+
+    spin(qapp, 3 * bus.interval)
+
+    assert sorted(bus.deliveries) == [
+        ("batch_progress", {"a": (1000, 1000), "b": (500, 500)}),
+        ("status", {"a": "running", "b": "running"}),
+    ]
+
+
+def test_flushes_are_at_least_one_interval_apart(qapp, bus):
+    bus.post("batch_progress", "a", (1, 2))
+    spin(qapp, bus.interval / 2)
+    assert bus.deliveries == [("batch_progress", {"a": (1, 2)})]
+    first = bus.last_flush
+
+    bus.post("batch_progress", "a", (2, 2))
+    spin(qapp, bus.interval / 2)
+    assert len(bus.deliveries) == 1
+
+    spin(qapp, bus.interval)
+    assert bus.deliveries[1] == ("batch_progress", {"a": (2, 2)})
+    assert bus.last_flush - first >= bus.interval * 0.9